@@ -0,0 +1,140 @@
+"""
+Synthetic benchmark fixtures: site-spec.json plus a large extraction directory.
+
+Everything is generated from a seeded RNG so a given section count always
+produces byte-identical fixtures (and therefore identical prompts).
+"""
+
+import json
+import random
+from pathlib import Path
+
+ARCHETYPES = [
+    ("NAV", "sticky-transparent"), ("HERO", "full-bleed-overlay"), ("LOGO-BAR", "marquee"),
+    ("FEATURES", "icon-grid"), ("HOW-IT-WORKS", "numbered-steps"), ("STATS", "counter-row"),
+    ("TESTIMONIALS", "carousel"), ("PRODUCT-SHOWCASE", "demo-cards"), ("PRICING", "three-column"),
+    ("FAQ", "accordion"), ("GALLERY", "masonry"), ("CTA", "split"), ("FOOTER", "multi-column"),
+]
+
+WORDS = (
+    "craft roast origin single estate harvest ritual slow morning brew grind pour aroma "
+    "texture balance bright body finish crema bean farm altitude washed natural honey "
+    "process shipping subscription fresh weekly blend espresso filter cold notes cocoa"
+).split()
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def build_site_spec(section_count: int, seed: int = 7) -> dict:
+    """A site-spec.json with `section_count` sections in build-site-spec.js's schema."""
+    rng = random.Random(seed)
+    sections = []
+    for i in range(section_count):
+        archetype, variant = ARCHETYPES[i % len(ARCHETYPES)]
+        confidence = round(rng.uniform(0.55, 0.98), 2)
+        sections.append({
+            "index": i,
+            "archetype": archetype,
+            "variant": variant,
+            "confidence": confidence,
+            "confidence_tier": "high" if confidence > 0.8 else "medium",
+            "confidence_note": "",
+            "method": "heuristic",
+            "source_rect": {"x": 0, "y": i * 900, "width": 1440, "height": 900},
+            "content": {
+                "headings": [_sentence(rng, rng.randint(3, 7)) for _ in range(3)],
+                "body_text": [_sentence(rng, rng.randint(12, 30)) for _ in range(6)],
+                "ctas": [_sentence(rng, 2) for _ in range(2)],
+            },
+            "images": [
+                {"src": f"https://cdn.example.test/img/{i}-{k}.jpg", "alt": _sentence(rng, 4),
+                 "role": "hero" if k == 0 else "content", "width": 1600, "height": 1000}
+                for k in range(rng.randint(0, 4))
+            ],
+            "icons": {"library": "lucide-react"},
+            "animations": {"detected": ["fade-up"], "recommended": "entrance-fade"},
+            "components": {"matched": [], "fallbacks": []},
+            "generation_guidance": "Follow the reference closely.",
+        })
+    return {
+        "version": "2.0.0",
+        "project": f"bench-{section_count}",
+        "source_url": "https://bench.example.test/",
+        "style": {
+            "palette": {"bg_primary": "#0b0b0c", "bg_secondary": "#151517", "text_primary": "#f4f1ea",
+                        "text_muted": "#a19d94", "accent": "#d6a24e", "border": "#2a2a2d"},
+            "fonts": {"heading": {"extracted": "Inter", "google_fallback": "Inter", "weight": 600},
+                      "body": {"extracted": "Inter", "google_fallback": "Inter", "weight": 400}},
+            "spacing": {"section_padding": "6rem", "internal_gap": "3rem", "scale": "generous"},
+            "border_radius": "0.75rem",
+            "animation": {"engine": "framer-motion", "intensity": "moderate"},
+        },
+        "sections": sections,
+        "component_map": {},
+        "global": {"industry": "auto-detected", "tone": "professional", "detected_plugins": []},
+    }
+
+
+def build_extraction_data(section_count: int, seed: int = 11) -> dict:
+    """A deliberately large extraction-data.json (≈ tens of KB per section)."""
+    rng = random.Random(seed)
+    sections, text_content, dom_elements, images = [], [], [], []
+    for i in range(section_count):
+        sections.append({"index": i, "tag": "section", "rect": {"x": 0, "y": i * 900, "width": 1440, "height": 900}})
+        for k in range(40):
+            text_content.append({
+                "section": i, "tag": rng.choice(["h1", "h2", "h3", "p", "a", "span"]),
+                "text": _sentence(rng, rng.randint(4, 24)),
+                "fontFamily": "Inter, sans-serif", "fontSize": f"{rng.choice([14, 16, 18, 24, 48])}px",
+            })
+        for k in range(150):
+            dom_elements.append({
+                "section": i, "tag": rng.choice(["div", "a", "button", "img", "span"]),
+                "classes": " ".join(rng.choice(WORDS) for _ in range(4)),
+                "styles": {"backgroundColor": rng.choice(["#0b0b0c", "#151517", "#d6a24e"]),
+                           "color": "#f4f1ea", "borderRadius": "12px", "padding": "24px"},
+                "rect": {"x": rng.randint(0, 1400), "y": i * 900 + rng.randint(0, 880), "width": 200, "height": 40},
+            })
+        for k in range(10):
+            images.append({"src": f"https://cdn.example.test/img/{i}-{k}.jpg", "alt": _sentence(rng, 4),
+                           "section": i, "width": 1600, "height": 1000})
+    return {
+        "url": "https://bench.example.test/",
+        "timestamp": "2026-01-01T00:00:00.000Z",
+        "sections": sections,
+        "textContent": text_content,
+        "domElements": dom_elements,
+        "assets": {"images": images, "iconLibrary": {"library": "lucide-react", "icons": []}},
+        "animations": {"libraries": ["framer-motion"], "keyframes": []},
+    }
+
+
+def build_animation_analysis(section_count: int) -> dict:
+    return {
+        "engine": "framer-motion",
+        "libraries": ["framer-motion"],
+        "sections": {str(i): {"patterns": ["fade-up"], "intensity": "moderate"} for i in range(section_count)},
+        "lottieFiles": [],
+    }
+
+
+def build_section_contexts(section_count: int, seed: int = 13) -> dict:
+    """Stage 0c-style reference context blocks, keyed by section index."""
+    rng = random.Random(seed)
+    return {str(i): f"## Reference Context (section {i + 1})\n{_sentence(rng, 30)}" for i in range(section_count)}
+
+
+def write_fixture(root: Path, section_count: int) -> dict:
+    """Write site-spec.json and an extraction dir under `root`. Returns their paths."""
+    root.mkdir(parents=True, exist_ok=True)
+    site_spec_path = root / "site-spec.json"
+    site_spec_path.write_text(json.dumps(build_site_spec(section_count), indent=2), encoding="utf-8")
+    extraction_dir = root / "extraction"
+    extraction_dir.mkdir(exist_ok=True)
+    (extraction_dir / "extraction-data.json").write_text(
+        json.dumps(build_extraction_data(section_count)), encoding="utf-8")
+    (extraction_dir / "animation-analysis.json").write_text(
+        json.dumps(build_animation_analysis(section_count)), encoding="utf-8")
+    return {"site_spec": site_spec_path, "extraction_dir": extraction_dir}
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Website Builder — Synthetic Scale Benchmarks
+
+Measures the orchestrator's own overhead, stage by stage, separately from
+model latency and Node:
+
+  stage_scaffold_v2 → stage_sections → stage_sections again (no-op rerun,
+  must regenerate nothing) → stage_assemble → stage_review_v2
+  → stage_validate → stage_deploy (npm and downloads stubbed)
+
+Claude calls go to scripts/mock_anthropic_server.py (separate process, fixed
+latency). Node helpers and subprocesses are replaced by counting stubs
+(benchmarks/stubs.py). Each page size runs in a fresh interpreter against
+seeded site-spec.json / extraction-data.json fixtures (benchmarks/fixtures.py).
+
+Per stage it reports wall time, CPU time, peak RSS, time spent waiting on
+the mock LLM, Node worker calls, subprocesses orchestrate would launch and
+real process spawns. Results are compared with benchmarks/baseline.json:
+CPU time, peak RSS and call counts that grow past the tolerances fail the run.
+
+Usage:
+  python benchmarks/run_benchmarks.py                       # 5, 50, 200 sections
+  python benchmarks/run_benchmarks.py --sizes 5,50 --latency 0.2
+  python benchmarks/run_benchmarks.py --update-baseline     # record a new baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+ROOT = BENCH_DIR.parent
+SCRIPTS_DIR = ROOT / "scripts"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+BENCH_OUTPUT_DIR = ROOT / "output" / ".bench"
+
+DEFAULT_SIZES = "5,50,200"
+DEFAULT_LATENCY = 0.05
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PRESET = "artisan-food"
+
+# Regression thresholds: current > baseline * ratio + slack
+CPU_TOLERANCE = 1.5
+CPU_SLACK_S = 0.05
+RSS_TOLERANCE = 1.25
+RSS_SLACK_MB = 16
+COUNT_METRICS = ("node_calls", "subprocesses", "real_spawns")
+
+
+# --- Measurement (child process) ---
+
+def _reset_peak_rss():
+    """Reset the kernel's peak-RSS counter (Linux); elsewhere the peak is cumulative."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status", encoding="utf-8") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_child(size: int, concurrency: int, preset: str) -> dict:
+    """Run every stage for one page size in this process and return per-stage metrics."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    sys.path.insert(0, str(BENCH_DIR))
+    import orchestrate
+    import stubs
+    from fixtures import build_section_contexts, write_fixture
+
+    project = f"bench-{size}"
+    orchestrate.OUTPUT_DIR = BENCH_OUTPUT_DIR
+    shutil.rmtree(BENCH_OUTPUT_DIR / project, ignore_errors=True)
+    fixture = write_fixture(BENCH_OUTPUT_DIR / project / "fixture", size)
+    stubs.install(orchestrate)
+    orchestrate.LLM_CACHE.mode = "off"
+    orchestrate.CURRENT_PROJECT.set(project)
+    site_spec = json.loads(fixture["site_spec"].read_text(encoding="utf-8"))
+    extraction_dir = fixture["extraction_dir"]
+
+    stages = {}
+
+    def measure(name, fn, *args, **kwargs):
+        counts_before = dict(stubs.COUNTS)
+        spans_before = len(orchestrate.TRACER.spans)
+        _reset_peak_rss()
+        wall, cpu = time.perf_counter(), time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn(*args, **kwargs)
+        metrics = {
+            "wall_s": round(time.perf_counter() - wall, 3),
+            "cpu_s": round(time.process_time() - cpu, 3),
+            "peak_rss_mb": _peak_rss_mb(),
+            "llm_wait_s": round(sum(sp["duration_ms"] for sp in orchestrate.TRACER.spans[spans_before:]
+                                    if sp["kind"] == "llm") / 1000, 3),
+        }
+        for key in COUNT_METRICS:
+            metrics[key] = stubs.COUNTS[key] - counts_before.get(key, 0)
+        stages[name] = metrics
+        return result
+
+    # As Stage 0 of a --from-url build: contexts in memory, and saved for later runs
+    section_contexts = build_section_contexts(size)
+    orchestrate.save_section_contexts(project, section_contexts)
+
+    _, sections = measure("scaffold_v2", orchestrate.stage_scaffold_v2, site_spec, project)
+    section_files = measure(
+        "sections", orchestrate.stage_sections, sections, preset, project,
+        section_contexts, extraction_dir, None, site_spec=site_spec, concurrency=concurrency,
+    )
+
+    # A no-op rerun (--skip-to sections) sees only what it reloads from disk and must reuse every section
+    llm_spans = len([sp for sp in orchestrate.TRACER.spans if sp["kind"] == "llm"])
+    measure(
+        "sections_rerun", orchestrate.stage_sections, sections, preset, project,
+        orchestrate.load_section_contexts(project), extraction_dir, None,
+        site_spec=json.loads(fixture["site_spec"].read_text(encoding="utf-8")), concurrency=concurrency,
+    )
+    regenerated = len([sp for sp in orchestrate.TRACER.spans if sp["kind"] == "llm"]) - llm_spans
+    if regenerated:
+        raise RuntimeError(f"No-op rerun regenerated {regenerated} of {size} sections")
+    measure("assemble", orchestrate.stage_assemble, sections, section_files, project)
+    measure("review_v2", orchestrate.stage_review_v2, section_files, site_spec, project)
+    measure("validate", orchestrate.stage_validate, project)
+    measure("deploy", orchestrate.stage_deploy, sections, section_files, preset, project, extraction_dir)
+    return stages
+
+
+# --- Driver ---
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server(latency: float) -> tuple[subprocess.Popen, str]:
+    """Start the mock Anthropic API in its own process so its CPU isn't measured."""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, str(SCRIPTS_DIR / "mock_anthropic_server.py"),
+         "--port", str(port), "--latency", str(latency)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"{base_url}/v1/messages/batches/none", timeout=0.5)
+        except urllib.error.HTTPError:
+            return proc, base_url  # 404 means it's answering
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("mock Anthropic server did not start")
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    """Return a description of every metric that regressed against the baseline."""
+    regressions = []
+    for size, stages in results.items():
+        for stage, cur in stages.items():
+            base = baseline.get(size, {}).get(stage)
+            if not base:
+                continue
+            where = f"{size} sections / {stage}"
+            if cur["cpu_s"] > base["cpu_s"] * CPU_TOLERANCE + CPU_SLACK_S:
+                regressions.append(f"{where}: cpu {base['cpu_s']:.3f}s → {cur['cpu_s']:.3f}s")
+            if cur["peak_rss_mb"] > base["peak_rss_mb"] * RSS_TOLERANCE + RSS_SLACK_MB:
+                regressions.append(f"{where}: peak RSS {base['peak_rss_mb']}MB → {cur['peak_rss_mb']}MB")
+            for key in COUNT_METRICS:
+                if cur[key] > base.get(key, 0):
+                    regressions.append(f"{where}: {key} {base.get(key, 0)} → {cur[key]}")
+    return regressions
+
+
+def print_table(results: dict, baseline: dict):
+    header = f"  {'stage':<14} {'wall':>8} {'cpu':>8} {'llm':>8} {'rss MB':>8} {'node':>6} {'subp':>5} {'spawn':>5}  vs base cpu"
+    for size, stages in results.items():
+        print(f"\n  ── {size} sections ──")
+        print(header)
+        for stage, m in stages.items():
+            base = baseline.get(size, {}).get(stage)
+            delta = f"{(m['cpu_s'] - base['cpu_s']) * 1000:+.0f}ms" if base else "—"
+            print(f"  {stage:<14} {m['wall_s']:>7.2f}s {m['cpu_s']:>7.2f}s {m['llm_wait_s']:>7.2f}s "
+                  f"{m['peak_rss_mb']:>8.1f} {m['node_calls']:>6} {m['subprocesses']:>5} {m['real_spawns']:>5}  {delta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic scale benchmarks for orchestrate.py")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Section counts (default: {DEFAULT_SIZES})")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help=f"Mock LLM latency per call in seconds (default: {DEFAULT_LATENCY})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Sections in flight (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--preset", default=DEFAULT_PRESET, help=f"Preset to build with (default: {DEFAULT_PRESET})")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--keep", action="store_true", help="Keep generated projects under output/.bench/")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-out", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        stages = run_child(args.child, args.concurrency, args.preset)
+        args.child_out.write_text(json.dumps(stages), encoding="utf-8")
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+    BENCH_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    print(f"Benchmarking sizes {sizes} (mock latency {args.latency}s, concurrency {args.concurrency})")
+    mock, base_url = start_mock_server(args.latency)
+    env = dict(os.environ, ANTHROPIC_BASE_URL=base_url, ANTHROPIC_API_KEY="bench")
+    results = {}
+    try:
+        for size in sizes:
+            out_path = BENCH_OUTPUT_DIR / f"stages-{size}.json"
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", str(size), "--child-out", str(out_path),
+                 "--concurrency", str(args.concurrency), "--preset", args.preset],
+                env=env, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"❌ {size} sections failed:\n{proc.stderr[-2000:]}")
+                sys.exit(1)
+            results[str(size)] = json.loads(out_path.read_text(encoding="utf-8"))
+            out_path.unlink()
+            if not args.keep:
+                shutil.rmtree(BENCH_OUTPUT_DIR / f"bench-{size}", ignore_errors=True)
+    finally:
+        mock.kill()
+
+    print_table(results, baseline)
+    results_path = BENCH_OUTPUT_DIR / "results.json"
+    results_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"\n  → Saved: {results_path.relative_to(ROOT)}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"  ✓ Baseline updated: {args.baseline.relative_to(ROOT)}")
+        return
+
+    if not baseline:
+        print("  ⚠ No baseline to compare against (run with --update-baseline)")
+        return
+    regressions = compare(results, baseline)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against {args.baseline.name}:")
+        for r in regressions:
+            print(f"  - {r}")
+        sys.exit(1)
+    print(f"\n  ✅ No regressions against {args.baseline.name}")
+
+
+if __name__ == "__main__":
+    main()
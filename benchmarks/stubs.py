@@ -0,0 +1,81 @@
+"""
+Stand-ins for the Node side of the pipeline, with call counters.
+
+StubNodeWorker replaces orchestrate's persistent injector worker and
+stub_run_subprocess replaces orchestrate.run_subprocess (Stage 0 scripts,
+asset/Lottie downloads, npm install). Both JSON-encode their inputs the way
+the real transport would, so the Python-side serialization cost stays in
+the measurement, then return canned empty results.
+"""
+
+import json
+import subprocess
+from collections import Counter
+
+COUNTS = Counter()
+
+
+def _canned_result(method: str, params: list):
+    if method == "post-process.detectAndRepairTruncation":
+        return {"truncated": False, "repaired": False, "code": params[0], "warnings": []}
+    if method == "animation-injector.buildAllAnimationContexts":
+        return {"contexts": {}, "allComponentFiles": []}
+    if method == "asset-injector.buildAllAssetContexts":
+        sections = params[1] if len(params) > 1 else []
+        return {str(i): {"assetContext": ""} for i in range(len(sections))}
+    if method == "post-process.detectAndRepairTruncationAll":
+        return [{"truncated": False, "repaired": False, "warnings": []} for _ in params[0]]
+    if method == "buildAllSectionBlocks":
+        empty = {"block": "", "componentFiles": []}
+        return {str(r["index"]): {"iconBlock": "", "visualFallback": empty, "cardDemos": empty,
+                                  "uiComponents": dict(empty, matches=[])} for r in params[0]}
+    return None
+
+
+class StubNodeWorker:
+    """Drop-in for orchestrate.NodeWorker that never starts Node."""
+
+    restarts = 0
+
+    def call(self, method: str, *params, timeout: float | None = None):
+        json.dumps({"method": method, "params": list(params)}, default=str)
+        COUNTS["node_calls"] += 1
+        return _canned_result(method, list(params))
+
+    def pending(self) -> int:
+        return 0
+
+    def stderr_tail(self, chars: int = 300) -> str:
+        return ""
+
+    def close(self):
+        pass
+
+
+_WORKER = StubNodeWorker()
+
+
+def get_stub_worker() -> StubNodeWorker:
+    return _WORKER
+
+
+def stub_run_subprocess(span_name: str, slots, cmd: list, **kwargs) -> subprocess.CompletedProcess:
+    """Count the subprocess orchestrate would have launched and report success."""
+    COUNTS["subprocesses"] += 1
+    COUNTS[f"subprocess:{span_name}"] += 1
+    return subprocess.CompletedProcess(cmd, 0, stdout=json.dumps({"downloaded": 0}), stderr="")
+
+
+_real_popen_init = subprocess.Popen.__init__
+
+
+def _counting_popen_init(self, *args, **kwargs):
+    COUNTS["real_spawns"] += 1
+    _real_popen_init(self, *args, **kwargs)
+
+
+def install(orchestrate_module):
+    """Patch orchestrate to use the stubs, and count any real process spawns."""
+    orchestrate_module.get_node_worker = get_stub_worker
+    orchestrate_module.run_subprocess = stub_run_subprocess
+    subprocess.Popen.__init__ = _counting_popen_init
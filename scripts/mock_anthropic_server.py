@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Mock Anthropic API Server
+
+Local stand-in for the Messages and Message Batches endpoints, so the
+pipeline can run offline (batch mode, benchmarks, smoke tests). Section
+prompts get a small canned component named after the prompt's
+"Component name:" line, scaffold prompts a numbered section list
+(--scaffold-sections long), and anything else a one-line review.
+
+Usage:
+  python scripts/mock_anthropic_server.py [--port 8765] [--latency 0.5] [--batch-delay 5] [--scaffold-sections 8]
+
+Then point the pipeline at it:
+  ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=test \\
+    python scripts/orchestrate.py <project> --skip-to sections --batch-api
+
+Endpoints:
+  POST /v1/messages                         → Message (after --latency seconds)
+  POST /v1/messages/batches                 → MessageBatch (in_progress)
+  GET  /v1/messages/batches/{id}            → MessageBatch (ended after --batch-delay)
+  GET  /v1/messages/batches/{id}/results    → JSONL results
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _prompt_text(params: dict) -> str:
+    """Flatten the last user message's content to plain text."""
+    messages = params.get("messages") or [{}]
+    content = messages[-1].get("content", "")
+    if isinstance(content, list):
+        content = "\n".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return content
+
+
+SCAFFOLD_ARCHETYPES = ["NAV", "HERO", "LOGO-BAR", "FEATURES", "HOW-IT-WORKS", "STATS",
+                      "TESTIMONIALS", "PRICING", "FAQ", "CTA", "FOOTER"]
+
+
+def fake_text(prompt: str, scaffold_sections: int = 8) -> str:
+    """Canned reply by prompt kind: section component, scaffold list, or review."""
+    match = re.search(r"Component name:\s*(\w+)", prompt)
+    if match:
+        name = match.group(1)
+        return (
+            '"use client";\n\n'
+            f"export default function {name}() {{\n"
+            '  return (\n'
+            '    <section className="py-24 px-6">\n'
+            f'      <h2 className="text-4xl font-semibold">{name}</h2>\n'
+            '    </section>\n'
+            '  );\n'
+            '}\n'
+        )
+    if "page specification" in prompt:
+        lines = [
+            f"{i + 1}. {SCAFFOLD_ARCHETYPES[i % len(SCAFFOLD_ARCHETYPES)]} | default | Mock content direction {i + 1}."
+            for i in range(scaffold_sections)
+        ]
+        return "Page: mock\n\n" + "\n".join(lines) + "\n"
+    return "✅ PASS — mock review\n\n- Total: 1/1 passed\n"
+
+
+def fake_message(params: dict, scaffold_sections: int = 8) -> dict:
+    """Build a deterministic Message response for a request body."""
+    prompt = _prompt_text(params)
+    text = fake_text(prompt, scaffold_sections)
+    system = params.get("system") or ""
+    if isinstance(system, list):
+        system = "\n".join(block.get("text", "") for block in system if isinstance(block, dict))
+    return {
+        "id": f"msg_mock_{uuid.uuid4().hex[:16]}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get("model", "mock"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": (len(prompt) + len(system)) // 4,
+            "output_tokens": len(text) // 4,
+        },
+    }
+
+
+class MockState:
+    """In-memory batches shared by all handler threads."""
+
+    def __init__(self, latency: float, batch_delay: float, scaffold_sections: int = 8):
+        self.latency = latency
+        self.batch_delay = batch_delay
+        self.scaffold_sections = scaffold_sections
+        self.batches = {}
+        self.message_calls = 0
+        self.lock = threading.Lock()
+
+
+def make_handler(state: MockState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _batch_view(self, batch: dict) -> dict:
+            ended = time.time() >= batch["ends_at"]
+            n = len(batch["requests"])
+            host = self.headers.get("Host", "127.0.0.1")
+            return {
+                "id": batch["id"],
+                "type": "message_batch",
+                "processing_status": "ended" if ended else "in_progress",
+                "request_counts": {
+                    "processing": 0 if ended else n,
+                    "succeeded": n if ended else 0,
+                    "errored": 0, "canceled": 0, "expired": 0,
+                },
+                "created_at": _iso(batch["created_at"]),
+                "expires_at": _iso(batch["created_at"] + timedelta(days=1).total_seconds()),
+                "ended_at": _iso(batch["ends_at"]) if ended else None,
+                "archived_at": None,
+                "cancel_initiated_at": None,
+                "results_url": f"http://{host}/v1/messages/batches/{batch['id']}/results" if ended else None,
+            }
+
+        def do_POST(self):
+            if self.path.rstrip("/") == "/v1/messages":
+                params = self._read_json()
+                with state.lock:
+                    state.message_calls += 1
+                time.sleep(state.latency)
+                self._send_json(200, fake_message(params, state.scaffold_sections))
+            elif self.path.rstrip("/") == "/v1/messages/batches":
+                body = self._read_json()
+                batch_id = f"msgbatch_mock_{uuid.uuid4().hex[:16]}"
+                now = time.time()
+                batch = {
+                    "id": batch_id,
+                    "requests": body.get("requests", []),
+                    "created_at": now,
+                    "ends_at": now + state.batch_delay,
+                }
+                with state.lock:
+                    state.batches[batch_id] = batch
+                self._send_json(200, self._batch_view(batch))
+            else:
+                self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+        def do_GET(self):
+            match = re.match(r"^/v1/messages/batches/([\w-]+)(/results)?/?$", self.path.split("?")[0])
+            batch = state.batches.get(match.group(1)) if match else None
+            if not batch:
+                self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+                return
+            if not match.group(2):
+                self._send_json(200, self._batch_view(batch))
+                return
+            lines = [
+                json.dumps({
+                    "custom_id": req["custom_id"],
+                    "result": {"type": "succeeded", "message": fake_message(req.get("params", {}), state.scaffold_sections)},
+                })
+                for req in batch["requests"]
+            ]
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/binary")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def start_server(port: int = 0, latency: float = 0.0, batch_delay: float = 0.0,
+                 scaffold_sections: int = 8) -> tuple[ThreadingHTTPServer, MockState]:
+    """Start the mock server on a background thread. Returns (server, state)."""
+    state = MockState(latency, batch_delay, scaffold_sections)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Anthropic API server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5,
+                        help="Seconds to wait before answering each /v1/messages call")
+    parser.add_argument("--batch-delay", type=float, default=5.0,
+                        help="Seconds until a submitted batch reports processing_status=ended")
+    parser.add_argument("--scaffold-sections", type=int, default=8,
+                        help="Number of sections in a mocked scaffold reply")
+    args = parser.parse_args()
+
+    server, _state = start_server(args.port, args.latency, args.batch_delay, args.scaffold_sections)
+    print(f"Mock Anthropic API listening on http://127.0.0.1:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
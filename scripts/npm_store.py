@@ -0,0 +1,208 @@
+"""
+Dependency Store
+
+Content-addressed node_modules installs shared by orchestrate.py,
+orchestrate_parallel.py and orchestrate_batch.py: a dependency set is
+installed once into output/.cache/npm/<key>/ and hardlinked into every site
+that needs it (see NodeModulesStore).
+
+Usage:
+  from npm_store import NodeModulesStore
+  store = NodeModulesStore(Path("output/.cache/npm"))
+  store.install(site_dir)   # True once site_dir/node_modules matches package.json
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+NPM_INSTALL_TIMEOUT = 120
+NPM_STAMP_FILE = ".web-builder-deps"
+
+
+def _run_npm(cmd: list, cwd: Path, timeout: int) -> subprocess.CompletedProcess:
+    return subprocess.run(cmd, capture_output=True, text=True, cwd=str(cwd), timeout=timeout)
+
+
+@contextmanager
+def _no_span(name: str, kind: str = "internal", **attributes):
+    yield attributes
+
+
+def link_tree(src: Path, dst: Path) -> int:
+    """Recreate the tree at src under dst with hardlinked files. Returns the file count.
+
+    Symlinks (node_modules/.bin) are recreated as symlinks. Falls back to
+    copying when hardlinks aren't possible (e.g. store on another filesystem).
+    """
+    can_link = True
+    count = 0
+    for root, dirs, files in os.walk(src):
+        rel = os.path.relpath(root, src)
+        target = dst if rel == "." else dst / rel
+        target.mkdir(parents=True, exist_ok=True)
+        for name in dirs + files:
+            s, d = Path(root) / name, target / name
+            if s.is_symlink():
+                os.symlink(os.readlink(s), d)
+            elif name in dirs:
+                continue
+            elif can_link:
+                try:
+                    os.link(s, d)
+                except OSError:
+                    can_link = False
+                    shutil.copy2(s, d)
+            else:
+                shutil.copy2(s, d)
+            count += 1
+    return count
+
+
+class NodeModulesStore:
+    """Content-addressed node_modules installs shared across projects and runs.
+
+    The key hashes dependencies + devDependencies of the final package.json
+    plus the platform (native packages like @next/swc are per-OS/arch).
+    output/.cache/npm/<key>/ holds a package.json, package-lock.json and a
+    fully installed node_modules; a deploy with a known key hardlinks that
+    tree into site/node_modules instead of running npm. Lockfiles are also
+    kept in output/.cache/npm/locks/ so a rebuilt entry installs with `npm ci`.
+
+    A new key without a lockfile is seeded from the entry the site is already
+    linked to (the early deploy-install), so npm only fetches the delta the
+    copied components added.
+    """
+
+    def __init__(self, store_dir: Path, enabled: bool = True, offline: bool = False,
+                 registry: str | None = None, run=None, span=None):
+        self.store_dir = store_dir
+        self.run = run or _run_npm          # run(cmd, cwd, timeout) → CompletedProcess
+        self.span = span or _no_span        # span(name, kind, **attrs) → context yielding attrs
+        self.enabled = enabled
+        self.offline = offline      # npm --offline: only the local npm cache
+        self.registry = registry    # e.g. a local Verdaccio mirror
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def key(pkg: dict) -> str:
+        payload = json.dumps({
+            "dependencies": pkg.get("dependencies", {}),
+            "devDependencies": pkg.get("devDependencies", {}),
+            "platform": [sys.platform, platform.machine()],
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def npm_flags(self) -> list[str]:
+        flags = ["--no-audit", "--no-fund"]
+        if self.offline:
+            flags.append("--offline")
+        if self.registry:
+            flags += ["--registry", self.registry]
+        return flags
+
+    def install(self, site_dir: Path) -> bool:
+        """Materialise site_dir/node_modules for its package.json. Returns True on success."""
+        pkg = json.loads((site_dir / "package.json").read_text(encoding="utf-8"))
+        if not self.enabled:
+            return self._npm(["install"], site_dir)
+
+        key = self.key(pkg)
+        stamp = site_dir / "node_modules" / NPM_STAMP_FILE
+        linked = stamp.read_text(encoding="utf-8").strip() if stamp.exists() else None
+        if linked == key:
+            print("  ✓ node_modules already matches package.json")
+            return True
+
+        entry = self.store_dir / key
+        with self._key_lock(key):
+            if not (entry / NPM_STAMP_FILE).exists():
+                print(f"  Dependency store miss ({key[:12]}) — installing once for the store...")
+                base = self.store_dir / linked if linked else None
+                if not self._populate(entry, pkg, key, base):
+                    return False
+            else:
+                print(f"  Dependency store hit ({key[:12]})")
+
+        with self.span("npm:link", "npm", key=key[:12]) as attrs:
+            node_modules = site_dir / "node_modules"
+            if node_modules.exists():
+                shutil.rmtree(node_modules)
+            attrs["files"] = link_tree(entry / "node_modules", node_modules)
+            shutil.copy2(entry / "package-lock.json", site_dir / "package-lock.json")
+            stamp.write_text(key, encoding="utf-8")
+        print(f"  ✓ Linked {attrs['files']} files into node_modules from the store")
+        return True
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _populate(self, entry: Path, pkg: dict, key: str, base: Path | None = None) -> bool:
+        """Install the dependency set into a fresh store entry (atomically renamed into place).
+
+        With a `base` entry and no stored lockfile, the entry starts from base's
+        node_modules and lockfile, so `npm install` only adds what changed.
+        """
+        tmp = entry.with_name(f"{entry.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        store_pkg = {
+            "name": "web-builder-deps",
+            "version": "0.0.0",
+            "private": True,
+            "dependencies": pkg.get("dependencies", {}),
+            "devDependencies": pkg.get("devDependencies", {}),
+        }
+        (tmp / "package.json").write_text(json.dumps(store_pkg, indent=2) + "\n", encoding="utf-8")
+        lock = self.store_dir / "locks" / f"{key}.json"
+        if lock.exists():
+            shutil.copy2(lock, tmp / "package-lock.json")
+            ok = self._npm(["ci"], tmp)
+        else:
+            if base is not None and (base / NPM_STAMP_FILE).exists():
+                self._seed(tmp, base, pkg)
+            ok = self._npm(["install"], tmp)
+        if not ok or not (tmp / "node_modules").is_dir() or not (tmp / "package-lock.json").exists():
+            if ok:
+                print("  ⚠ npm finished without producing node_modules — not storing")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(tmp / "package-lock.json", lock)
+        (tmp / NPM_STAMP_FILE).write_text(key, encoding="utf-8")
+        try:
+            tmp.rename(entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)  # another process stored it first
+        return (entry / NPM_STAMP_FILE).exists()
+
+    def _seed(self, tmp: Path, base: Path, pkg: dict):
+        """Start tmp from base's installed tree so npm installs only the delta."""
+        base_pkg = json.loads((base / "package.json").read_text(encoding="utf-8"))
+        wanted = {**pkg.get("dependencies", {}), **pkg.get("devDependencies", {})}
+        have = {**base_pkg.get("dependencies", {}), **base_pkg.get("devDependencies", {})}
+        delta = sorted(name for name, spec in wanted.items() if have.get(name) != spec)
+        with self.span("npm:seed", "npm", base=base.name[:12]) as attrs:
+            attrs["files"] = link_tree(base / "node_modules", tmp / "node_modules")
+            shutil.copy2(base / "package-lock.json", tmp / "package-lock.json")
+            # npm rewrites its hidden lockfile in place, which would write through the hardlink into base
+            (tmp / "node_modules" / ".package-lock.json").unlink(missing_ok=True)
+        print(f"  Seeded from {base.name[:12]} — npm installs {len(delta)} changed package(s): {', '.join(delta) or 'none'}")
+
+    def _npm(self, command: list[str], cwd: Path) -> bool:
+        result = self.run(["npm", *command, *self.npm_flags()], cwd, NPM_INSTALL_TIMEOUT)
+        if result.returncode != 0:
+            print(f"  ⚠ npm {command[0]} had issues:\n{result.stderr[-500:]}")
+            if self.offline:
+                print("  ⚠ Offline mode: packages must already be in the npm cache or the --npm-registry mirror")
+            return False
+        return True
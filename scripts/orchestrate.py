@@ -26,15 +26,35 @@ import os
 import sys
 import json
 import argparse
+import atexit
+import contextvars
+import functools
+import hashlib
 import re
+import shutil
+import sqlite3
 import subprocess
+import tempfile
+import threading
 import time as _time
+import urllib.parse
+import urllib.request
 import uuid
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
 from datetime import datetime
 
+from registry_index import ensure_index as ensure_registry_index
+from preset import Preset, load_preset
+from taxonomy import Taxonomy, load_taxonomy
+from review_engine import ReviewEngine
+from npm_store import NodeModulesStore, link_tree
+
 try:
     from anthropic import Anthropic
+    from anthropic.types import Message
 except ImportError:
     print("Error: anthropic package not installed.")
     print("Run: pip install anthropic --break-system-packages")
@@ -83,9 +103,381 @@ MAX_TOKENS = {
 MAX_RETRIES = 3
 TIMEOUT_SECONDS = 90
 
+# Shared concurrency limits. Generous for a single run; orchestrate_batch.py
+# narrows them with configure_pools() so every project in a batch shares
+# one budget per resource.
+LLM_SLOTS = threading.BoundedSemaphore(64)                    # in-flight Claude API calls
+NODE_SLOTS = threading.BoundedSemaphore(os.cpu_count() or 4)  # Node/CPU subprocesses
+IO_SLOTS = threading.BoundedSemaphore(4)                      # npm installs and downloads
+
+# Project whose work is running in the current thread (token attribution)
+CURRENT_PROJECT = contextvars.ContextVar("current_project", default=None)
+
+
+def configure_pools(llm: int | None = None, node: int | None = None,
+                    io: int | None = None, node_workers: int | None = None):
+    """Resize the shared pools. Call before any work starts."""
+    global LLM_SLOTS, NODE_SLOTS, IO_SLOTS, NODE_WORKER_COUNT
+    if llm:
+        LLM_SLOTS = threading.BoundedSemaphore(llm)
+    if node:
+        NODE_SLOTS = threading.BoundedSemaphore(node)
+    if io:
+        IO_SLOTS = threading.BoundedSemaphore(io)
+    if node_workers:
+        NODE_WORKER_COUNT = node_workers
+
+
+# Compiled animation registry (see scripts/registry_index.py)
+REGISTRY_INDEX_PATH = OUTPUT_DIR / ".cache" / "registry" / "animation_index.sqlite"
+
+# Response cache (content-addressed, see LLMResponseCache)
+LLM_CACHE_DIR = OUTPUT_DIR / ".cache" / "llm"
+LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+
+class LLMResponseCache:
+    """On-disk cache of Claude responses keyed by a hash of the full request.
+
+    Entries live at output/.cache/llm/<sha256>.json. File mtime is bumped on
+    every hit, so eviction (oldest mtime first, once the directory exceeds
+    max_bytes) is LRU. Entries older than ttl_seconds are treated as misses.
+
+    mode: "on" (read + write), "refresh" (write only), "off" (bypass).
+    """
+
+    def __init__(self, cache_dir: Path = LLM_CACHE_DIR, max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 ttl_seconds: int = LLM_CACHE_TTL_SECONDS, mode: str = "on"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(call_kwargs: dict) -> str:
+        """Hash model, system, messages, max_tokens and any extra request params."""
+        canonical = json.dumps(call_kwargs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Return the cached Message for key, or None on miss/expiry/bypass."""
+        if self.mode != "on":
+            return None
+        path = self.cache_dir / f"{key}.json"
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            if _time.time() - entry["created_at"] > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                self._count(hit=False)
+                return None
+            message = Message.model_validate(entry["response"])
+            os.utime(path)  # LRU: mark as recently used
+        except FileNotFoundError:
+            self._count(hit=False)
+            return None
+        except (OSError, ValueError, KeyError):
+            path.unlink(missing_ok=True)
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return message
+
+    def put(self, key: str, message):
+        """Store a response. Truncated (max_tokens) responses are not cached."""
+        if self.mode == "off" or getattr(message, "stop_reason", None) == "max_tokens":
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / f"{key}.json"
+        payload = json.dumps({
+            "created_at": _time.time(),
+            "response": message.model_dump(mode="json"),
+        })
+        data = payload.encode("utf-8")
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        with self._lock:
+            # An overwritten entry's bytes leave the cache as the new ones arrive
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            tmp.replace(path)
+            if self._total_bytes is None:
+                self._total_bytes = sum(f.stat().st_size for f in self.cache_dir.glob("*.json"))
+            else:
+                self._total_bytes += len(data) - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least-recently-used entries until the cache is under 90% of max_bytes."""
+        entries = []
+        for f in self.cache_dir.glob("*.json"):
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, f in entries:
+            if total <= target:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def summary(self) -> str:
+        return f"LLM cache: {self.hits} hit(s), {self.misses} miss(es)"
+
+
+LLM_CACHE = LLMResponseCache()
+
+
+class TokenUsageLedger:
+    """Per-call token accounting, including prompt-cache reads and writes."""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def record(self, message, label: str | None = None, max_tokens: int | None = None):
+        usage = getattr(message, "usage", None)
+        if usage is None:
+            return
+        entry = {
+            "project": CURRENT_PROJECT.get(),
+            "label": label,
+            "model": getattr(message, "model", None),
+            "max_tokens": max_tokens,
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+            "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        }
+        with self._lock:
+            self.records.append(entry)
+        return entry
+
+    def _select(self, project: str | None = None) -> list[dict]:
+        with self._lock:
+            return [r for r in self.records if project is None or r["project"] == project]
+
+    def totals(self, project: str | None = None) -> dict:
+        keys = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+        records = self._select(project)
+        totals = {k: sum(r[k] for r in records) for k in keys}
+        totals["calls"] = len(records)
+        return totals
+
+    def summary(self, project: str | None = None) -> str:
+        t = self.totals(project)
+        return (f"Tokens: {t['input_tokens']} in / {t['output_tokens']} out over {t['calls']} call(s) "
+                f"(prompt cache: {t['cache_read_input_tokens']} read, {t['cache_creation_input_tokens']} written)")
+
+    def save(self, path: Path, project: str | None = None):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"totals": self.totals(project), "calls": self._select(project)}
+        path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+TOKEN_USAGE = TokenUsageLedger()
+
+
+# --- Tracing ---
+
+class Tracer:
+    """Timing spans for stages, Claude calls, Node work and npm/downloads.
+
+    Each finished span is appended as one JSON line to
+    output/{project}/trace.jsonl (project taken from CURRENT_PROJECT).
+    Nesting follows the current span in the calling context, so spans started
+    in section worker threads (via copy_context) parent correctly. When
+    otlp_endpoint is set, flush() also POSTs the project's spans to
+    <endpoint>/v1/traces as OTLP/HTTP JSON.
+    """
+
+    def __init__(self, otlp_endpoint: str | None = None):
+        self.otlp_endpoint = otlp_endpoint
+        self.spans = []
+        self._current = contextvars.ContextVar("current_span", default=None)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes):
+        """Time a block. Yields the span's attributes dict for the block to fill in."""
+        parent = self._current.get()
+        span = {
+            "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex,
+            "span_id": uuid.uuid4().hex[:16],
+            "parent_id": parent["span_id"] if parent else None,
+            "name": name,
+            "kind": kind,
+            "project": CURRENT_PROJECT.get(),
+            "start": _time.time(),
+            "attributes": attributes,
+        }
+        token = self._current.set(span)
+        start = _time.perf_counter()
+        status, error = "ok", None
+        try:
+            yield span["attributes"]
+        except BaseException as e:
+            if not (isinstance(e, SystemExit) and e.code in (None, 0)):
+                status, error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._current.reset(token)
+            span["duration_ms"] = round((_time.perf_counter() - start) * 1000, 1)
+            span["end"] = span["start"] + span["duration_ms"] / 1000
+            span["status"] = status
+            if error:
+                span["error"] = error
+            self._record(span)
+
+    def _record(self, span: dict):
+        with self._lock:
+            self.spans.append(span)
+            if span["project"]:
+                path = OUTPUT_DIR / span["project"] / "trace.jsonl"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(span, default=str) + "\n")
+
+    def _select(self, project: str | None) -> list[dict]:
+        with self._lock:
+            return [sp for sp in self.spans if project is None or sp["project"] == project]
+
+    def summary(self, project: str | None = None) -> str:
+        """Total span time per kind (stages excluded), e.g. "llm 41.2s, npm 30.1s"."""
+        totals = {}
+        for sp in self._select(project):
+            if sp["kind"] != "stage":
+                totals[sp["kind"]] = totals.get(sp["kind"], 0.0) + sp["duration_ms"] / 1000
+        ranked = sorted(totals.items(), key=lambda kv: -kv[1])
+        return "Time by kind: " + ", ".join(f"{kind} {secs:.1f}s" for kind, secs in ranked)
+
+    def flush(self, project: str | None = None):
+        """Export the project's spans to the OTLP collector, if one is configured."""
+        if not self.otlp_endpoint:
+            return
+        spans = self._select(project)
+        if not spans:
+            return
+        url = self.otlp_endpoint.rstrip("/") + "/v1/traces"
+        body = json.dumps(otlp_payload(spans)).encode("utf-8")
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+        except OSError as e:
+            print(f"  ⚠ OTLP export to {url} failed: {e}")
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: list[dict]) -> dict:
+    """Convert recorded spans to an OTLP/HTTP JSON ExportTraceServiceRequest."""
+    otlp_spans = []
+    for sp in spans:
+        attributes = {"span.kind": sp["kind"], **sp["attributes"]}
+        if sp["project"]:
+            attributes["project"] = sp["project"]
+        otlp_spans.append({
+            "traceId": sp["trace_id"],
+            "spanId": sp["span_id"],
+            "parentSpanId": sp["parent_id"] or "",
+            "name": sp["name"],
+            "kind": 3 if sp["kind"] == "llm" else 1,  # CLIENT for API calls, else INTERNAL
+            "startTimeUnixNano": str(int(sp["start"] * 1e9)),
+            "endTimeUnixNano": str(int(sp["end"] * 1e9)),
+            "attributes": [{"key": k, "value": _otlp_value(v)}
+                           for k, v in attributes.items() if v is not None],
+            "status": {"code": 2, "message": sp.get("error", "")} if sp["status"] == "error" else {"code": 1},
+        })
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "web-builder"}}]},
+        "scopeSpans": [{"scope": {"name": "orchestrate"}, "spans": otlp_spans}],
+    }]}
+
+
+TRACER = Tracer(os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT"))
+
+
+def traced(span_name: str, kind: str = "stage"):
+    """Decorator: record every call of the function as a span."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def run_subprocess(span_name: str, slots: threading.BoundedSemaphore, cmd: list, **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run() under one of the shared pools, traced as `span_name`.
+
+    The span kind is the part of the name before ":" (node, npm, download).
+    Time spent waiting for a pool slot is recorded as wait_ms.
+    """
+    queued = _time.perf_counter()
+    with slots:
+        wait_ms = round((_time.perf_counter() - queued) * 1000, 1)
+        with TRACER.span(span_name, span_name.split(":", 1)[0], wait_ms=wait_ms) as attrs:
+            result = subprocess.run(cmd, **kwargs)
+            attrs["exit_code"] = result.returncode
+    return result
+
+
+def _is_retryable_error(e: Exception) -> bool:
+    """True for transient API failures (timeouts, rate limits, overload, 5xx, network)."""
+    error_str = str(e).lower()
+    return any(term in error_str for term in [
+        'timeout', 'rate_limit', 'overloaded', '529', '503', '500',
+        'connection', 'network'
+    ])
+
+
+def _usage_attributes(entry: dict | None) -> dict:
+    """Span attributes from a TokenUsageLedger entry: tokens and share of the max_tokens budget used."""
+    if not entry:
+        return {}
+    attrs = {k: entry[k] for k in ("input_tokens", "output_tokens",
+                                   "cache_read_input_tokens", "cache_creation_input_tokens")}
+    if entry.get("max_tokens"):
+        attrs["budget_used"] = round(entry["output_tokens"] / entry["max_tokens"], 3)
+    return attrs
+
+
+def call_claude_with_retry(client, messages, max_tokens, model=None, system=None, label=None, **kwargs):
+    """Call Claude API with timeout and exponential backoff retry.
 
-def call_claude_with_retry(client, messages, max_tokens, model=None, system=None, **kwargs):
-    """Call Claude API with timeout and exponential backoff retry."""
+    Responses are served from / stored in LLM_CACHE when the request is
+    byte-identical to an earlier one. Live calls are recorded in TOKEN_USAGE
+    under `label`.
+    """
     model = model or MODELS.get("section", "claude-sonnet-4-5-20250929")
     call_kwargs = {
         "model": model,
@@ -96,62 +488,171 @@ def call_claude_with_retry(client, messages, max_tokens, model=None, system=None
         call_kwargs["system"] = system
     call_kwargs.update(kwargs)
 
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = client.messages.create(
-                timeout=TIMEOUT_SECONDS,
-                **call_kwargs
-            )
-            return response
-        except Exception as e:
-            error_str = str(e).lower()
-            is_retryable = any(term in error_str for term in [
-                'timeout', 'rate_limit', 'overloaded', '529', '503', '500',
-                'connection', 'network'
-            ])
-            if not is_retryable or attempt == MAX_RETRIES - 1:
-                raise
-            wait = (2 ** attempt) * 5  # 5s, 10s, 20s
-            print(f"  ⚠ API call failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
-            print(f"  Retrying in {wait}s...")
-            _time.sleep(wait)
+    cache_key = LLMResponseCache.key(call_kwargs)
+    with TRACER.span(f"llm:{label or 'call'}", "llm", model=model, max_tokens=max_tokens) as attrs:
+        cached = LLM_CACHE.get(cache_key)
+        attrs["cached"] = cached is not None
+        if cached is not None:
+            return cached
+
+        for attempt in range(MAX_RETRIES):
+            attrs["retries"] = attempt
+            try:
+                with LLM_SLOTS:
+                    response = client.messages.create(
+                        timeout=TIMEOUT_SECONDS,
+                        **call_kwargs
+                    )
+                LLM_CACHE.put(cache_key, response)
+                attrs.update(_usage_attributes(TOKEN_USAGE.record(response, label=label, max_tokens=max_tokens)))
+                attrs["stop_reason"] = response.stop_reason
+                return response
+            except Exception as e:
+                if not _is_retryable_error(e) or attempt == MAX_RETRIES - 1:
+                    raise
+                wait = (2 ** attempt) * 5  # 5s, 10s, 20s
+                print(f"  ⚠ API call failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
+                print(f"  Retrying in {wait}s...")
+                _time.sleep(wait)
 
     raise RuntimeError(f"Claude API failed after {MAX_RETRIES} retries")
 
 
-def save_checkpoint(output_dir: Path, stage: str, project_name: str, data: dict = None):
-    """Save pipeline progress checkpoint after each stage."""
-    checkpoint = {
-        "project": project_name,
-        "stage": stage,
-        "timestamp": datetime.now().isoformat(),
-        "data": data or {}
-    }
+# Pipeline stage graph: stage → (dependencies, what it produces). A stage
+# starts as soon as its dependencies finish (see _run_pipeline), so the site
+# scaffold, npm install and asset downloads overlap section generation.
+PIPELINE_STAGES = {
+    "extract":         ((), "--from-url: preset, brief, extraction dir, site-spec; else brief + preset"),
+    "identify":        (("extract",), "pattern identification (identification.json)"),
+    "scaffold":        (("identify",), "scaffold.md → sections list"),
+    "contexts":        (("scaffold",), "per-section animation, asset and injected component blocks"),
+    "sections":        (("contexts",), "sections/*.tsx"),
+    "assemble":        (("sections",), "page.tsx"),
+    "review":          (("assemble",), "consistency review"),
+    "validate":        (("review",), "pre-flight validation result"),
+    "deploy-scaffold": (("identify",), "site/ config files, globals.css, layout.tsx, lib/"),
+    "deploy-install":  (("deploy-scaffold",), "site/node_modules"),
+    "assets":          (("deploy-scaffold",), "site/public/ images"),
+    "lottie":          (("deploy-scaffold",), "site/public/lottie/ + lottie-manifest.json"),
+    "deploy":          (("validate", "deploy-install", "lottie"), "site/ sections, components and page.tsx"),
+}
+
+# Recomputed from their inputs whenever needed: never skipped, never checkpointed
+DERIVED_STAGES = {"extract", "identify", "contexts", "validate", "deploy-scaffold", "deploy-install", "assets", "lottie"}
+
+# Stages that only run with --deploy
+SITE_STAGES = {"validate", "deploy-scaffold", "deploy-install", "assets", "lottie", "deploy"}
+
+# Stages that may fail without failing the build
+OPTIONAL_STAGES = {"assets"}
+
+
+def stage_ancestors(stage: str) -> set[str]:
+    """Every stage `stage` depends on, directly or transitively."""
+    seen, todo = set(), list(PIPELINE_STAGES[stage][0])
+    while todo:
+        dep = todo.pop()
+        if dep not in seen:
+            seen.add(dep)
+            todo.extend(PIPELINE_STAGES[dep][0])
+    return seen
+
+
+def plan_stages(
+    targets: list[str],
+    skip_to: str | None = None,
+    only: list[str] | None = None,
+    completed: set[str] | None = None,
+) -> dict[str, str]:
+    """Decide for each stage the targets need whether to "run" it or "load" its outputs from disk.
+
+    `only` runs just those stages; `skip_to` loads every stage upstream of it;
+    `completed` (--resume) loads stages the checkpoint lists as done. Derived
+    stages always run. Returns {stage: action} in graph order.
+    """
+    needed = set(targets).union(*(stage_ancestors(t) for t in targets))
+    upstream = stage_ancestors(skip_to) if skip_to else set()
+    plan = {}
+    for stage in PIPELINE_STAGES:
+        if stage not in needed:
+            continue
+        if stage in DERIVED_STAGES:
+            plan[stage] = "run"
+        elif only:
+            plan[stage] = "run" if stage in only else "load"
+        elif skip_to:
+            plan[stage] = "load" if stage in upstream else "run"
+        elif completed is not None:
+            plan[stage] = "load" if stage in completed else "run"
+        else:
+            plan[stage] = "run"
+    return plan
+
+
+_checkpoint_lock = threading.Lock()
+
+
+def completed_stages(cp: dict) -> set[str]:
+    """Stages a checkpoint records as complete.
+
+    Checkpoints written before the stage graph only name the last stage; it
+    and everything upstream of it count as complete, except a "sections"
+    checkpoint whose completed_sections does not cover section_count.
+    """
+    if "completed" in cp:
+        return set(cp["completed"])
+    stage = cp.get("stage", "")
+    if stage not in PIPELINE_STAGES:
+        return set()
+    done = {stage} | stage_ancestors(stage)
+    data = cp.get("data") or {}
+    completed = data.get("completed_sections")
+    if stage == "sections" and completed is not None and len(completed) < data.get("section_count", 0):
+        done.discard("sections")
+    return done
+
+
+def save_checkpoint(output_dir: Path, stage: str, project_name: str, data: dict = None, complete: bool = False):
+    """Save pipeline progress checkpoint.
+
+    `stage` and `data` record the latest progress (stage_sections saves after
+    every section). With `complete`, `stage` is also added to the completed
+    stages that --resume and --skip-to check.
+    """
     checkpoint_file = output_dir / "checkpoint.json"
-    output_dir.mkdir(parents=True, exist_ok=True)
-    tmp = checkpoint_file.with_suffix('.json.tmp')
-    tmp.write_text(json.dumps(checkpoint, indent=2, default=str), encoding="utf-8")
-    tmp.rename(checkpoint_file)
+    with _checkpoint_lock:
+        completed = []
+        if checkpoint_file.exists():
+            try:
+                previous = json.loads(checkpoint_file.read_text(encoding="utf-8"))
+                completed = (list(previous["completed"]) if "completed" in previous
+                             else sorted(completed_stages(previous)))
+            except (json.JSONDecodeError, OSError):
+                completed = []
+        if complete and stage not in completed:
+            completed.append(stage)
+        checkpoint = {
+            "project": project_name,
+            "stage": stage,
+            "timestamp": datetime.now().isoformat(),
+            "data": data or {},
+            "completed": completed,
+        }
+        output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = checkpoint_file.with_suffix('.json.tmp')
+        tmp.write_text(json.dumps(checkpoint, indent=2, default=str), encoding="utf-8")
+        tmp.rename(checkpoint_file)
     print(f"  ✓ Checkpoint saved: stage={stage}")
 
 
 def load_checkpoint(project_name: str) -> dict | None:
     """Load checkpoint for a project if it exists."""
-    checkpoint_file = ROOT / "output" / project_name / "checkpoint.json"
+    checkpoint_file = OUTPUT_DIR / project_name / "checkpoint.json"
     if checkpoint_file.exists():
         return json.loads(checkpoint_file.read_text(encoding="utf-8"))
     return None
 
 
-# Stage order for --skip-to vs checkpoint validation
-STAGE_ORDER = ["extract", "identify", "scaffold", "sections", "assemble", "review", "deploy"]
-
-
-def _stage_index(stage: str) -> int:
-    """Return index of stage in pipeline order; -1 if unknown."""
-    return STAGE_ORDER.index(stage) if stage in STAGE_ORDER else -1
-
-
 # --- File Helpers ---
 
 def read_file(path: Path) -> str:
@@ -169,6 +670,27 @@ def write_file(path: Path, content: str):
     print(f"  → Saved: {path.relative_to(ROOT)}")
 
 
+def write_file_if_changed(path: Path, content: str) -> bool:
+    """Write content only if it differs from what is on disk. Returns True if written.
+
+    Leaves mtimes of unchanged files alone so Next.js dev/HMR and incremental
+    builds only see the sections that were actually regenerated.
+    """
+    if path.exists() and path.read_text(encoding="utf-8") == content:
+        return False
+    write_file(path, content)
+    return True
+
+
+def read_preset(name: str) -> Preset:
+    """Load the parsed preset skills/presets/{name}.md (exits like read_file if missing)."""
+    try:
+        return load_preset(name, SKILLS_DIR / "presets")
+    except FileNotFoundError:
+        print(f"Error: File not found: {SKILLS_DIR / 'presets' / f'{name}.md'}")
+        sys.exit(1)
+
+
 def list_presets() -> list[str]:
     """List available preset names."""
     preset_dir = SKILLS_DIR / "presets"
@@ -180,7 +702,13 @@ def list_presets() -> list[str]:
 
 # --- Claude API ---
 
-def call_claude(prompt: str, stage: str, max_tokens_override: int | None = None) -> str:
+def call_claude(
+    prompt: str,
+    stage: str,
+    max_tokens_override: int | None = None,
+    system: str | list[dict] | None = None,
+    label: str | None = None,
+) -> str:
     """Call the Anthropic API and return the response text."""
     client = Anthropic()
     budget = max_tokens_override if max_tokens_override else MAX_TOKENS[stage]
@@ -189,6 +717,8 @@ def call_claude(prompt: str, stage: str, max_tokens_override: int | None = None)
         messages=[{"role": "user", "content": prompt}],
         max_tokens=budget,
         model=MODELS[stage],
+        system=system,
+        label=label or stage,
     )
     text_parts = [
         block.text for block in message.content if block.type == "text"
@@ -196,32 +726,538 @@ def call_claude(prompt: str, stage: str, max_tokens_override: int | None = None)
     return "\n".join(text_parts)
 
 
+def call_claude_stream(
+    prompt: str,
+    stage: str,
+    sink,
+    max_tokens_override: int | None = None,
+    system: str | list[dict] | None = None,
+    label: str | None = None,
+) -> tuple[str, dict]:
+    """Stream a Claude response into `sink` as tokens arrive.
+
+    `sink` needs feed(text) and reset() (called before a retry). Returns the
+    full response text and timing stats: ttft, seconds, output_tokens,
+    tokens_per_sec, cached.
+    """
+    budget = max_tokens_override if max_tokens_override else MAX_TOKENS[stage]
+    call_kwargs = {
+        "model": MODELS[stage],
+        "max_tokens": budget,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    if system:
+        call_kwargs["system"] = system
+
+    cache_key = LLMResponseCache.key(call_kwargs)
+    with TRACER.span(f"llm:{label or stage}", "llm", model=MODELS[stage], max_tokens=budget, stream=True) as attrs:
+        cached = LLM_CACHE.get(cache_key)
+        attrs["cached"] = cached is not None
+        if cached is not None:
+            text = "\n".join(block.text for block in cached.content if block.type == "text")
+            sink.feed(text)
+            return text, {"ttft": 0.0, "seconds": 0.0, "output_tokens": 0, "tokens_per_sec": 0.0, "cached": True}
+
+        client = Anthropic()
+        for attempt in range(MAX_RETRIES):
+            attrs["retries"] = attempt
+            ttft = None
+            try:
+                with LLM_SLOTS:
+                    start = _time.monotonic()
+                    with client.messages.stream(timeout=TIMEOUT_SECONDS, **call_kwargs) as stream:
+                        for text in stream.text_stream:
+                            if ttft is None:
+                                ttft = _time.monotonic() - start
+                            sink.feed(text)
+                        message = stream.get_final_message()
+            except Exception as e:
+                if not _is_retryable_error(e) or attempt == MAX_RETRIES - 1:
+                    raise
+                wait = (2 ** attempt) * 5
+                print(f"  ⚠ API stream failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
+                print(f"  Retrying in {wait}s...")
+                sink.reset()
+                _time.sleep(wait)
+                continue
+
+            LLM_CACHE.put(cache_key, message)
+            attrs.update(_usage_attributes(TOKEN_USAGE.record(message, label=label or stage, max_tokens=budget)))
+            attrs["stop_reason"] = message.stop_reason
+            seconds = _time.monotonic() - start
+            ttft = ttft if ttft is not None else seconds
+            attrs["ttft_ms"] = round(ttft * 1000, 1)
+            output_tokens = message.usage.output_tokens
+            gen_seconds = seconds - ttft
+            return (
+                "\n".join(block.text for block in message.content if block.type == "text"),
+                {
+                    "ttft": ttft,
+                    "seconds": seconds,
+                    "output_tokens": output_tokens,
+                    "tokens_per_sec": output_tokens / gen_seconds if gen_seconds > 0 else 0.0,
+                    "cached": False,
+                },
+            )
+
+    raise RuntimeError(f"Claude API failed after {MAX_RETRIES} retries")
+
+
 QUALITY_DIR = ROOT / "scripts" / "quality"
 SITE_DIR_NAME = "site"  # Rendered Next.js project lives at output/{project}/site/
 
 
+# --- Node Worker ---
+
+NODE_WORKER_SCRIPT = QUALITY_DIR / "injector-worker.js"
+NODE_WORKER_TIMEOUT = 30       # Default per-call timeout (seconds)
+NODE_WORKER_MAX_RESTARTS = 3   # Crash/timeout restarts before giving up for the run
+NODE_WORKER_COUNT = 1          # Workers started on demand (raised by orchestrate_batch.py)
+NODE_INLINE_PARAMS_LIMIT = 1 << 20  # Larger params go through a temp file, not the request line
+
+
+class NodeWorkerError(RuntimeError):
+    """Raised when a Node worker call fails, times out, or the worker is unavailable."""
+
+
+class NodeWorker:
+    """Long-lived Node.js process serving injector calls over line-delimited JSON-RPC.
+
+    One worker is started per pipeline run (see get_node_worker()), so the
+    scripts/quality/lib modules and registry JSON are loaded once instead of
+    once per `node -e` call. Calls are thread-safe. A call that exceeds its
+    timeout kills the worker; the next call restarts it.
+
+    Params over NODE_INLINE_PARAMS_LIMIT are written to a temp file and sent
+    as {"paramsFile": path}; data already on disk is best passed as
+    json_ref(path) so it is never serialized at all.
+    """
+
+    def __init__(self, script: Path = NODE_WORKER_SCRIPT, max_restarts: int = NODE_WORKER_MAX_RESTARTS):
+        self.script = script
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self._proc = None
+        self._next_id = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stderr_tail = deque(maxlen=40)
+
+    def _start(self):
+        self._proc = subprocess.Popen(
+            ["node", str(self.script)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding="utf-8", bufsize=1,
+            cwd=str(QUALITY_DIR),
+        )
+        proc = self._proc
+        threading.Thread(target=self._read_stdout, args=(proc,), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(proc,), daemon=True).start()
+
+    def _read_stdout(self, proc):
+        for line in proc.stdout:
+            try:
+                msg = json.loads(line)
+            except json.JSONDecodeError:
+                self._stderr_tail.append(f"[bad response] {line[:200]}")
+                continue
+            with self._lock:
+                waiter = self._pending.pop(msg.get("id"), None)
+            if waiter:
+                waiter["response"] = msg
+                waiter["event"].set()
+        # EOF — worker exited; fail everything still waiting on this process
+        with self._lock:
+            orphaned = [w for w in self._pending.values() if w["proc"] is proc]
+            for w in orphaned:
+                self._pending.pop(w["id"], None)
+        for w in orphaned:
+            w["response"] = {"error": {"message": f"Node worker exited (code {proc.poll()})"}}
+            w["event"].set()
+
+    def _read_stderr(self, proc):
+        for line in proc.stderr:
+            self._stderr_tail.append(line.rstrip())
+
+    def _ensure_running(self):
+        if self._proc is not None and self._proc.poll() is None:
+            return
+        if self._proc is not None:
+            if self.restarts >= self.max_restarts:
+                raise NodeWorkerError(f"Node worker restarted {self.restarts} times, giving up")
+            self.restarts += 1
+            print(f"  ⚠ Node worker exited — restarting ({self.restarts}/{self.max_restarts})")
+        try:
+            self._start()
+        except OSError as e:
+            raise NodeWorkerError(f"Could not start Node worker: {e}") from e
+
+    def call(self, method: str, *params, timeout: float = NODE_WORKER_TIMEOUT):
+        """Call a worker method and return its result. Raises NodeWorkerError on failure."""
+        with TRACER.span(f"node:{method}", "node", restarts=self.restarts):
+            return self._call(method, *params, timeout=timeout)
+
+    def _call(self, method: str, *params, timeout: float):
+        params_json = json.dumps(list(params))
+        params_file = None
+        if len(params_json) > NODE_INLINE_PARAMS_LIMIT:
+            fd, params_file = tempfile.mkstemp(prefix="web-builder-params-", suffix=".json")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(params_json)
+            payload = f'"paramsFile": {json.dumps(params_file)}'
+        else:
+            payload = f'"params": {params_json}'
+        try:
+            return self._send(method, payload, timeout)
+        finally:
+            if params_file:
+                Path(params_file).unlink(missing_ok=True)
+
+    def _send(self, method: str, payload: str, timeout: float):
+        with self._lock:
+            self._ensure_running()
+            self._next_id += 1
+            waiter = {"id": self._next_id, "proc": self._proc, "event": threading.Event(), "response": None}
+            self._pending[waiter["id"]] = waiter
+            request = f'{{"id": {waiter["id"]}, "method": {json.dumps(method)}, {payload}}}'
+            try:
+                self._proc.stdin.write(request + "\n")
+                self._proc.stdin.flush()
+            except OSError as e:
+                self._pending.pop(waiter["id"], None)
+                raise NodeWorkerError(f"Could not write to Node worker: {e}") from e
+
+        if not waiter["event"].wait(timeout):
+            with self._lock:
+                self._pending.pop(waiter["id"], None)
+                if waiter["proc"] is self._proc:
+                    self._proc.kill()
+            raise NodeWorkerError(f"{method} timed out after {timeout}s")
+
+        response = waiter["response"]
+        if "error" in response:
+            raise NodeWorkerError(f"{method}: {response['error'].get('message', 'unknown error')}")
+        return response.get("result")
+
+    def pending(self) -> int:
+        """Number of calls waiting on this worker."""
+        with self._lock:
+            return len(self._pending)
+
+    def stderr_tail(self, chars: int = 300) -> str:
+        """Return the last `chars` characters the worker wrote to stderr."""
+        return "\n".join(self._stderr_tail)[-chars:]
+
+    def close(self):
+        """Stop the worker process."""
+        with self._lock:
+            proc, self._proc = self._proc, None
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+
+
+def json_ref(path: Path) -> dict:
+    """Worker param replaced by the parsed contents of `path`, read in Node (cached by mtime)."""
+    return {"$json": str(path)}
+
+
+def run_node_script(span_name: str, slots: threading.BoundedSemaphore, script: str,
+                    payload, **kwargs) -> subprocess.CompletedProcess:
+    """Run a one-off `node -e` script with its input as JSON on stdin.
+
+    The script reads the payload with JSON.parse(fs.readFileSync(0, 'utf-8')),
+    so data never has to be quoted into the script source.
+    """
+    return run_subprocess(
+        span_name, slots, ["node", "-e", script],
+        input=json.dumps(payload), capture_output=True, text=True, **kwargs,
+    )
+
+
+_node_workers: list[NodeWorker] = []
+_node_workers_lock = threading.Lock()
+
+
+def get_node_worker() -> NodeWorker:
+    """Return a shared Node worker for this pipeline run, creating one on first use.
+
+    Up to NODE_WORKER_COUNT workers are started on demand; each call goes to
+    the least busy one.
+    """
+    with _node_workers_lock:
+        if not _node_workers:
+            atexit.register(close_node_worker)
+        worker = min(_node_workers, key=NodeWorker.pending, default=None)
+        if worker is None or (worker.pending() and len(_node_workers) < NODE_WORKER_COUNT):
+            worker = NodeWorker()
+            _node_workers.append(worker)
+        return worker
+
+
+def close_node_worker():
+    """Shut down the shared Node workers if any were started."""
+    with _node_workers_lock:
+        workers = list(_node_workers)
+        _node_workers.clear()
+    for worker in workers:
+        worker.close()
+
+
+# --- Dependency Store ---
+
+# Shared node_modules installs, keyed by the dependency set (see npm_store.py)
+NPM_STORE_DIR = OUTPUT_DIR / ".cache" / "npm"
+
+
+def _run_npm(cmd: list, cwd: Path, timeout: int) -> subprocess.CompletedProcess:
+    """npm for NPM_STORE: under the shared IO pool and traced like other subprocesses."""
+    return run_subprocess("npm:install", IO_SLOTS, cmd, capture_output=True, text=True,
+                          cwd=str(cwd), timeout=timeout)
+
+
+NPM_STORE = NodeModulesStore(NPM_STORE_DIR, run=_run_npm, span=TRACER.span)
+
+
+# --- Task Graph ---
+
+class TaskGraphError(RuntimeError):
+    """Raised when a task graph has unknown dependencies or a cycle."""
+
+
+class TaskGraph:
+    """Named tasks run in dependency order, with independent tasks in parallel.
+
+    Each task is fn(results) → result, where `results` holds the results of
+    every task finished so far. A failing optional task is reported and its
+    result is None; tasks depending on it are skipped. A failing required task
+    re-raises once the tasks already running have finished.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.tasks = {}
+
+    def add(self, name: str, fn, deps: tuple[str, ...] = (), optional: bool = False):
+        self.tasks[name] = {"name": name, "fn": fn, "deps": tuple(deps), "optional": optional}
+
+    def run(self) -> dict:
+        unknown = {d for t in self.tasks.values() for d in t["deps"]} - set(self.tasks)
+        if unknown:
+            raise TaskGraphError(f"Unknown task dependencies: {', '.join(sorted(unknown))}")
+
+        results, failed = {}, set()
+        waiting = dict(self.tasks)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while waiting or running:
+                for name, task in list(waiting.items()):
+                    if any(d in failed for d in task["deps"]):
+                        del waiting[name]
+                        if not task["optional"]:
+                            raise TaskGraphError(f"{name}: a dependency failed")
+                        print(f"  ⚠ Skipping {name} (a dependency failed)")
+                        failed.add(name)
+                        results[name] = None
+                    elif all(d in results for d in task["deps"]):
+                        del waiting[name]
+                        # copy_context() keeps CURRENT_PROJECT and the trace parent in the task
+                        future = pool.submit(contextvars.copy_context().run, task["fn"], dict(results))
+                        running[future] = task
+                if not running:
+                    if waiting:
+                        raise TaskGraphError(f"Dependency cycle among: {', '.join(sorted(waiting))}")
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        results[task["name"]] = future.result()
+                    except Exception as e:
+                        if not task["optional"]:
+                            waiting.clear()
+                            raise
+                        print(f"  ⚠ {task['name']} failed ({e}) — continuing without it")
+                        failed.add(task["name"])
+                        results[task["name"]] = None
+        return results
+
+
 # --- URL Extraction Stage ---
 
-def stage_url_extract(url: str, project_name: str) -> tuple[str, str, dict, Path, dict | None]:
+STAGE0_CONCURRENCY = 4  # Stage 0 branches (brief, contexts, site-spec, identify) run at once
+
+# Extraction cache (see ExtractionCache)
+EXTRACTION_CACHE_DIR = OUTPUT_DIR / ".cache" / "extractions"
+EXTRACTION_CACHE_MAX_AGE_HOURS = 24
+EXTRACTION_CACHE_REQUIRED = ("extraction-data.json", "mapped-sections.json", "animation-analysis.json")
+# Scripts whose output lands in an extraction dir; editing any of them invalidates the cache
+EXTRACTOR_SOURCES = (
+    "url-to-preset.js",
+    "lib/extract-reference.js",
+    "lib/design-tokens.js",
+    "lib/archetype-mapper.js",
+    "lib/animation-detector.js",
+)
+TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "mc_cid", "mc_eid")
+
+
+def normalise_url(url: str) -> str:
+    """Canonical form of a reference URL for cache keys.
+
+    Lowercases scheme and host, drops default ports, fragments, tracking
+    parameters and a trailing slash, and sorts the query.
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    return urllib.parse.urlunsplit((scheme, host, path, urllib.parse.urlencode(query), ""))
+
+
+@functools.cache
+def extractor_version() -> str:
+    """Hash of the extractor scripts, so an extractor change misses the cache."""
+    digest = hashlib.sha256()
+    for rel in EXTRACTOR_SOURCES:
+        path = QUALITY_DIR / rel
+        digest.update(rel.encode("utf-8"))
+        digest.update(path.read_bytes() if path.exists() else b"")
+    return digest.hexdigest()[:16]
+
+
+class ExtractionCache:
+    """url-to-preset.js results keyed by normalised URL + extractor version.
+
+    An entry at output/.cache/extractions/<key>/ holds the extraction dir
+    (extraction-data.json, mapped-sections.json, animation-analysis.json,
+    screenshots), the generated preset as preset.md and meta.json. A hit
+    hardlinks the entry into the new extraction dir (downstream steps only
+    read it) and writes the preset under the new project's name, so Stage 0
+    goes straight to the brief and site-spec.
+
+    mode: "on" (read + write), "refresh" (write only, --refresh-extraction).
+    """
+
+    def __init__(self, cache_dir: Path = EXTRACTION_CACHE_DIR,
+                 max_age_hours: float = EXTRACTION_CACHE_MAX_AGE_HOURS, mode: str = "on"):
+        self.cache_dir = cache_dir
+        self.max_age_hours = max_age_hours
+        self.mode = mode
+
+    def key(self, url: str) -> str:
+        return hashlib.sha256(f"{normalise_url(url)}\n{extractor_version()}".encode("utf-8")).hexdigest()[:24]
+
+    def restore(self, url: str, extraction_dir: Path, preset_name: str) -> bool:
+        """Materialise a fresh cached extraction of url. Returns False on a miss."""
+        if self.mode != "on":
+            return False
+        entry = self.cache_dir / self.key(url)
+        try:
+            meta = json.loads((entry / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return False
+        age_hours = (_time.time() - meta.get("created_at", 0)) / 3600
+        if age_hours > self.max_age_hours:
+            print(f"  Extraction cache entry expired ({age_hours:.1f}h old)")
+            return False
+        if not all((entry / "extraction" / name).exists() for name in EXTRACTION_CACHE_REQUIRED):
+            return False
+        link_tree(entry / "extraction", extraction_dir)
+        write_file(SKILLS_DIR / "presets" / f"{preset_name}.md", read_file(entry / "preset.md"))
+        print(f"  ✓ Extraction cache hit ({age_hours:.1f}h old) — skipping Playwright and preset generation")
+        return True
+
+    def store(self, url: str, extraction_dir: Path, preset_name: str):
+        """Save a finished extraction and its preset (replacing any older entry)."""
+        preset_path = SKILLS_DIR / "presets" / f"{preset_name}.md"
+        if not all((extraction_dir / name).exists() for name in EXTRACTION_CACHE_REQUIRED) or not preset_path.exists():
+            return
+        entry = self.cache_dir / self.key(url)
+        tmp = entry.with_name(f"{entry.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        link_tree(extraction_dir, tmp / "extraction")
+        shutil.copy2(preset_path, tmp / "preset.md")
+        (tmp / "meta.json").write_text(json.dumps({
+            "url": url,
+            "normalised_url": normalise_url(url),
+            "extractor_version": extractor_version(),
+            "created_at": _time.time(),
+        }, indent=2), encoding="utf-8")
+        shutil.rmtree(entry, ignore_errors=True)
+        try:
+            tmp.rename(entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)  # a concurrent run stored it first
+
+
+EXTRACTION_CACHE = ExtractionCache()
+
+
+@traced("stage:extract")
+def stage_url_extract(
+    url: str,
+    project_name: str,
+    identify: bool = True,
+) -> tuple[str, str, dict, Path, dict | None, dict | None]:
     """
     Stage 0: Extract from URL and generate preset + brief.
-    Returns (preset_name, brief_content, section_contexts, extraction_dir, site_spec).
+
+    url-to-preset.js runs first and writes the extraction directory (restored
+    from EXTRACTION_CACHE instead when this URL was extracted recently). The brief,
+    section contexts, site-spec and (with `identify`) pattern identification
+    only read that directory, so they then run concurrently. Only the brief is
+    required; the other branches fail independently.
+
+    Returns (preset_name, brief_content, section_contexts, extraction_dir, site_spec, identification).
     """
     print("\n🌐 Stage 0: Extracting from URL...")
     print(f"  URL: {url}")
 
-    node = "node"  # Assumes node is on PATH
-
     # Generate unique extraction ID to prevent race conditions in parallel builds
     extraction_id = f"{project_name}-{uuid.uuid4().hex[:8]}"
     extraction_dir = OUTPUT_DIR / "extractions" / extraction_id
 
     # Step 0a: Run url-to-preset.js → generates preset and extraction data
+    if EXTRACTION_CACHE.restore(url, extraction_dir, project_name):
+        preset_name = project_name
+    else:
+        preset_name = _extract_preset(url, project_name, extraction_dir)
+        EXTRACTION_CACHE.store(url, extraction_dir, preset_name)
+
+    # Steps 0b–0d: everything downstream of the extraction, in parallel
+    print("\n  [0b–0d] Brief, section contexts, site-spec and pattern identification...")
+    graph = TaskGraph(STAGE0_CONCURRENCY)
+    graph.add("brief", lambda _: _extract_brief(url, project_name, extraction_dir))
+    graph.add("section_contexts", lambda _: _extract_section_contexts(extraction_dir), optional=True)
+    graph.add("site_spec", lambda _: _build_site_spec(extraction_dir, project_name), optional=True)
+    if identify and extraction_dir.exists():
+        graph.add("identify", lambda _: stage_identify(extraction_dir, project_name), optional=True)
+    results = graph.run()
+    section_contexts = results["section_contexts"] or {}
+    save_section_contexts(project_name, section_contexts)
+
+    return (preset_name, results["brief"], section_contexts,
+            extraction_dir, results["site_spec"], results.get("identify"))
+
+
+def _extract_preset(url: str, preset_name: str, extraction_dir: Path) -> str:
+    """Step 0a: url-to-preset.js — extraction data plus skills/presets/{preset_name}.md."""
     print("\n  [0a] Generating preset from URL...")
-    preset_name = project_name
     preset_script = QUALITY_DIR / "url-to-preset.js"
-    result = subprocess.run(
-        [node, str(preset_script), url, preset_name,
+    result = run_subprocess(
+        "node:url-to-preset", NODE_SLOTS,
+        ["node", str(preset_script), url, preset_name,
          "--extraction-dir", str(extraction_dir)],
         capture_output=True,
         text=True,
@@ -240,12 +1276,15 @@ def stage_url_extract(url: str, project_name: str) -> tuple[str, str, dict, Path
         print(f"  Error: Preset not generated at {preset_path}")
         sys.exit(1)
     print(f"  ✓ Preset saved: {preset_path.relative_to(ROOT)}")
+    return preset_name
+
 
-    # Step 0b: Run url-to-brief.js → generates brief (reuses extraction data)
-    print("\n  [0b] Generating brief from URL...")
+def _extract_brief(url: str, project_name: str, extraction_dir: Path) -> str:
+    """Step 0b: url-to-brief.js (reuses the extraction data). Returns the brief content."""
     brief_script = QUALITY_DIR / "url-to-brief.js"
-    result = subprocess.run(
-        [node, str(brief_script), url, project_name,
+    result = run_subprocess(
+        "node:url-to-brief", NODE_SLOTS,
+        ["node", str(brief_script), url, project_name,
          "--extraction-dir", str(extraction_dir)],
         capture_output=True,
         text=True,
@@ -263,75 +1302,116 @@ def stage_url_extract(url: str, project_name: str) -> tuple[str, str, dict, Path
     if not brief_path.exists():
         print(f"  Error: Brief not generated at {brief_path}")
         sys.exit(1)
-    brief_content = read_file(brief_path)
     print(f"  ✓ Brief saved: {brief_path.relative_to(ROOT)}")
+    return read_file(brief_path)
 
-    # Step 0c: Load section contexts for per-section injection
-    print("\n  [0c] Loading section context data...")
-    section_contexts = {}
+
+def _extract_section_contexts(extraction_dir: Path) -> dict:
+    """Step 0c: per-section reference context blocks for section prompts."""
     extraction_data_path = extraction_dir / "extraction-data.json"
     mapped_sections_path = extraction_dir / "mapped-sections.json"
+    if not (extraction_data_path.exists() and mapped_sections_path.exists()):
+        print("  ⚠ Extraction data not found, continuing without section contexts")
+        return {}
+    try:
+        section_contexts = get_node_worker().call(
+            "section-context.buildAllSectionContexts",
+            json_ref(extraction_data_path),
+            json_ref(mapped_sections_path),
+        ) or {}
+        print(f"  ✓ Loaded context for {len(section_contexts)} sections")
+        return section_contexts
+    except NodeWorkerError:
+        print("  ⚠ Could not generate section contexts, continuing without them")
+    return {}
 
-    if extraction_data_path.exists() and mapped_sections_path.exists():
-        # Generate section contexts using the Node.js module
-        context_script = f"""
-const {{ buildAllSectionContexts }} = require('./lib/section-context');
-const extractionData = require('{extraction_data_path}');
-const mappedSections = require('{mapped_sections_path}');
-const contexts = buildAllSectionContexts(extractionData, mappedSections);
-console.log(JSON.stringify(contexts));
-"""
-        result = subprocess.run(
-            [node, "-e", context_script],
-            capture_output=True,
-            text=True,
-            cwd=str(QUALITY_DIR),
-            timeout=30,
+
+def resolve_extraction_dir(project_name: str, preset: str | None = None) -> Path | None:
+    """Newest extraction dir a previous --from-url run left for this project (or its preset)."""
+    extraction_base = OUTPUT_DIR / "extractions"
+    if not extraction_base.exists():
+        return None
+    # Try exact project name first, then preset name as fallback
+    search_prefixes = [f"{project_name}-"]
+    if preset and preset != project_name:
+        search_prefixes.append(f"{preset}-")
+    for prefix in search_prefixes:
+        candidates = sorted(
+            [d for d in extraction_base.iterdir()
+             if d.is_dir() and d.name.startswith(prefix)],
+            key=lambda d: d.stat().st_mtime,
+            reverse=True,
         )
-        if result.returncode == 0 and result.stdout.strip():
-            try:
-                section_contexts = json.loads(result.stdout.strip())
-                print(f"  ✓ Loaded context for {len(section_contexts)} sections")
-            except json.JSONDecodeError:
-                print("  ⚠ Could not parse section contexts, continuing without them")
-        else:
-            print("  ⚠ Could not generate section contexts, continuing without them")
-    else:
-        print("  ⚠ Extraction data not found, continuing without section contexts")
+        if candidates:
+            return candidates[0]
+    return None
 
-    # Step 0d: Build site-spec.json (v2.0.0 — deterministic, zero AI calls)
-    site_spec = None
-    print("\n  [0d] Building site-spec.json from extraction data...")
+
+def section_contexts_path(project_name: str) -> Path:
+    return OUTPUT_DIR / project_name / "section-contexts.json"
+
+
+def save_section_contexts(project_name: str, section_contexts: dict):
+    """Persist Step 0c output so --skip-to / --resume / --only-section build the same prompts."""
+    write_file_if_changed(section_contexts_path(project_name),
+                          json.dumps(section_contexts, indent=2, sort_keys=True))
+
+
+def load_section_contexts(project_name: str, extraction_dir: Path | None = None) -> dict:
+    """Section contexts saved by Stage 0, else rebuilt from `extraction_dir` (and saved)."""
+    path = section_contexts_path(project_name)
+    if path.exists():
+        try:
+            section_contexts = json.loads(path.read_text(encoding="utf-8"))
+            print(f"  ✓ section-contexts.json loaded ({len(section_contexts)} sections)")
+            return section_contexts
+        except (json.JSONDecodeError, OSError):
+            print("  ⚠ Could not load section-contexts.json, rebuilding")
+    if not extraction_dir:
+        return {}
+    section_contexts = _extract_section_contexts(extraction_dir)
+    if section_contexts:
+        save_section_contexts(project_name, section_contexts)
+    return section_contexts
+
+
+def _build_site_spec(extraction_dir: Path, project_name: str) -> dict | None:
+    """Step 0d: build-site-spec.js → output/{project}/site-spec.json (deterministic, zero AI calls)."""
     site_spec_script = QUALITY_DIR / "build-site-spec.js"
-    if site_spec_script.exists() and extraction_data_path.exists() and mapped_sections_path.exists():
-        result = subprocess.run(
-            [node, str(site_spec_script), str(extraction_dir), project_name],
-            capture_output=True,
-            text=True,
-            cwd=str(ROOT),
-            timeout=60,
-        )
-        if result.returncode != 0:
-            print(f"  ⚠ build-site-spec.js failed: {result.stderr[:300] if result.stderr else '(no stderr)'}")
-        else:
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    print(f"    {line}")
-            site_spec_path = OUTPUT_DIR / project_name / "site-spec.json"
-            if site_spec_path.exists():
-                try:
-                    site_spec = json.loads(site_spec_path.read_text(encoding="utf-8"))
-                    print(f"  ✓ site-spec.json generated ({len(site_spec.get('sections', []))} sections)")
-                except (json.JSONDecodeError, OSError):
-                    print("  ⚠ Could not parse site-spec.json")
-    else:
+    if not (site_spec_script.exists()
+            and (extraction_dir / "extraction-data.json").exists()
+            and (extraction_dir / "mapped-sections.json").exists()):
         print("  ⚠ build-site-spec.js or extraction data not found, skipping site-spec")
-
-    return preset_name, brief_content, section_contexts, extraction_dir, site_spec
+        return None
+    result = run_subprocess(
+        "node:build-site-spec", NODE_SLOTS,
+        ["node", str(site_spec_script), str(extraction_dir), project_name],
+        capture_output=True,
+        text=True,
+        cwd=str(ROOT),
+        timeout=60,
+    )
+    if result.returncode != 0:
+        print(f"  ⚠ build-site-spec.js failed: {result.stderr[:300] if result.stderr else '(no stderr)'}")
+        return None
+    for line in result.stdout.strip().split('\n'):
+        if line.strip():
+            print(f"    {line}")
+    site_spec_path = OUTPUT_DIR / project_name / "site-spec.json"
+    if not site_spec_path.exists():
+        return None
+    try:
+        site_spec = json.loads(site_spec_path.read_text(encoding="utf-8"))
+        print(f"  ✓ site-spec.json generated ({len(site_spec.get('sections', []))} sections)")
+        return site_spec
+    except (json.JSONDecodeError, OSError):
+        print("  ⚠ Could not parse site-spec.json")
+    return None
 
 
 # --- Pattern Identification Stage (v0.9.0) ---
 
+@traced("stage:identify")
 def stage_identify(extraction_dir: Path, project_name: str) -> dict | None:
     """
     Stage 0d: Run pattern identification on extraction data.
@@ -346,7 +1426,8 @@ def stage_identify(extraction_dir: Path, project_name: str) -> dict | None:
         print("  ⚠ pattern-identifier.js not found, skipping identification")
         return None
 
-    result = subprocess.run(
+    result = run_subprocess(
+        "node:pattern-identifier", NODE_SLOTS,
         [node, str(identifier_script), str(extraction_dir), project_name],
         capture_output=True,
         text=True,
@@ -458,36 +1539,17 @@ def print_gap_summary(project_name: str):
 
 # --- Pipeline Stages ---
 
+@traced("stage:scaffold")
 def stage_scaffold(brief: str, preset: str, project_name: str, no_pause: bool, identification: dict | None = None) -> str:
     """Stage 1: Generate the page scaffold."""
     print("\n📋 Stage 1: Generating scaffold...")
 
     # Load resources
-    scaffold_template = read_file(TEMPLATES_DIR / "scaffold-prompt.md")
-    taxonomy = read_file(SKILLS_DIR / "section-taxonomy.md")
-    preset_content = read_file(SKILLS_DIR / "presets" / f"{preset}.md")
-
-    # Extract section sequence from preset
-    # (Look for the Default Section Sequence block)
-    sequence_match = re.search(
-        r"## Default Section Sequence\n\n```\n(.*?)```",
-        preset_content,
-        re.DOTALL,
-    )
-    preset_sequence = sequence_match.group(1).strip() if sequence_match else "See preset file"
-
-    # Extract just archetype names and variants from taxonomy (keep it concise)
-    archetype_lines = []
-    current_archetype = None
-    for line in taxonomy.split("\n"):
-        if line.startswith("### "):
-            current_archetype = line.replace("### ", "").strip()
-            archetype_lines.append(f"\n{current_archetype}")
-        elif line.startswith("- `") and current_archetype:
-            variant = line.strip().split("`")[1] if "`" in line else line.strip("- ")
-            archetype_lines.append(f"  - {variant}")
+    taxonomy = load_taxonomy(SKILLS_DIR / "section-taxonomy.md")
+    preset_sequence = read_preset(preset).sequence
 
-    archetype_list = "\n".join(archetype_lines)
+    # Just archetype names and variants from the taxonomy (keep it concise)
+    archetype_list = taxonomy.archetype_listing()
 
     # Build the prompt
     prompt = f"""You are a senior web designer creating a page specification for a new website.
@@ -585,19 +1647,29 @@ Keep total sections between 6 and 14."""
 
     # Checkpoint
     if not no_pause:
-        print("─" * 60)
-        response = input("Review the scaffold above. Continue? [Y/n/edit]: ").strip().lower()
-        if response == "n":
-            print("Aborted. Edit the scaffold manually and rerun with --no-pause.")
-            sys.exit(0)
-        elif response == "edit":
-            print(f"Edit the scaffold at: {output_path}")
-            input("Press Enter when done editing...")
-            scaffold = read_file(output_path)
+        scaffold = review_scaffold(project_name)
 
     return scaffold
 
 
+def review_scaffold(project_name: str) -> str:
+    """Interactive scaffold checkpoint: continue, abort, or wait for a manual edit.
+
+    Reads from stdin, so the pipeline calls it between task graphs, never
+    while other stages are running and printing.
+    """
+    output_path = OUTPUT_DIR / project_name / "scaffold.md"
+    print("─" * 60)
+    response = input("Review the scaffold above. Continue? [Y/n/edit]: ").strip().lower()
+    if response == "n":
+        print("Aborted. Edit the scaffold manually and rerun with --no-pause.")
+        sys.exit(0)
+    elif response == "edit":
+        print(f"Edit the scaffold at: {output_path}")
+        input("Press Enter when done editing...")
+    return read_file(output_path)
+
+
 def parse_scaffold(scaffold: str) -> list[dict]:
     """Parse the scaffold into a list of section specifications."""
     sections = []
@@ -622,6 +1694,7 @@ def parse_scaffold(scaffold: str) -> list[dict]:
     return sections
 
 
+@traced("stage:scaffold")
 def stage_scaffold_v2(site_spec: dict, project_name: str) -> tuple:
     """Stage 1 (v2): Produce section list from site-spec.json. No Claude call needed."""
     print("\n  Stage 1 (v2): Building scaffold from site-spec.json...")
@@ -660,7 +1733,7 @@ def stage_scaffold_v2(site_spec: dict, project_name: str) -> tuple:
     scaffold_text = "\n".join(scaffold_lines)
 
     # Save scaffold for reference
-    output_dir = Path(f"output/{project_name}")
+    output_dir = OUTPUT_DIR / project_name
     output_dir.mkdir(parents=True, exist_ok=True)
     (output_dir / "scaffold.md").write_text(
         f"# Scaffold (v2 - from site-spec.json)\n\n{scaffold_text}\n"
@@ -673,318 +1746,248 @@ def stage_scaffold_v2(site_spec: dict, project_name: str) -> tuple:
     return scaffold_text, sections
 
 
-def extract_style_header(preset_content: str) -> str:
-    """Extract the compact style header from a preset file."""
-    match = re.search(
-        r"(═══ STYLE CONTEXT ═══.*?═══════════════════════)",
-        preset_content,
-        re.DOTALL,
-    )
-    if match:
-        return match.group(1)
-    return "[Style header not found in preset — check preset format]"
-
+def load_injection_data(extraction_dir: Path | None) -> tuple[Path | None, Path | None]:
+    """Locate animation-analysis.json and extraction-data.json in the extraction directory.
 
-def load_injection_data(extraction_dir: Path | None) -> tuple[dict | None, dict | None]:
-    """Load animation analysis and extraction data from the extraction directory."""
+    Returns paths rather than parsed data: the injectors read them in the Node
+    worker (see json_ref), so multi-megabyte extractions are never re-serialized.
+    """
     if not extraction_dir or not extraction_dir.exists():
         return None, None
-
-    animation_analysis = None
-    extraction_data = None
-
     anim_path = extraction_dir / "animation-analysis.json"
-    if anim_path.exists():
-        try:
-            animation_analysis = json.loads(anim_path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
-            print("  ⚠ Could not load animation-analysis.json")
-
     extract_path = extraction_dir / "extraction-data.json"
-    if extract_path.exists():
-        try:
-            extraction_data = json.loads(extract_path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
-            print("  ⚠ Could not load extraction-data.json")
-
-    return animation_analysis, extraction_data
-
-
-def call_injector(script: str, args_json: str) -> dict | None:
-    """Call a Node.js injection module and return parsed JSON result."""
-    node_script = f"""
-const mod = require('./lib/{script}');
-const args = JSON.parse('{args_json.replace("'", "\\'")}');
-const result = mod.fn(args);
-console.log(JSON.stringify(result));
-"""
-    # We'll call each injector's exported function directly via inline script
-    result = subprocess.run(
-        ["node", "-e", node_script],
-        capture_output=True, text=True,
-        cwd=str(QUALITY_DIR), timeout=30,
-    )
-    if result.returncode == 0 and result.stdout.strip():
-        try:
-            return json.loads(result.stdout.strip())
-        except json.JSONDecodeError:
-            return None
-    return None
+    return (anim_path if anim_path.exists() else None,
+            extract_path if extract_path.exists() else None)
 
 
 def get_animation_contexts(
-    animation_analysis: dict | None,
+    animation_analysis: dict | Path | None,
     preset_content: str,
     sections: list[dict],
     identification: dict | None = None,
 ) -> dict:
-    """Call animation-injector.js to get per-section animation context."""
-    node_script = f"""
-const {{ buildAllAnimationContexts }} = require('./lib/animation-injector');
-const animAnalysis = {json.dumps(animation_analysis) if animation_analysis else 'null'};
-const presetContent = {json.dumps(preset_content)};
-const sections = {json.dumps(sections)};
-const identification = {json.dumps(identification) if identification else 'null'};
-const result = buildAllAnimationContexts(animAnalysis, presetContent, sections, identification);
-console.log(JSON.stringify(result));
-"""
-    result = subprocess.run(
-        ["node", "-e", node_script],
-        capture_output=True, text=True,
-        cwd=str(QUALITY_DIR), timeout=30,
-    )
-    if result.returncode == 0 and result.stdout.strip():
-        try:
-            return json.loads(result.stdout.strip())
-        except json.JSONDecodeError:
-            print("  ⚠ Could not parse animation injection results")
-    else:
-        if result.stderr:
-            print(f"  ⚠ Animation injector error: {result.stderr[-300:]}")
+    """Call animation-injector.js to get per-section animation context.
+
+    `animation_analysis` may be a path to animation-analysis.json, read in Node.
+    """
+    if isinstance(animation_analysis, Path):
+        animation_analysis = json_ref(animation_analysis)
+    worker = get_node_worker()
+    try:
+        return worker.call(
+            "animation-injector.buildAllAnimationContexts",
+            animation_analysis, preset_content, sections, identification,
+        ) or {}
+    except NodeWorkerError as e:
+        print(f"  ⚠ Animation injector error: {e}")
+        if worker.stderr_tail():
+            print(f"    {worker.stderr_tail()}")
     return {}
 
 
 def get_asset_contexts(
-    extraction_data: dict | None,
+    extraction_data: dict | Path | None,
     sections: list[dict],
 ) -> dict:
-    """Call asset-injector.js to get per-section asset context."""
+    """Call asset-injector.js to get per-section asset context.
+
+    `extraction_data` may be a path to extraction-data.json, read in Node.
+    """
     if not extraction_data:
         return {}
+    if isinstance(extraction_data, Path):
+        extraction_data = json_ref(extraction_data)
 
-    node_script = f"""
-const {{ buildAllAssetContexts }} = require('./lib/asset-injector');
-const extractionData = {json.dumps(extraction_data)};
-const sections = {json.dumps(sections)};
-const result = buildAllAssetContexts(extractionData, sections);
-console.log(JSON.stringify(result));
-"""
-    result = subprocess.run(
-        ["node", "-e", node_script],
-        capture_output=True, text=True,
-        cwd=str(QUALITY_DIR), timeout=30,
-    )
-    if result.returncode == 0 and result.stdout.strip():
-        try:
-            return json.loads(result.stdout.strip())
-        except json.JSONDecodeError:
-            print("  ⚠ Could not parse asset injection results")
-    else:
-        if result.stderr:
-            print(f"  ⚠ Asset injector error: {result.stderr[-300:]}")
+    worker = get_node_worker()
+    try:
+        return worker.call("asset-injector.buildAllAssetContexts", extraction_data, sections) or {}
+    except NodeWorkerError as e:
+        print(f"  ⚠ Asset injector error: {e}")
+        if worker.stderr_tail():
+            print(f"    {worker.stderr_tail()}")
     return {}
 
 
-def get_icon_context(
-    archetype: str,
-    section_index: int,
-    extracted_icons: list | None = None,
-) -> str:
-    """Call icon-mapper.js to get Lucide React icon context block for a section."""
-    node_script = f"""
-const {{ buildIconContextBlock }} = require('./lib/icon-mapper');
-const result = buildIconContextBlock({json.dumps(archetype)}, {section_index}, {json.dumps(extracted_icons or [])});
-console.log(result);
-"""
-    try:
-        result = subprocess.run(
-            ["node", "-e", node_script],
-            capture_output=True, text=True,
-            cwd=str(QUALITY_DIR), timeout=10,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return result.stdout.strip()
-    except (subprocess.TimeoutExpired, OSError):
-        pass
-    return ""
+# Variants that render a grid of cards (visual fallback uses per-card components)
+CARD_GRID_VARIANTS = (
+    "demo-cards", "feature-cards", "benefit-cards", "grid", "card-grid",
+    "three-column", "four-column", "bento-grid",
+)
 
 
-def get_visual_fallback(
-    archetype: str,
-    section_index: int,
-    is_card_grid: bool = False,
-    card_count: int = 0,
-) -> dict:
-    """Call asset-injector.js getVisualFallback() for sections without images."""
-    node_script = f"""
-const {{ getVisualFallback }} = require('./lib/asset-injector');
-const result = getVisualFallback({json.dumps(archetype)}, {section_index}, {json.dumps(is_card_grid)}, {card_count});
-console.log(JSON.stringify(result));
-"""
+def _ui_search_index() -> dict | None:
+    """Worker param for UI component matching: the compiled registry index (rebuilt
+    here if the registry JSON changed), else the JSON search index."""
     try:
-        result = subprocess.run(
-            ["node", "-e", node_script],
-            capture_output=True, text=True,
-            cwd=str(QUALITY_DIR), timeout=10,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return json.loads(result.stdout.strip())
-    except (subprocess.TimeoutExpired, json.JSONDecodeError, OSError):
-        pass
-    return {"block": "", "componentFiles": []}
+        return {"$registryIndex": str(ensure_registry_index(REGISTRY_INDEX_PATH))}
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"  ⚠ Registry index unavailable ({e}) — using the JSON search index")
+    search_index_path = SKILLS_DIR / "animation-components" / "registry" / "animation_search_index.json"
+    return json_ref(search_index_path) if search_index_path.exists() else None
 
 
-def get_card_embedded_demos(detected_plugins: list) -> dict:
-    """Call animation-injector.js buildCardEmbeddedDemos() for plugin demo cards."""
-    node_script = f"""
-const {{ buildCardEmbeddedDemos }} = require('./lib/animation-injector');
-const result = buildCardEmbeddedDemos({json.dumps(detected_plugins)});
-console.log(JSON.stringify(result));
-"""
-    try:
-        result = subprocess.run(
-            ["node", "-e", node_script],
-            capture_output=True, text=True,
-            cwd=str(QUALITY_DIR), timeout=10,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return json.loads(result.stdout.strip())
-    except (subprocess.TimeoutExpired, json.JSONDecodeError, OSError):
-        pass
-    return {"block": "", "componentFiles": []}
+def section_block_requests(
+    sections: list[dict],
+    asset_contexts: dict,
+    identification: dict | None = None,
+) -> list[dict]:
+    """Decide which optional prompt blocks each section needs (see get_section_blocks)."""
+    identification = identification or {}
+    has_plugins = bool(identification.get("detectedPlugins"))
+    section_mapping = identification.get("sectionMapping", {})
+    requests = []
+    for i, section in enumerate(sections):
+        # Visual content fallback only when no images were extracted for this section
+        asset_block = asset_contexts.get(str(i), {}).get("assetContext", "")
+        has_asset_images = bool(asset_block and ("backgroundImage" in asset_block or "image" in asset_block.lower()))
+        visual_fallback = None
+        if not has_asset_images:
+            is_card_grid = section["variant"] in CARD_GRID_VARIANTS
+            visual_fallback = {"isCardGrid": is_card_grid, "cardCount": 6 if is_card_grid else 0}
+
+        requests.append({
+            "index": i,
+            "archetype": section["archetype"],
+            "visualFallback": visual_fallback,
+            # Card embedded animation demos (PRODUCT-SHOWCASE demo-cards)
+            "cardDemos": (section["archetype"].upper() == "PRODUCT-SHOWCASE"
+                          and "demo" in section.get("variant", "").lower() and has_plugins),
+            "uiPatterns": section_mapping.get(str(i), {}).get("uiComponents", []),
+        })
+    return requests
 
 
-def get_ui_component_matches(
-    detected_patterns: list,
-    search_index_path: Path | None = None,
+def get_section_blocks(
+    sections: list[dict],
+    asset_contexts: dict,
+    identification: dict | None = None,
 ) -> dict:
-    """Call pattern-identifier.js matchUIComponents() + buildUIComponentBlock()."""
-    search_index_load = "null"
-    if search_index_path and search_index_path.exists():
-        search_index_load = f"require('{search_index_path}')"
-
-    node_script = f"""
-const {{ matchUIComponents, buildUIComponentBlock }} = require('./lib/pattern-identifier');
-const searchIndex = {search_index_load};
-const matches = matchUIComponents({json.dumps(detected_patterns)}, searchIndex);
-const result = buildUIComponentBlock(matches);
-result.matches = matches;
-console.log(JSON.stringify(result));
-"""
+    """Build the icon, visual fallback, card demo and UI component blocks for every
+    section in one worker call (buildAllSectionBlocks in injector-worker.js).
+
+    Returns {str(index): {"iconBlock", "visualFallback", "cardDemos", "uiComponents"}};
+    the last three are {"block", "componentFiles"} dicts. Empty on failure.
+    """
+    if not sections:
+        return {}
+    requests = section_block_requests(sections, asset_contexts, identification)
+    identification = identification or {}
+    icon_lib = identification.get("iconLibrary", {})
+    extracted_icons = icon_lib.get("icons", []) if isinstance(icon_lib, dict) else []
+    search_index = _ui_search_index() if any(r["uiPatterns"] for r in requests) else None
+
+    worker = get_node_worker()
     try:
-        result = subprocess.run(
-            ["node", "-e", node_script],
-            capture_output=True, text=True,
-            cwd=str(QUALITY_DIR), timeout=10,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return json.loads(result.stdout.strip())
-    except (subprocess.TimeoutExpired, json.JSONDecodeError, OSError):
-        pass
-    return {"block": "", "componentFiles": [], "matches": []}
+        return worker.call(
+            "buildAllSectionBlocks",
+            requests, extracted_icons, identification.get("detectedPlugins") or [], search_index,
+        ) or {}
+    except NodeWorkerError as e:
+        print(f"  ⚠ Section block injector error: {e}")
+        if worker.stderr_tail():
+            print(f"    {worker.stderr_tail()}")
+    return {}
 
 
 def _detect_and_repair_truncation(code: str, section_name: str) -> dict | None:
-    """Call post-process.js detectAndRepairTruncation() via Node.js subprocess.
+    """Call post-process.js detectAndRepairTruncation() via the Node worker.
 
     Returns dict with keys: truncated, repaired, code, warnings.
     Returns None if the Node.js call fails (caller should proceed with original code).
     """
-    node_script = f"""
-const {{ detectAndRepairTruncation }} = require('./lib/post-process');
-const code = {json.dumps(code)};
-const result = detectAndRepairTruncation(code, {json.dumps(section_name)});
-console.log(JSON.stringify(result));
-"""
     try:
-        result = subprocess.run(
-            ["node", "-e", node_script],
-            capture_output=True, text=True,
-            cwd=str(QUALITY_DIR), timeout=10,
+        return get_node_worker().call(
+            "post-process.detectAndRepairTruncation", code, section_name, timeout=10,
         )
-        if result.returncode == 0 and result.stdout.strip():
-            return json.loads(result.stdout.strip())
-    except (subprocess.TimeoutExpired, json.JSONDecodeError, OSError):
+    except NodeWorkerError:
         pass
     return None
 
 
-def stage_sections(
-    sections: list[dict],
-    preset: str,
-    project_name: str,
-    section_contexts: dict | None = None,
-    extraction_dir: Path | None = None,
-    identification: dict | None = None,
-    site_spec: dict | None = None,
-) -> list[Path]:
-    """Stage 2: Generate each section component individually with engine-aware injection."""
-    print(f"\n🔨 Stage 2: Generating {len(sections)} sections...")
-    if section_contexts:
-        print(f"  (with per-section reference context from URL extraction)")
+def _detect_and_repair_truncation_all(files: list[tuple[str, str]]) -> list[dict | None]:
+    """Batch form of _detect_and_repair_truncation for (name, code) pairs, in one worker call.
 
-    preset_content = read_file(SKILLS_DIR / "presets" / f"{preset}.md")
-    style_header = extract_style_header(preset_content)
-    taxonomy = read_file(SKILLS_DIR / "section-taxonomy.md")
-    engine = detect_animation_engine(preset_content)
+    Results are in input order; "code" is only present when a file was repaired.
+    Every entry is None if the Node.js call fails.
+    """
+    if not files:
+        return []
+    try:
+        results = get_node_worker().call(
+            "post-process.detectAndRepairTruncationAll",
+            [{"name": name, "code": code} for name, code in files],
+        )
+        if isinstance(results, list) and len(results) == len(files):
+            return results
+    except NodeWorkerError:
+        pass
+    return [None] * len(files)
 
-    # Load engine-specific instruction template
-    if engine == "gsap":
-        instructions = read_file(TEMPLATES_DIR / "section-instructions-gsap.md")
-    else:
-        instructions = read_file(TEMPLATES_DIR / "section-instructions-framer.md")
 
-    print(f"  Animation engine: {engine}")
+SECTION_ROLE_PREAMBLE = """You are a senior frontend developer generating a single website section
+as a React + Tailwind CSS component."""
 
-    # Load injection data if available (URL clone mode)
-    animation_analysis, extraction_data = load_injection_data(extraction_dir)
+SITE_SPEC_RULES = """IMPORTANT: If the section spec contains "components.matched" with import_statement values,
+use those EXACT import statements. Do not construct your own import paths.
+If images are provided with src URLs, use them as backgroundImage CSS — not <img> tags.
+The generation_guidance field indicates confidence level — follow its instructions."""
 
-    # Build injection contexts
-    animation_contexts = {}
-    asset_contexts = {}
-    if animation_analysis or extraction_data:
-        print("  Loading injection data...")
-        if animation_analysis:
-            raw_anim = get_animation_contexts(
-                animation_analysis, preset_content, sections, identification
-            )
-            # buildAllAnimationContexts returns { contexts: {...}, allComponentFiles: [...], ... }
-            # Extract the per-section contexts dict and flatten it for section access
-            if raw_anim and "contexts" in raw_anim:
-                animation_contexts = raw_anim["contexts"]
-                comp_files = raw_anim.get("allComponentFiles", [])
-                non_empty = sum(1 for v in animation_contexts.values()
-                                if v.get("animationContext", "").strip())
-                print(f"  ✓ Animation context for {non_empty}/{len(animation_contexts)} sections"
-                      f" ({len(comp_files)} library components matched)")
-            elif raw_anim:
-                # Fallback: if structure changed, use raw dict
-                animation_contexts = raw_anim
-                print(f"  ✓ Animation context loaded (legacy format)")
-        if extraction_data:
-            asset_contexts = get_asset_contexts(extraction_data, sections)
-            if asset_contexts:
-                non_empty_assets = sum(1 for v in asset_contexts.values()
-                                       if v.get("assetContext", "").strip())
-                print(f"  ✓ Asset context for {non_empty_assets}/{len(asset_contexts)} sections")
 
-    section_files = []
-    all_extra_component_files = []  # v1.2.0: collect extra component files for stage_deploy
+def build_section_system(style_header: str, instructions: str, site_spec: dict | None = None) -> list[dict]:
+    """Build the shared section-prompt prefix as cacheable system blocks.
+
+    Block 1 (role + engine instructions) is identical for every build on the
+    same engine; block 2 (style) is identical for every section of a build.
+    Both end in a cache_control breakpoint so the API can reuse them.
+    """
+    if site_spec:
+        style_json = json.dumps(site_spec.get("style", {}), indent=2)
+        style_block = f"""STYLE TOKENS (use these exact values — colors as hex, fonts as names, spacing as rem):
+{style_json}
+
+{SITE_SPEC_RULES}"""
+    else:
+        style_block = style_header
+
+    return [
+        {"type": "text", "text": f"{SECTION_ROLE_PREAMBLE}\n\n{instructions}",
+         "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": style_block,
+         "cache_control": {"type": "ephemeral"}},
+    ]
+
+
+def build_section_jobs(
+    sections: list[dict],
+    style_header: str,
+    taxonomy: Taxonomy,
+    instructions: str,
+    animation_contexts: dict,
+    asset_contexts: dict,
+    section_contexts: dict | None = None,
+    identification: dict | None = None,
+    site_spec: dict | None = None,
+    section_blocks: dict | None = None,
+) -> list[dict]:
+    """Assemble the generation prompt for every section up front.
+
+    `section_blocks` is get_section_blocks() output (icon, visual fallback,
+    card demo and UI component blocks, keyed by section index).
+
+    Returns one job per section, in page order, with keys: index, filename,
+    component_name, label, system, prompt, token_budget, extra_component_files,
+    fingerprint. `system` is the shared prefix (identical for every job);
+    `prompt` is the per-section suffix; `fingerprint` hashes the complete
+    request so unchanged sections can be skipped on rerun.
+    """
+    system = build_section_system(style_header, instructions, site_spec)
+    jobs = []
 
     for i, section in enumerate(sections):
         num = f"{i + 1:02d}"
         name = section["archetype"].lower().replace("-", "_")
         filename = f"{num}-{name}.tsx"
+        component_name = f"Section{num}{section['archetype'].replace('-', '')}"
 
         # Get per-section injection blocks
         anim_ctx = animation_contexts.get(str(i), {})
@@ -994,21 +1997,9 @@ def stage_sections(
         asset_ctx = asset_contexts.get(str(i), {})
         asset_block = asset_ctx.get("assetContext", "")
 
-        budget_label = f" [{token_budget} tokens]" if token_budget != MAX_TOKENS["section"] else ""
-        print(f"  [{num}/{len(sections):02d}] {section['archetype']} | {section['variant']}{budget_label}...")
-
-        # Try to find structural reference in taxonomy
-        structure_ref = "[No structural reference yet — infer from archetype and variant]"
-        arch_pattern = rf"### {re.escape(section['archetype'])}.*?(?=### |\Z)"
-        arch_match = re.search(arch_pattern, taxonomy, re.DOTALL)
-        if arch_match:
-            struct_match = re.search(
-                r"\*\*Structure:\*\*\s*(.+?)(?:\n\*\*|\Z)",
-                arch_match.group(0),
-                re.DOTALL,
-            )
-            if struct_match and "populate on first use" not in struct_match.group(1).lower():
-                structure_ref = struct_match.group(1).strip()
+        # Structural reference from the taxonomy, if one has been recorded
+        structure_ref = (taxonomy.structure_reference(section["archetype"])
+                         or "[No structural reference yet — infer from archetype and variant]")
 
         # Build optional reference context block
         ref_context_block = ""
@@ -1097,58 +2088,29 @@ See section-instructions-gsap.md for the full pinned horizontal scroll technique
             plugins = identification["detectedPlugins"]
             plugin_block = f"\n═══ GSAP PLUGIN CONTEXT ═══\nDetected plugins: {', '.join(plugins)}\nUse these plugins where appropriate for this section.\n═══════════════════════════\n"
 
-        # ── v1.2.0: Icon context block ──
-        extracted_icons = []
-        if identification:
-            icon_lib = identification.get("iconLibrary", {})
-            if isinstance(icon_lib, dict):
-                extracted_icons = icon_lib.get("icons", [])
-        icon_block = get_icon_context(section["archetype"], i, extracted_icons)
+        # ── v1.2.0: Icon, visual fallback, card demo and UI component blocks ──
+        blocks = (section_blocks or {}).get(str(i), {})
+        extra_component_files = []
+
+        icon_block = (blocks.get("iconBlock") or "").strip()
         if icon_block:
             icon_block = f"\n{icon_block}\n"
 
-        # ── v1.2.0: Visual content fallback (when no images for this section) ──
-        visual_fallback_block = ""
-        extra_component_files = []
-        has_asset_images = bool(asset_block and ("backgroundImage" in asset_block or "image" in asset_block.lower()))
-        if not has_asset_images:
-            is_card_grid = section["variant"] in (
-                "demo-cards", "feature-cards", "benefit-cards", "grid", "card-grid",
-                "three-column", "four-column", "bento-grid",
-            )
-            card_count = 6 if is_card_grid else 0
-            vf = get_visual_fallback(section["archetype"], i, is_card_grid, card_count)
-            if vf.get("block"):
-                visual_fallback_block = f"\n{vf['block']}\n"
-                extra_component_files.extend(vf.get("componentFiles", []))
-
-        # ── v1.2.0: Card embedded animation demos (PRODUCT-SHOWCASE demo-cards) ──
-        card_embed_block = ""
-        if (section["archetype"].upper() == "PRODUCT-SHOWCASE"
-                and "demo" in section.get("variant", "").lower()
-                and identification and identification.get("detectedPlugins")):
-            ced = get_card_embedded_demos(identification["detectedPlugins"])
-            if ced.get("block"):
-                card_embed_block = f"\n{ced['block']}\n"
-                extra_component_files.extend(ced.get("componentFiles", []))
-
-        # ── v1.2.0: UI component injection ──
-        ui_component_block = ""
-        if identification:
-            sec_map = identification.get("sectionMapping", {}).get(str(i), {})
-            ui_patterns = sec_map.get("uiComponents", [])
-            if ui_patterns:
-                search_idx = SKILLS_DIR / "animation-components" / "registry" / "animation_search_index.json"
-                ucm = get_ui_component_matches(ui_patterns, search_idx)
-                if ucm.get("block"):
-                    ui_component_block = f"\n{ucm['block']}\n"
-                    extra_component_files.extend(ucm.get("componentFiles", []))
+        def _injected(key: str) -> str:
+            block = blocks.get(key) or {}
+            if not block.get("block"):
+                return ""
+            extra_component_files.extend(block.get("componentFiles", []))
+            return f"\n{block['block']}\n"
+
+        visual_fallback_block = _injected("visualFallback")
+        card_embed_block = _injected("cardDemos")
+        ui_component_block = _injected("uiComponents")
 
         # ── v2.0.0: Build style + section spec block ──
         # When site_spec is available (--from-url), use JSON style tokens directly.
         # When not (--preset mode), fall back to the compact style header.
         if site_spec:
-            style_json = json.dumps(site_spec.get("style", {}), indent=2)
             # Build section-specific JSON from the v2 sections list
             sec_data = section  # Already a rich dict from stage_scaffold_v2
             section_spec_json = json.dumps({
@@ -1171,22 +2133,12 @@ See section-instructions-gsap.md for the full pinned horizontal scroll technique
             else:
                 content_display = str(content_dir)
 
-            style_and_spec_block = f"""STYLE TOKENS (use these exact values — colors as hex, fonts as names, spacing as rem):
-{style_json}
-
-SECTION SPEC (structured data — use exact values, do not interpret or paraphrase):
-{section_spec_json}
-
-IMPORTANT: If the section spec contains "components.matched" with import_statement values,
-use those EXACT import statements. Do not construct your own import paths.
-If images are provided with src URLs, use them as backgroundImage CSS — not <img> tags.
-The generation_guidance field indicates confidence level — follow its instructions."""
+            section_spec_block = f"""SECTION SPEC (structured data — use exact values, do not interpret or paraphrase):
+{section_spec_json}"""
 
         else:
-            # Legacy --preset mode: use compact style header
-            style_and_spec_block = f"""{style_header}
-
-## Section Specification
+            # Legacy --preset mode: the compact style header lives in the shared prefix
+            section_spec_block = f"""## Section Specification
 Number: {i + 1} of {len(sections)}
 Archetype: {section['archetype']}
 Variant: {section['variant']}
@@ -1196,80 +2148,563 @@ Content Direction: {section['content']}"""
                 headings = content_display.get("headings", [])
                 content_display = headings[0] if headings else ""
 
-        prompt = f"""You are a senior frontend developer generating a single website section
-as a React + Tailwind CSS component.
+        # Per-section suffix — everything that differs between sections
+        prompt = f"""{section_spec_block}
+
+## Structural Reference
+{structure_ref}
+{ref_context_block}{animation_context_block}{asset_context_block}{identification_block}{pinned_scroll_block}{plugin_block}{icon_block}{visual_fallback_block}{card_embed_block}{ui_component_block}
+Component name: {component_name}"""
+
+        # Sections using pinned horizontal scroll are complex — minimum 8192 tokens
+        if uses_pinned_scroll:
+            token_budget = max(token_budget, 8192)
+
+        budget_label = f" [{token_budget} tokens]" if token_budget != MAX_TOKENS["section"] else ""
+        jobs.append({
+            "index": i,
+            "filename": filename,
+            "component_name": component_name,
+            "label": f"{section['archetype']} | {section['variant']}{budget_label}",
+            "system": system,
+            "prompt": prompt,
+            "token_budget": token_budget,
+            "extra_component_files": extra_component_files,
+        })
+
+    for job in jobs:
+        job["fingerprint"] = LLMResponseCache.key(section_call_kwargs(job))
+
+    return jobs
+
+
+def postprocess_section_code(code: str, filename: str, component_name: str) -> str:
+    """Clean up raw model output for one section: fences, truncation, "use client", default export."""
+    # Clean up any markdown code fences that might have snuck in
+    code = re.sub(r"^```\w*\n?", "", code)
+    code = re.sub(r"\n?```$", "", code)
+
+    # ── Truncation detection & repair (v1.1.1) ──
+    truncation_result = _detect_and_repair_truncation(code, filename)
+    if truncation_result:
+        if truncation_result.get("truncated"):
+            if truncation_result.get("repaired"):
+                code = truncation_result["code"]
+                print(f"    ⚠ {filename}: truncated — auto-repaired")
+                for w in truncation_result.get("warnings", []):
+                    print(f"      {w}")
+            else:
+                print(f"    ❌ {filename}: truncated but could not be repaired")
+
+    # Post-process: ensure "use client" directive for components using
+    # animation libraries or React hooks
+    client_markers = [
+        "framer-motion", "motion.", "useState", "useEffect",
+        "useRef", "useCallback", "useMemo", "gsap", "ScrollTrigger",
+        "DotLottieReact", "lucide-react",
+    ]
+    needs_client = any(marker in code for marker in client_markers)
+    has_client = code.startswith('"use client"') or code.startswith("'use client'")
+    if needs_client and not has_client:
+        code = '"use client";\n\n' + code
+
+    # Ensure default export exists
+    if "export default" not in code:
+        named_fn_pat = rf"export\s+function\s+{re.escape(component_name)}\b"
+        if re.search(named_fn_pat, code):
+            code = re.sub(named_fn_pat, f"export default function {component_name}", code)
+        else:
+            code += f"\n\nexport default {component_name};\n"
+
+    return code
+
+
+class SectionStreamWriter:
+    """Streams section code to `<file>.partial` and runs the cheap checks as tokens arrive.
+
+    A leading markdown fence is dropped once the first line is complete, and
+    the "use client" / export default checks are tracked incrementally so the
+    final post-process knows what to fix. commit() writes the final code and
+    atomically renames the partial file into place.
+    """
+
+    def __init__(self, final_path: Path):
+        self.final_path = final_path
+        self.partial_path = final_path.with_name(final_path.name + ".partial")
+        self.partial_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.partial_path, "w", encoding="utf-8")
+        self.reset()
+
+    def reset(self):
+        """Discard everything streamed so far (used before a retry)."""
+        self._fh.seek(0)
+        self._fh.truncate()
+        self._head = ""
+        self._head_done = False
+        self._tail = ""
+        self.has_use_client = None
+        self.has_default_export = False
+
+    def feed(self, text: str):
+        if not self._head_done:
+            self._head += text
+            if "\n" not in self._head:
+                return
+            self._head_done = True
+            text = re.sub(r"^```\w*\n", "", self._head)
+            stripped = text.lstrip()
+            self.has_use_client = stripped.startswith('"use client"') or stripped.startswith("'use client'")
+        window = self._tail + text
+        if "export default" in window:
+            self.has_default_export = True
+        self._tail = window[-len("export default"):]
+        self._fh.write(text)
+        self._fh.flush()
+
+    def commit(self, code: str):
+        """Write the post-processed code and atomically move it to the final path."""
+        self._fh.seek(0)
+        self._fh.truncate()
+        self._fh.write(code)
+        self._fh.close()
+        os.replace(self.partial_path, self.final_path)
+        print(f"  → Saved: {self.final_path.relative_to(ROOT)}")
+
+    def abort(self):
+        self._fh.close()
+        self.partial_path.unlink(missing_ok=True)
+
+
+def generate_section(job: dict, project_name: str, total: int, stream: bool = False) -> Path:
+    """Generate, post-process and write one section from a prepared job. Returns the file path."""
+    print(f"  [{job['index'] + 1:02d}/{total:02d}] {job['label']}...")
+    filepath = OUTPUT_DIR / project_name / "sections" / job["filename"]
+
+    if not stream:
+        code = call_claude(job["prompt"], "section", max_tokens_override=job["token_budget"],
+                           system=job["system"], label=job["filename"])
+        code = postprocess_section_code(code, job["filename"], job["component_name"])
+        write_file(filepath, code)
+        return filepath
+
+    writer = SectionStreamWriter(filepath)
+    try:
+        code, stats = call_claude_stream(
+            job["prompt"], "section", writer, max_tokens_override=job["token_budget"],
+            system=job["system"], label=job["filename"],
+        )
+    except BaseException:
+        writer.abort()
+        raise
+    if not stats["cached"]:
+        print(f"    {job['filename']}: first token {stats['ttft']:.1f}s, "
+              f"{stats['output_tokens']} tokens in {stats['seconds']:.1f}s "
+              f"({stats['tokens_per_sec']:.0f} tok/s)")
+    missing = []
+    if not writer.has_use_client:
+        missing.append('"use client"')
+    if not writer.has_default_export:
+        missing.append("export default")
+    if missing:
+        print(f"    {job['filename']}: streamed without {', '.join(missing)} — fixing in post-process")
+    writer.commit(postprocess_section_code(code, job["filename"], job["component_name"]))
+    return filepath
+
+
+# --- Message Batches ---
+
+BATCH_POLL_SECONDS = 30
+
+
+def section_call_kwargs(job: dict) -> dict:
+    """Request params for a section job — identical to what call_claude sends."""
+    return {
+        "model": MODELS["section"],
+        "max_tokens": job["token_budget"],
+        "messages": [{"role": "user", "content": job["prompt"]}],
+        "system": job["system"],
+    }
+
+
+def _write_section_message(job: dict, project_name: str, message) -> Path:
+    """Post-process a completed section Message and write it to sections/."""
+    code = "\n".join(block.text for block in message.content if block.type == "text")
+    code = postprocess_section_code(code, job["filename"], job["component_name"])
+    filepath = OUTPUT_DIR / project_name / "sections" / job["filename"]
+    write_file(filepath, code)
+    return filepath
+
+
+def submit_message_batch(client, requests: dict[str, dict]) -> str:
+    """Submit {custom_id: params} as one Message Batch and return the batch ID."""
+    batch = client.messages.batches.create(requests=[
+        {"custom_id": custom_id, "params": params} for custom_id, params in requests.items()
+    ])
+    return batch.id
+
+
+@traced("llm:batch-wait", "llm")
+def wait_for_message_batch(client, batch_id: str, poll_seconds: float = BATCH_POLL_SECONDS):
+    """Poll a Message Batch until processing has ended. Returns the final batch object.
+
+    Polling starts at 2s and doubles up to poll_seconds.
+    """
+    interval = min(2.0, poll_seconds)
+    last_counts = None
+    while True:
+        batch = client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        summary = (f"{counts.succeeded} succeeded, {counts.errored} errored, "
+                   f"{counts.processing} processing")
+        if summary != last_counts:
+            print(f"  Batch {batch_id}: {batch.processing_status} ({summary})")
+            last_counts = summary
+        if batch.processing_status == "ended":
+            return batch
+        _time.sleep(interval)
+        interval = min(interval * 2, poll_seconds)
+
+
+def collect_message_batch(client, batch_id: str) -> dict:
+    """Return {custom_id: Message} for succeeded requests and {custom_id: None} for the rest."""
+    results = {}
+    for entry in client.messages.batches.results(batch_id):
+        results[entry.custom_id] = entry.result.message if entry.result.type == "succeeded" else None
+    return results
+
+
+def run_section_batch(jobs: list[dict], project_name: str, section_count: int) -> dict[int, Path]:
+    """Generate sections through the Message Batches API. Returns {index: path}.
+
+    Cached responses are written immediately; the rest are submitted as one
+    batch whose ID is persisted in checkpoint.json, so rerunning with
+    --batch-api after a restart resumes polling instead of resubmitting.
+    Failed or expired requests fall back to a synchronous call.
+    """
+    output_dir = OUTPUT_DIR / project_name
+    section_files = {}
+    jobs_by_id = {f"section-{job['index']:03d}": job for job in jobs}
+
+    pending = {}
+    for custom_id, job in jobs_by_id.items():
+        cached = LLM_CACHE.get(LLMResponseCache.key(section_call_kwargs(job)))
+        if cached is not None:
+            section_files[job["index"]] = _write_section_message(job, project_name, cached)
+        else:
+            pending[custom_id] = job
+    if not pending:
+        return section_files
+
+    client = Anthropic()
+    cp = load_checkpoint(project_name) or {}
+    saved = (cp.get("data") or {}).get("batch") if cp.get("stage") == "sections" else None
+    if saved and saved.get("requests") == {cid: job["filename"] for cid, job in pending.items()}:
+        batch_id = saved["id"]
+        print(f"  Resuming Message Batch {batch_id} ({len(pending)} sections)")
+    else:
+        batch_id = submit_message_batch(
+            client, {cid: section_call_kwargs(job) for cid, job in pending.items()}
+        )
+        print(f"  Submitted Message Batch {batch_id} ({len(pending)} sections)")
+        save_checkpoint(output_dir, "sections", project_name, {
+            "batch": {"id": batch_id, "requests": {cid: job["filename"] for cid, job in pending.items()}},
+            "section_count": section_count,
+        })
+
+    wait_for_message_batch(client, batch_id)
+    results = collect_message_batch(client, batch_id)
+
+    for custom_id, job in pending.items():
+        message = results.get(custom_id)
+        if message is None:
+            print(f"  ⚠ {job['filename']}: batch request did not succeed — generating directly")
+            section_files[job["index"]] = generate_section(job, project_name, section_count)
+            continue
+        LLM_CACHE.put(LLMResponseCache.key(section_call_kwargs(job)), message)
+        TOKEN_USAGE.record(message, label=job["filename"], max_tokens=job["token_budget"])
+        section_files[job["index"]] = _write_section_message(job, project_name, message)
+
+    return section_files
+
+
+@traced("stage:contexts")
+def build_injection_contexts(
+    sections: list[dict],
+    preset: str,
+    extraction_dir: Path | None = None,
+    identification: dict | None = None,
+) -> dict:
+    """Stage 1.5: Per-section injection blocks for the section prompts.
+
+    Returns {"animation_contexts", "asset_contexts", "section_blocks"}, each
+    keyed by str(section index).
+    """
+    # Load injection data if available (URL clone mode)
+    animation_analysis, extraction_data = load_injection_data(extraction_dir)
+
+    # Build injection contexts
+    animation_contexts = {}
+    asset_contexts = {}
+    if animation_analysis or extraction_data:
+        print("  Loading injection data...")
+        if animation_analysis:
+            raw_anim = get_animation_contexts(
+                animation_analysis, read_preset(preset).content, sections, identification
+            )
+            # buildAllAnimationContexts returns { contexts: {...}, allComponentFiles: [...], ... }
+            # Extract the per-section contexts dict and flatten it for section access
+            if raw_anim and "contexts" in raw_anim:
+                animation_contexts = raw_anim["contexts"]
+                comp_files = raw_anim.get("allComponentFiles", [])
+                non_empty = sum(1 for v in animation_contexts.values()
+                                if v.get("animationContext", "").strip())
+                print(f"  ✓ Animation context for {non_empty}/{len(animation_contexts)} sections"
+                      f" ({len(comp_files)} library components matched)")
+            elif raw_anim:
+                # Fallback: if structure changed, use raw dict
+                animation_contexts = raw_anim
+                print(f"  ✓ Animation context loaded (legacy format)")
+        if extraction_data:
+            asset_contexts = get_asset_contexts(extraction_data, sections)
+            if asset_contexts:
+                non_empty_assets = sum(1 for v in asset_contexts.values()
+                                       if v.get("assetContext", "").strip())
+                print(f"  ✓ Asset context for {non_empty_assets}/{len(asset_contexts)} sections")
+
+    section_blocks = get_section_blocks(sections, asset_contexts, identification)
+
+    return {
+        "animation_contexts": animation_contexts,
+        "asset_contexts": asset_contexts,
+        "section_blocks": section_blocks,
+    }
+
+
+@traced("stage:sections")
+def stage_sections(
+    sections: list[dict],
+    preset: str,
+    project_name: str,
+    section_contexts: dict | None = None,
+    extraction_dir: Path | None = None,
+    identification: dict | None = None,
+    site_spec: dict | None = None,
+    concurrency: int = 1,
+    stream: bool = False,
+    batch_api: bool = False,
+    only_sections: list[int] | None = None,
+    resume: bool = False,
+    contexts: dict | None = None,
+) -> list[Path]:
+    """Stage 2: Generate each section component individually with engine-aware injection.
+
+    All prompts are built first; generation then runs with up to `concurrency`
+    sections in flight. File numbering and the returned list follow page order
+    regardless of completion order. With `stream`, each section is written to
+    a .partial file as tokens arrive and renamed into place when complete.
+    With `batch_api`, all sections are submitted as one Message Batch instead.
+
+    Sections whose request fingerprint matches sections/manifest.json and whose
+    file still exists are not regenerated. `only_sections` (1-based numbers)
+    regenerates exactly those sections and leaves the rest untouched.
+
+    With `resume`, reused files are also checked for completeness (default
+    export, no truncation), leftover .partial files are removed, and sections
+    the checkpoint lists as completed are kept even without a manifest entry.
+
+    `contexts` is build_injection_contexts() output; built here when omitted.
+    """
+    print(f"\n🔨 Stage 2: Generating {len(sections)} sections...")
+    if section_contexts:
+        print(f"  (with per-section reference context from URL extraction)")
+
+    preset_model = read_preset(preset)
+    style_header = preset_model.style_header
+    taxonomy = load_taxonomy(SKILLS_DIR / "section-taxonomy.md")
+    engine = preset_model.engine
+
+    # Load engine-specific instruction template
+    if engine == "gsap":
+        instructions = read_file(TEMPLATES_DIR / "section-instructions-gsap.md")
+    else:
+        instructions = read_file(TEMPLATES_DIR / "section-instructions-framer.md")
+
+    print(f"  Animation engine: {engine}")
+
+    if contexts is None:
+        contexts = build_injection_contexts(sections, preset, extraction_dir, identification)
+
+    jobs = build_section_jobs(
+        sections, style_header, taxonomy, instructions,
+        contexts["animation_contexts"], contexts["asset_contexts"],
+        section_contexts=section_contexts,
+        identification=identification,
+        site_spec=site_spec,
+        section_blocks=contexts["section_blocks"],
+    )
+
+    sections_dir = OUTPUT_DIR / project_name / "sections"
+    manifest = load_section_manifest(project_name)
+    forced = {n - 1 for n in (only_sections or [])}
+    section_files: list[Path | None] = [None] * len(jobs)
+    to_generate = []
+    completed = set()
+    checkpointed = set()
+    if resume:
+        for partial in sections_dir.glob("*.partial"):
+            partial.unlink()
+        cp = load_checkpoint(project_name) or {}
+        if cp.get("stage") == "sections":
+            checkpointed = set((cp.get("data") or {}).get("completed_sections", []))
+    stale_jobs = set()
+    for job in jobs:
+        filepath = sections_dir / job["filename"]
+        if only_sections:
+            stale = job["index"] in forced
+        else:
+            entry = manifest.get(job["filename"])
+            stale = not filepath.exists() or (
+                entry.get("fingerprint") != job["fingerprint"] if entry
+                else job["index"] not in checkpointed
+            )
+        if stale:
+            stale_jobs.add(job["index"])
+    if resume:
+        reasons = validate_section_files([sections_dir / job["filename"] for job in jobs
+                                          if job["index"] not in stale_jobs])
+        for job in jobs:
+            reason = reasons.get(sections_dir / job["filename"])
+            if reason:
+                print(f"  ⚠ {job['filename']}: {reason} — regenerating")
+                stale_jobs.add(job["index"])
+    for job in jobs:
+        filepath = sections_dir / job["filename"]
+        if job["index"] in stale_jobs:
+            to_generate.append(job)
+        elif filepath.exists():
+            section_files[job["index"]] = filepath
+            completed.add(job["index"])
+        else:
+            # The page needs every section: generate it rather than leave a gap
+            print(f"  ⚠ {job['filename']} does not exist — generating it as well")
+            to_generate.append(job)
+    if completed:
+        print(f"  {len(completed)} section(s) unchanged — reusing existing files")
+    if resume and to_generate:
+        print(f"  Resuming at section {to_generate[0]['index'] + 1}/{len(jobs)}")
+
+    def _record(job: dict, filepath: Path):
+        section_files[job["index"]] = filepath
+        completed.add(job["index"])
+        manifest[job["filename"]] = {
+            "index": job["index"],
+            "fingerprint": job["fingerprint"],
+            "generated_at": datetime.now().isoformat(),
+        }
+        save_section_manifest(project_name, manifest, jobs)
+        save_checkpoint(OUTPUT_DIR / project_name, "sections", project_name, {
+            "completed_sections": sorted(completed),
+            "section_count": len(sections),
+        })
 
-{style_and_spec_block}
+    if batch_api and to_generate:
+        by_index = {job["index"]: job for job in to_generate}
+        for index, filepath in run_section_batch(to_generate, project_name, len(sections)).items():
+            _record(by_index[index], filepath)
+    elif to_generate:
+        concurrency = max(1, min(concurrency, len(to_generate)))
+        if concurrency > 1:
+            print(f"  Generating with concurrency={concurrency}")
+        if concurrency == 1:
+            for job in to_generate:
+                _record(job, generate_section(job, project_name, len(jobs), stream))
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                # copy_context() keeps CURRENT_PROJECT (and batch log routing) in the workers
+                futures = {pool.submit(contextvars.copy_context().run, generate_section,
+                                       job, project_name, len(jobs), stream): job
+                           for job in to_generate}
+                # Record every section that succeeded before surfacing the first failure,
+                # so a rerun does not pay for files that were already written
+                errors = []
+                for future in as_completed(futures):
+                    try:
+                        filepath = future.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    _record(futures[future], filepath)
+                if errors:
+                    raise errors[0]
+
+    _save_extra_component_manifest(jobs, project_name)
+    # One file per section, in page order: assemble/deploy/review zip these with `sections`
+    missing = [job["filename"] for job in jobs if section_files[job["index"]] is None]
+    if missing:
+        raise RuntimeError(f"Section file(s) not generated: {', '.join(missing)}")
+    return section_files
 
-## Structural Reference
-{structure_ref}
-{ref_context_block}{animation_context_block}{asset_context_block}{identification_block}{pinned_scroll_block}{plugin_block}{icon_block}{visual_fallback_block}{card_embed_block}{ui_component_block}
-{instructions}
-Component name: Section{num}{section['archetype'].replace('-', '')}"""
 
-        # Sections using pinned horizontal scroll are complex — minimum 8192 tokens
-        if uses_pinned_scroll:
-            token_budget = max(token_budget, 8192)
+def validate_section_files(paths: list[Path]) -> dict[Path, str]:
+    """Check that generated sections on disk are complete, with one batched truncation check.
 
-        code = call_claude(prompt, "section", max_tokens_override=token_budget)
+    Returns {path: reason} for the files that are not.
+    """
+    reasons = {}
+    readable = []
+    for path in paths:
+        try:
+            code = path.read_text(encoding="utf-8")
+        except OSError as e:
+            reasons[path] = str(e)
+            continue
+        if not code.strip():
+            reasons[path] = "empty file"
+        elif "export default" not in code:
+            reasons[path] = "no default export"
+        else:
+            readable.append((path, code))
+    truncation = _detect_and_repair_truncation_all([(path.name, code) for path, code in readable])
+    for (path, _), result in zip(readable, truncation):
+        if result and result.get("truncated"):
+            reasons[path] = "truncated"
+    return reasons
 
-        # Clean up any markdown code fences that might have snuck in
-        code = re.sub(r"^```\w*\n?", "", code)
-        code = re.sub(r"\n?```$", "", code)
 
-        # ── Truncation detection & repair (v1.1.1) ──
-        truncation_result = _detect_and_repair_truncation(code, filename)
-        if truncation_result:
-            if truncation_result.get("truncated"):
-                if truncation_result.get("repaired"):
-                    code = truncation_result["code"]
-                    print(f"    ⚠ {filename}: truncated — auto-repaired")
-                    for w in truncation_result.get("warnings", []):
-                        print(f"      {w}")
-                else:
-                    print(f"    ❌ {filename}: truncated but could not be repaired")
-
-        # Post-process: ensure "use client" directive for components using
-        # animation libraries or React hooks
-        client_markers = [
-            "framer-motion", "motion.", "useState", "useEffect",
-            "useRef", "useCallback", "useMemo", "gsap", "ScrollTrigger",
-            "DotLottieReact", "lucide-react",
-        ]
-        needs_client = any(marker in code for marker in client_markers)
-        has_client = code.startswith('"use client"') or code.startswith("'use client'")
-        if needs_client and not has_client:
-            code = '"use client";\n\n' + code
-
-        # Ensure default export exists
-        if "export default" not in code:
-            component_name = f"Section{num}{section['archetype'].replace('-', '')}"
-            named_fn_pat = rf"export\s+function\s+{re.escape(component_name)}\b"
-            if re.search(named_fn_pat, code):
-                code = re.sub(named_fn_pat, f"export default function {component_name}", code)
-            else:
-                code += f"\n\nexport default {component_name};\n"
+def load_section_manifest(project_name: str) -> dict:
+    """Load sections/manifest.json as {filename: {index, fingerprint, generated_at}}."""
+    path = OUTPUT_DIR / project_name / "sections" / "manifest.json"
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("sections", {})
+    except (json.JSONDecodeError, OSError):
+        return {}
 
-        filepath = OUTPUT_DIR / project_name / "sections" / filename
-        write_file(filepath, code)
-        section_files.append(filepath)
 
-        save_checkpoint(OUTPUT_DIR / project_name, "sections", project_name, {"last_section_index": i, "section_count": len(sections)})
+def save_section_manifest(project_name: str, manifest: dict, jobs: list[dict]):
+    """Write sections/manifest.json, keeping only entries for the current section list."""
+    current = {job["filename"] for job in jobs}
+    path = OUTPUT_DIR / project_name / "sections" / "manifest.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps({
+        "sections": {name: entry for name, entry in sorted(manifest.items()) if name in current},
+    }, indent=2), encoding="utf-8")
+    tmp.replace(path)
 
-        # v1.2.0: Track extra component files for this section
-        if extra_component_files:
-            all_extra_component_files.extend(extra_component_files)
 
-    # v1.2.0: Save extra component manifest for stage_deploy
+def _save_extra_component_manifest(jobs: list[dict], project_name: str):
+    """v1.2.0: Save extra component manifest for stage_deploy."""
+    all_extra_component_files = [f for job in jobs for f in job["extra_component_files"]]
     if all_extra_component_files:
         unique_files = list(set(all_extra_component_files))
         manifest_path = OUTPUT_DIR / project_name / "extra-components.json"
         write_file(manifest_path, json.dumps(unique_files, indent=2))
         print(f"  ✓ {len(unique_files)} extra component files queued for stage_deploy")
 
-    return section_files
-
 
+@traced("stage:assemble")
 def stage_assemble(sections: list[dict], section_files: list[Path], project_name: str):
     """Stage 3: Assemble all sections into a single page component."""
     print("\n📦 Stage 3: Assembling page...")
@@ -1296,38 +2731,76 @@ export default function Page() {{
 }}
 '''
 
-    write_file(OUTPUT_DIR / project_name / "page.tsx", page_code)
+    write_file_if_changed(OUTPUT_DIR / project_name / "page.tsx", page_code)
 
 
-def detect_animation_engine(preset_content: str) -> str:
-    """Detect animation engine from preset's Motion line. Returns 'gsap' or 'framer-motion'."""
-    match = re.search(r"Motion:.*?/(gsap|framer-motion)", preset_content)
-    return match.group(1) if match else "framer-motion"
+def font_import_name(font_name: str) -> str:
+    """Convert a font display name to its next/font/google import name."""
+    return font_name.replace(" ", "_")
 
 
-def parse_fonts(preset_content: str) -> dict:
-    """Extract heading and body font names from preset's YAML style config."""
-    # Match YAML format: heading_font: FontName
-    heading = "Inter"
-    body = "Inter"
-    h_match = re.search(r"heading_font:\s*([A-Za-z][A-Za-z0-9_ ]+)", preset_content)
-    if h_match:
-        heading = h_match.group(1).strip()
-    b_match = re.search(r"body_font:\s*([A-Za-z][A-Za-z0-9_ ]+)", preset_content)
-    if b_match:
-        body = b_match.group(1).strip()
-    # Guard: discard if YAML leaked into the capture
-    yaml_markers = ("---", "palette", "bg_primary", "accent")
-    if any(m in heading for m in yaml_markers) or any(m in body for m in yaml_markers):
-        print("⚠ parse_fonts: detected YAML leak, falling back to Inter")
-        heading = "Inter"
-        body = "Inter"
-    return {"heading": heading, "body": body}
+# Deploy-time download scripts (run with run_node_script; input is JSON on stdin)
+ASSET_CACHE_DIR = OUTPUT_DIR / ".cache" / "assets"  # <sha256> blobs + index.json, shared by all projects
+ASSET_DOWNLOAD_CONCURRENCY = 16
+ASSET_DOWNLOAD_TIMEOUT = 120  # Interrupted downloads resume from output/.cache/assets/partial/ next run
 
+ASSET_DOWNLOAD_SCRIPT = """
+const fs = require('fs');
+const { categorizeImages, getDownloadManifest } = require('./lib/asset-injector');
+const { verifyAssets, downloadAssets, closeAgents } = require('./lib/asset-downloader');
 
-def font_import_name(font_name: str) -> str:
-    """Convert a font display name to its next/font/google import name."""
-    return font_name.replace(" ", "_")
+(async () => {
+  try {
+    const { extractionPath, siteDir, cacheDir, concurrency } = JSON.parse(fs.readFileSync(0, 'utf-8'));
+    const extractionData = JSON.parse(fs.readFileSync(extractionPath, 'utf-8'));
+    const categorized = categorizeImages(extractionData);
+    if (categorized.length === 0) {
+      console.log(JSON.stringify({ downloaded: 0, skipped: "no images" }));
+      return;
+    }
+    const manifest = getDownloadManifest(categorized);
+    const verified = await verifyAssets(manifest, { cacheDir, concurrency });
+    if (verified.length === 0) {
+      console.log(JSON.stringify({ downloaded: 0, skipped: "none accessible" }));
+      return;
+    }
+    const stats = {};
+    const assetManifest = await downloadAssets(verified, siteDir, { cacheDir, concurrency, stats });
+    console.log(JSON.stringify({
+      downloaded: Object.keys(assetManifest).length,
+      cached: stats.cached,
+      fetched: stats.fetched,
+      manifest: assetManifest
+    }));
+  } catch (err) {
+    console.error(err.message);
+    console.log(JSON.stringify({ downloaded: 0, error: err.message }));
+  } finally {
+    closeAgents();
+  }
+})();
+"""
+
+LOTTIE_MAX_BYTES = 8 * 1024 * 1024
+
+LOTTIE_INSTALL_SCRIPT = """
+const fs = require('fs');
+const { closeAgents } = require('./lib/asset-downloader');
+const { installLottieAssets } = require('./lib/lottie-assets');
+
+(async () => {
+  try {
+    const { urls, siteDir, cacheDir, maxBytes, dotLottie } = JSON.parse(fs.readFileSync(0, 'utf-8'));
+    const result = await installLottieAssets(urls, siteDir, { cacheDir, maxBytes, dotLottie });
+    console.log(JSON.stringify(result));
+  } catch (err) {
+    console.error(err.message);
+    console.log(JSON.stringify({ manifest: {}, skipped: [], error: err.message }));
+  } finally {
+    closeAgents();
+  }
+})();
+"""
 
 
 def stage_deploy(
@@ -1337,18 +2810,34 @@ def stage_deploy(
     project_name: str,
     extraction_dir: Path | None = None,
 ):
-    """Stage 5: Deploy sections into a runnable Next.js project at output/{project}/site/."""
-    print("\n🚀 Stage 5: Deploying to Next.js project...")
+    """Stage 5: Deploy sections into a runnable Next.js project at output/{project}/site/.
+
+    Runs the deploy stages back to back; the stage graph (see PIPELINE_STAGES)
+    runs scaffold, install and assets concurrently with section generation
+    instead. stage_deploy_site installs the finished package.json itself.
+    """
+    stage_deploy_scaffold(preset, project_name, extraction_dir)
+    stage_assets(project_name, extraction_dir)
+    stage_lottie(project_name, extraction_dir)
+    stage_deploy_site(sections, section_files, project_name)
+
 
-    preset_content = read_file(SKILLS_DIR / "presets" / f"{preset}.md")
-    engine = detect_animation_engine(preset_content)
-    fonts = parse_fonts(preset_content)
-    style_header = extract_style_header(preset_content)
+@traced("stage:deploy-scaffold")
+def stage_deploy_scaffold(preset: str, project_name: str, extraction_dir: Path | None = None):
+    """Stage 5a: Next.js project files, globals.css, layout.tsx and lib/ in output/{project}/site/.
+
+    Needs only the preset (plus extraction data for Lottie and identification
+    for GSAP plugins), not the generated sections.
+    """
+    print("\n🚀 Stage 5a: Scaffolding Next.js project...")
+
+    preset_model = read_preset(preset)
+    engine = preset_model.engine
+    fonts = preset_model.fonts
 
     site_dir = OUTPUT_DIR / project_name / SITE_DIR_NAME
     src_dir = site_dir / "src"
     app_dir = src_dir / "app"
-    comp_dir = src_dir / "components" / "sections"
 
     # ── Scaffold Next.js project if it doesn't exist ──
     if not (site_dir / "package.json").exists():
@@ -1379,12 +2868,6 @@ def stage_deploy(
                     has_lottie = len(lottie_files) > 0 or len(lottie_assets) > 0
                 except (json.JSONDecodeError, OSError):
                     pass
-        # Also detect from generated sections importing DotLottieReact
-        if not has_lottie:
-            for sf in section_files:
-                if sf.exists() and "DotLottieReact" in sf.read_text(encoding="utf-8"):
-                    has_lottie = True
-                    break
         if has_lottie:
             deps["@lottiefiles/dotlottie-react"] = "^0.13.0"
             print(f"  Lottie files detected — adding @lottiefiles/dotlottie-react")
@@ -1504,7 +2987,7 @@ def stage_deploy(
             "  100% { transform: translateX(-50%); }",
             "}",
         ]
-    write_file(app_dir / "globals.css", "\n".join(css_lines) + "\n")
+    write_file_if_changed(app_dir / "globals.css", "\n".join(css_lines) + "\n")
 
     # ── Generate layout.tsx ──
     print("  Generating layout.tsx...")
@@ -1529,9 +3012,8 @@ def stage_deploy(
     # Extract weights from preset
     heading_weights = '"400"'
     body_weights = '["400", "500", "700"]'
-    h_weight_match = re.search(r"heading_weight:\s*(\d+)", preset_content)
-    if h_weight_match:
-        heading_weights = f'"{h_weight_match.group(1)}"'
+    if preset_model.weights["heading"]:
+        heading_weights = f'"{preset_model.weights["heading"]}"'
 
     # Build layout.tsx
     import_lines = ['import type { Metadata } from "next";']
@@ -1578,13 +3060,13 @@ export default function RootLayout({{ children }}: {{ children: React.ReactNode
   );
 }}
 """
-    write_file(app_dir / "layout.tsx", layout_code)
+    write_file_if_changed(app_dir / "layout.tsx", layout_code)
 
     # ── Generate cn() utility (clsx + tailwind-merge) ──
     lib_dir = src_dir / "lib"
     lib_dir.mkdir(parents=True, exist_ok=True)
     cn_util = 'import { clsx, type ClassValue } from "clsx";\nimport { twMerge } from "tailwind-merge";\n\nexport function cn(...inputs: ClassValue[]) {\n  return twMerge(clsx(inputs));\n}\n'
-    write_file(lib_dir / "utils.ts", cn_util)
+    write_file_if_changed(lib_dir / "utils.ts", cn_util)
 
     # ── GSAP setup with plugin imports when plugins detected ──
     if engine == "gsap":
@@ -1629,17 +3111,162 @@ if (typeof window !== "undefined") {{
 
 export {{ gsap, ScrollTrigger, {", ".join(plugin_registers)} }};
 '''
-                gsap_setup_path = site_dir / "src" / "lib" / "gsap-setup.ts"
-                gsap_setup_path.parent.mkdir(parents=True, exist_ok=True)
-                gsap_setup_path.write_text(gsap_setup)
-                print(f"  Created gsap-setup.ts with plugins: {', '.join(plugin_registers)}")
+                if write_file_if_changed(site_dir / "src" / "lib" / "gsap-setup.ts", gsap_setup):
+                    print(f"  Created gsap-setup.ts with plugins: {', '.join(plugin_registers)}")
+
+
+def framer_motion_imports(code: str) -> str:
+    """Rewrite motion/react imports to framer-motion (the package the site installs)."""
+    return code.replace("from 'motion/react'", "from 'framer-motion'").replace(
+        'from "motion/react"', 'from "framer-motion"')
+
+
+@traced("stage:deploy-install")
+def stage_deploy_install(project_name: str) -> bool:
+    """Stage 5b: Install the skeleton's dependencies (shared store, npm only on a miss).
+
+    Runs speculatively alongside section generation; stage_deploy_site then
+    installs only what the copied components add on top.
+    """
+    print("\n📦 Stage 5b: Installing dependencies...")
+    installed = NPM_STORE.install(OUTPUT_DIR / project_name / SITE_DIR_NAME)
+    if installed:
+        print("  ✓ Dependencies installed")
+    return installed
+
+
+@traced("stage:assets")
+def stage_assets(project_name: str, extraction_dir: Path | None = None):
+    """Stage 5c: Download extracted images into the site's public/ (shared asset cache)."""
+    if not extraction_dir:
+        return
+    print("\n🖼  Stage 5c: Downloading assets...")
+    site_dir = OUTPUT_DIR / project_name / SITE_DIR_NAME
+
+    # ── Download assets if extraction data available ──
+    extract_path = extraction_dir / "extraction-data.json"
+    if extract_path.exists():
+        print("  Downloading extracted assets...")
+        dl_result = run_node_script(
+            "download:assets", IO_SLOTS, ASSET_DOWNLOAD_SCRIPT,
+            {"extractionPath": str(extract_path), "siteDir": str(site_dir),
+             "cacheDir": str(ASSET_CACHE_DIR), "concurrency": ASSET_DOWNLOAD_CONCURRENCY},
+            cwd=str(QUALITY_DIR), timeout=ASSET_DOWNLOAD_TIMEOUT,
+        )
+        if dl_result.returncode == 0 and dl_result.stdout.strip():
+            try:
+                dl_data = json.loads(dl_result.stdout.strip())
+                count = dl_data.get("downloaded", 0)
+                if count > 0:
+                    print(f"  ✓ Downloaded {count} assets to public/ "
+                          f"({dl_data.get('cached', 0)} from the asset cache, {dl_data.get('fetched', 0)} fetched)")
+                else:
+                    skip = dl_data.get("skipped", dl_data.get("error", "unknown"))
+                    print(f"  ⚠ No assets downloaded ({skip})")
+            except json.JSONDecodeError:
+                print(f"  ⚠ Asset download output not parseable")
+        else:
+            if dl_result.stderr:
+                print(f"  ⚠ Asset download error: {dl_result.stderr[-300:]}")
+
+
+def lottie_urls(extraction_dir: Path) -> list[str]:
+    """Lottie URLs recorded in an extraction's animation-analysis.json."""
+    anim_path = extraction_dir / "animation-analysis.json"
+    if not anim_path.exists():
+        return []
+    try:
+        anim_data = json.loads(anim_path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError):
+        return []
+    urls = []
+    for lf in anim_data.get("lottieFiles", []) + ((anim_data.get("assets", {}) or {}).get("lottie", [])):
+        url = lf.get("url", "") if isinstance(lf, dict) else str(lf)
+        if url and url.startswith("http"):
+            urls.append(url)
+    return list(dict.fromkeys(urls))
+
+
+@traced("stage:lottie")
+def stage_lottie(project_name: str, extraction_dir: Path | None = None, dotlottie: bool = True) -> dict:
+    """Stage 5c (Lottie): Install extracted Lottie animations into public/lottie/.
+
+    Streams each file through the shared asset store (LOTTIE_MAX_BYTES cap),
+    validates the JSON and, with `dotlottie`, ships it as compressed .lottie.
+    Writes output/{project}/lottie-manifest.json (source URL → src) for
+    stage_deploy_site and returns it.
+    """
+    manifest_path = OUTPUT_DIR / project_name / "lottie-manifest.json"
+    urls = lottie_urls(extraction_dir) if extraction_dir else []
+    if not urls:
+        manifest_path.unlink(missing_ok=True)
+        return {}
+    print(f"\n🎞  Stage 5c: Installing {len(urls)} Lottie asset(s)...")
+    result = run_node_script(
+        "download:lottie", IO_SLOTS, LOTTIE_INSTALL_SCRIPT,
+        {"urls": urls, "siteDir": str(OUTPUT_DIR / project_name / SITE_DIR_NAME),
+         "cacheDir": str(ASSET_CACHE_DIR), "maxBytes": LOTTIE_MAX_BYTES, "dotLottie": dotlottie},
+        cwd=str(QUALITY_DIR), timeout=ASSET_DOWNLOAD_TIMEOUT,
+    )
+    try:
+        data = json.loads(result.stdout.strip())
+    except json.JSONDecodeError:
+        print(f"  ⚠ Lottie install output not parseable: {result.stderr[-200:]}")
+        return {}
+    manifest = data.get("manifest", {})
+    for skip in data.get("skipped", []):
+        print(f"  ⚠ Skipped Lottie {skip['url']}: {skip['reason']}")
+    if manifest:
+        shipped = sum(e["bytes"] for e in manifest.values())
+        source = sum(e["sourceBytes"] for e in manifest.values())
+        cached = sum(1 for e in manifest.values() if e["cached"])
+        print(f"  ✓ {len(manifest)} Lottie file(s) in public/lottie/ — {source / 1024:.1f} KB → {shipped / 1024:.1f} KB"
+              f" ({cached} from the asset cache)")
+    write_file(manifest_path, json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def apply_lottie_manifest(code: str, manifest: dict) -> str:
+    """Point /lottie/{stem}.json references in section code at the installed files."""
+    for url, entry in manifest.items():
+        stem = url.split("/")[-1].split("?")[0].split("#")[0]
+        stem = re.sub(r"\.(json|lottie)$", "", stem, flags=re.IGNORECASE) or "animation"
+        code = code.replace(f"/lottie/{stem}.json", entry["src"])
+    return code
+
+
+@traced("stage:deploy")
+def stage_deploy_site(sections: list[dict], section_files: list[Path], project_name: str):
+    """Stage 5d: Copy sections and components into the site, write page.tsx, and
+    install any dependencies the copied components added."""
+    print("\n🚀 Stage 5d: Deploying sections to Next.js project...")
+
+    site_dir = OUTPUT_DIR / project_name / SITE_DIR_NAME
+    src_dir = site_dir / "src"
+    app_dir = src_dir / "app"
+    comp_dir = src_dir / "components" / "sections"
 
     # ── Copy sections ──
     print("  Copying sections...")
     comp_dir.mkdir(parents=True, exist_ok=True)
+    lottie_manifest_path = OUTPUT_DIR / project_name / "lottie-manifest.json"
+    lottie_manifest = json.loads(read_file(lottie_manifest_path)) if lottie_manifest_path.exists() else {}
+    unchanged = 0
     for filepath in section_files:
-        code = read_file(filepath)
-        write_file(comp_dir / filepath.name, code)
+        code = apply_lottie_manifest(read_file(filepath), lottie_manifest)
+        if not write_file_if_changed(comp_dir / filepath.name, code):
+            unchanged += 1
+    if unchanged:
+        print(f"  {unchanged} section(s) unchanged in site")
+
+    # ── Lottie players in generated sections need their package ──
+    pkg_path = site_dir / "package.json"
+    pkg_data = json.loads(pkg_path.read_text(encoding="utf-8"))
+    if ("@lottiefiles/dotlottie-react" not in pkg_data.get("dependencies", {})
+            and any("DotLottieReact" in read_file(sf) for sf in section_files)):
+        pkg_data.setdefault("dependencies", {})["@lottiefiles/dotlottie-react"] = "^0.13.0"
+        write_file(pkg_path, json.dumps(pkg_data, indent=2) + "\n")
+        print("  Lottie player used in sections — adding @lottiefiles/dotlottie-react")
 
     # ── Copy animation components from library ──
     anim_components_dir = SKILLS_DIR / "animation-components"
@@ -1668,7 +3295,8 @@ export {{ gsap, ScrollTrigger, {", ".join(plugin_registers)} }};
                     if src_file.exists():
                         anim_dest.mkdir(parents=True, exist_ok=True)
                         dest_file = anim_dest / f"{pattern_name}.tsx"
-                        write_file(dest_file, src_file.read_text(encoding="utf-8"))
+                        # Compare against the import fix below, or every run would rewrite fixed files
+                        write_file_if_changed(dest_file, framer_motion_imports(src_file.read_text(encoding="utf-8")))
                         copied_count += 1
                         for dep in comp_def.get("dependencies", []):
                             new_deps[dep] = "latest"
@@ -1716,10 +3344,7 @@ export {{ gsap, ScrollTrigger, {", ".join(plugin_registers)} }};
                             f"  ⚠ {af.name}: uses motion/react instead of framer-motion"
                         )
                         # Auto-fix
-                        fixed = content.replace(
-                            "from 'motion/react'", "from 'framer-motion'"
-                        ).replace('from "motion/react"', 'from "framer-motion"')
-                        af.write_text(fixed, encoding="utf-8")
+                        af.write_text(framer_motion_imports(content), encoding="utf-8")
                         component_issues[-1] += " (auto-fixed)"
                     # Check for @/lib/utils dependency
                     if "@/lib/utils" in content:
@@ -1783,185 +3408,37 @@ export default function Page() {{
   );
 }}
 """
-    write_file(app_dir / "page.tsx", page_code)
-
-    # ── Download assets if extraction data available ──
-    if extraction_dir:
-        extract_path = extraction_dir / "extraction-data.json"
-        if extract_path.exists():
-            print("  Downloading extracted assets...")
-            download_script = f"""
-const {{ categorizeImages, getDownloadManifest }} = require('./lib/asset-injector');
-const {{ verifyAssets, downloadAssets }} = require('./lib/asset-downloader');
-
-(async () => {{
-  try {{
-    const extractionData = require('{extract_path}');
-    const categorized = categorizeImages(extractionData);
-    if (categorized.length === 0) {{
-      console.log(JSON.stringify({{ downloaded: 0, skipped: "no images" }}));
-      return;
-    }}
-    const manifest = getDownloadManifest(categorized);
-    const verified = await verifyAssets(manifest);
-    if (verified.length === 0) {{
-      console.log(JSON.stringify({{ downloaded: 0, skipped: "none accessible" }}));
-      return;
-    }}
-    const assetManifest = await downloadAssets(verified, '{site_dir}');
-    console.log(JSON.stringify({{
-      downloaded: Object.keys(assetManifest).length,
-      manifest: assetManifest
-    }}));
-  }} catch (err) {{
-    console.error(err.message);
-    console.log(JSON.stringify({{ downloaded: 0, error: err.message }}));
-  }}
-}})();
-"""
-            dl_result = subprocess.run(
-                ["node", "-e", download_script],
-                capture_output=True, text=True,
-                cwd=str(QUALITY_DIR), timeout=120,
-            )
-            if dl_result.returncode == 0 and dl_result.stdout.strip():
-                try:
-                    dl_data = json.loads(dl_result.stdout.strip())
-                    count = dl_data.get("downloaded", 0)
-                    if count > 0:
-                        print(f"  ✓ Downloaded {count} assets to public/")
-                    else:
-                        skip = dl_data.get("skipped", dl_data.get("error", "unknown"))
-                        print(f"  ⚠ No assets downloaded ({skip})")
-                except json.JSONDecodeError:
-                    print(f"  ⚠ Asset download output not parseable")
-            else:
-                if dl_result.stderr:
-                    print(f"  ⚠ Asset download error: {dl_result.stderr[-300:]}")
-
-    # ── Download Lottie assets if detected ──
-    if extraction_dir:
-        anim_path = extraction_dir / "animation-analysis.json"
-        if anim_path.exists():
-            try:
-                anim_data = json.loads(anim_path.read_text(encoding="utf-8"))
-                lottie_urls = []
-                for lf in anim_data.get("lottieFiles", []):
-                    url = lf.get("url", "") if isinstance(lf, dict) else str(lf)
-                    if url and url.startswith("http"):
-                        lottie_urls.append(url)
-                # Also check assets.lottie
-                for la in (anim_data.get("assets", {}) or {}).get("lottie", []):
-                    url = la.get("url", "") if isinstance(la, dict) else str(la)
-                    if url and url.startswith("http"):
-                        lottie_urls.append(url)
-                lottie_urls = list(set(lottie_urls))
-                if lottie_urls:
-                    print(f"  Downloading {len(lottie_urls)} Lottie assets...")
-                    lottie_dir = site_dir / "public" / "lottie"
-                    lottie_dir.mkdir(parents=True, exist_ok=True)
-                    lottie_dl_script = f"""
-const https = require('https');
-const http = require('http');
-const fs = require('fs');
-const path = require('path');
-
-const urls = {json.dumps(lottie_urls)};
-const outDir = '{lottie_dir}';
-let downloaded = 0;
-
-async function downloadOne(url) {{
-  const filename = url.split('/').pop().split('?')[0] || 'animation.json';
-  const outPath = path.join(outDir, filename);
-  const proto = url.startsWith('https') ? https : http;
-  return new Promise((resolve) => {{
-    proto.get(url, {{ timeout: 10000 }}, (res) => {{
-      if (res.statusCode >= 300 && res.statusCode < 400 && res.headers.location) {{
-        proto.get(res.headers.location, {{ timeout: 10000 }}, (r2) => {{
-          const chunks = [];
-          r2.on('data', c => chunks.push(c));
-          r2.on('end', () => {{ fs.writeFileSync(outPath, Buffer.concat(chunks)); downloaded++; resolve(); }});
-        }}).on('error', () => resolve());
-        return;
-      }}
-      const chunks = [];
-      res.on('data', c => chunks.push(c));
-      res.on('end', () => {{ if (res.statusCode === 200) {{ fs.writeFileSync(outPath, Buffer.concat(chunks)); downloaded++; }} resolve(); }});
-    }}).on('error', () => resolve());
-  }});
-}}
-
-(async () => {{
-  await Promise.all(urls.map(downloadOne));
-  console.log(JSON.stringify({{ downloaded }}));
-}})();
-"""
-                    lottie_result = subprocess.run(
-                        ["node", "-e", lottie_dl_script],
-                        capture_output=True, text=True, timeout=60,
-                    )
-                    if lottie_result.returncode == 0 and lottie_result.stdout.strip():
-                        try:
-                            ld = json.loads(lottie_result.stdout.strip())
-                            print(f"  ✓ Downloaded {ld.get('downloaded', 0)} Lottie files to public/lottie/")
-                        except json.JSONDecodeError:
-                            print("  ⚠ Lottie download output not parseable")
-                    elif lottie_result.stderr:
-                        print(f"  ⚠ Lottie download error: {lottie_result.stderr[-200:]}")
-            except (json.JSONDecodeError, OSError):
-                pass
+    write_file_if_changed(app_dir / "page.tsx", page_code)
 
-    # ── Install dependencies ──
-    print("  Installing dependencies (npm install)...")
-    result = subprocess.run(
-        ["npm", "install"],
-        capture_output=True,
-        text=True,
-        cwd=str(site_dir),
-        timeout=120,
-    )
-    if result.returncode != 0:
-        print(f"  ⚠ npm install had issues:\n{result.stderr[-500:]}")
-    else:
+    # ── Dependencies added by copied components (no-op when unchanged) ──
+    if NPM_STORE.install(site_dir):
         print("  ✓ Dependencies installed")
 
     print(f"  ✓ Site deployed to output/{project_name}/site/")
     print(f"  Run: cd output/{project_name}/site && npm run dev")
 
 
+# Per-file review results are cached by content hash (see review_engine.py)
+REVIEW_CACHE_DIR = OUTPUT_DIR / ".cache" / "review"
+REVIEW_ENGINE = ReviewEngine(cache_dir=REVIEW_CACHE_DIR)
+
+
+@traced("stage:review")
 def stage_review_v2(section_files: list[Path], site_spec: dict | None, project_name: str) -> dict:
-    """Stage 4 (v2): Deterministic consistency review. No Claude call."""
+    """Stage 4 (v2): Deterministic consistency review. No Claude call.
+
+    Per-file checks run through REVIEW_ENGINE (one scan per file, cached by
+    content); the taxonomy check needs the site-spec and runs here.
+    """
     print("\n🔍 Stage 4 (v2): Running deterministic consistency review...")
 
     issues = []
     section_count = len(section_files)
 
-    # Load site-spec style tokens if available
-    style = site_spec.get("style", {}) if site_spec else {}
-    palette = style.get("palette", {})
-
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map
-        "\U0001F1E0-\U0001F1FF"  # flags
-        "\U00002702-\U000027B0"  # dingbats
-        "\U0001F900-\U0001F9FF"  # supplemental
-        "\U0001FA00-\U0001FA6F"  # chess symbols
-        "\U0001FA70-\U0001FAFF"  # symbols extended-A
-        "]+",
-        flags=re.UNICODE
-    )
-
-    placeholder_patterns = [
-        "/api/placeholder", "via.placeholder.com", "placehold.co",
-        "placekitten.com", "picsum.photos", "placeholder.svg",
-        "example.com/image", "unsplash.com/random",
-    ]
-
+    # ── Per-file checks (see review_engine.py for the rule set) ───
+    file_issues = REVIEW_ENGINE.review([f for f in section_files if f.exists()])
     for section_file in section_files:
-        if not section_file.exists():
+        if section_file not in file_issues:
             issues.append({
                 "file": section_file.name,
                 "severity": "error",
@@ -1969,85 +3446,24 @@ def stage_review_v2(section_files: list[Path], site_spec: dict | None, project_n
                 "message": f"Section file not found: {section_file}"
             })
             continue
-
-        code = section_file.read_text()
-        filename = section_file.name
-
-        # ── Check: "use client" directive ──────────────────────────
-        if '"use client"' not in code and "'use client'" not in code:
-            issues.append({
-                "file": filename,
-                "severity": "error",
-                "check": "use_client",
-                "message": "Missing 'use client' directive"
-            })
-
-        # ── Check: export default present ──────────────────────────
-        if 'export default' not in code:
-            issues.append({
-                "file": filename,
-                "severity": "error",
-                "check": "export_default",
-                "message": "Missing 'export default' — component won't render"
-            })
-
-        # ── Check: balanced braces ─────────────────────────────────
-        open_braces = code.count('{')
-        close_braces = code.count('}')
-        if open_braces != close_braces:
-            issues.append({
-                "file": filename,
-                "severity": "error",
-                "check": "brace_balance",
-                "message": f"Unbalanced braces: {open_braces} open, {close_braces} close"
-            })
-
-        # ── Check: no emoji characters ─────────────────────────────
-        emoji_matches = emoji_pattern.findall(code)
-        if emoji_matches:
-            issues.append({
-                "file": filename,
-                "severity": "warning",
-                "check": "no_emoji",
-                "message": f"Contains emoji characters: {emoji_matches[:3]}"
-            })
-
-        # ── Check: no placeholder image URLs ───────────────────────
-        for pattern in placeholder_patterns:
-            if pattern in code:
-                issues.append({
-                    "file": filename,
-                    "severity": "warning",
-                    "check": "no_placeholder_images",
-                    "message": f"Contains placeholder image URL: {pattern}"
-                })
-
-        # ── Check: imports are valid (basic) ───────────────────────
-        import_lines = [l.strip() for l in code.split('\n') if l.strip().startswith('import ')]
-        for imp_line in import_lines:
-            if "from ''" in imp_line or 'from ""' in imp_line:
-                issues.append({
-                    "file": filename,
-                    "severity": "error",
-                    "check": "valid_imports",
-                    "message": f"Empty import source: {imp_line[:80]}"
-                })
-            if "from 'motion/react'" in imp_line or 'from "motion/react"' in imp_line:
-                issues.append({
-                    "file": filename,
-                    "severity": "warning",
-                    "check": "valid_imports",
-                    "message": f"Import from 'motion/react' should be 'framer-motion': {imp_line[:80]}"
-                })
-
-        # ── Check: JSX is not truncated ────────────────────────────
-        stripped = code.rstrip()
-        if stripped and not stripped.endswith(('}', ';', ')', '`', '"', "'")):
+        issues.extend(file_issues[section_file])
+
+    # ── Check: archetype / variant known to the taxonomy ───────────
+    if site_spec:
+        taxonomy = load_taxonomy(SKILLS_DIR / "section-taxonomy.md")
+        for spec, section_file in zip(site_spec.get("sections", []), section_files):
+            archetype, variant = spec.get("archetype", ""), spec.get("variant", "")
+            if not taxonomy.is_known(archetype):
+                message = f"Archetype '{archetype}' is not in section-taxonomy.md"
+            elif variant and not taxonomy.is_known(archetype, variant):
+                message = f"Variant '{variant}' is not a listed {archetype} variant"
+            else:
+                continue
             issues.append({
-                "file": filename,
+                "file": section_file.name,
                 "severity": "warning",
-                "check": "not_truncated",
-                "message": f"File may be truncated — ends with: ...{stripped[-20:]}"
+                "check": "taxonomy",
+                "message": message,
             })
 
     # ── Summary ────────────────────────────────────────────────────
@@ -2067,7 +3483,7 @@ def stage_review_v2(section_files: list[Path], site_spec: dict | None, project_n
     output_dir = OUTPUT_DIR / project_name
     output_dir.mkdir(parents=True, exist_ok=True)
     review_path = output_dir / "review.json"
-    review_path.write_text(json.dumps(result, indent=2))
+    write_file_if_changed(review_path, json.dumps(result, indent=2))
 
     # Also write human-readable review.md
     review_md = "# Consistency Review (v2 — Deterministic)\n\n"
@@ -2084,9 +3500,10 @@ def stage_review_v2(section_files: list[Path], site_spec: dict | None, project_n
     else:
         review_md += "No issues found.\n"
 
-    (output_dir / "review.md").write_text(review_md)
+    write_file_if_changed(output_dir / "review.md", review_md)
 
     # Print summary
+    print(f"  Review engine: {REVIEW_ENGINE.summary()}")
     print(f"  {'✅ PASS' if passed else '❌ FAIL'}: {len(errors)} errors, {len(warnings)} warnings")
     for issue in errors:
         print(f"    ❌ {issue['file']}: {issue['message']}")
@@ -2098,12 +3515,12 @@ def stage_review_v2(section_files: list[Path], site_spec: dict | None, project_n
     return result
 
 
+@traced("stage:review")
 def stage_review(sections: list[dict], section_files: list[Path], preset: str, project_name: str):
     """Stage 4: Run consistency review."""
     print("\n🔍 Stage 4: Running consistency review...")
 
-    preset_content = read_file(SKILLS_DIR / "presets" / f"{preset}.md")
-    style_header = extract_style_header(preset_content)
+    style_header = read_preset(preset).style_header
 
     # Concatenate all section code
     all_sections_code = ""
@@ -2170,6 +3587,7 @@ End with:
     print(f"\n{review}")
 
 
+@traced("stage:validate")
 def stage_validate(project_name: str) -> dict:
     """Stage 5.5: Pre-flight validation — catch errors before deployment."""
     print("\n═══ STAGE 5.5: PRE-FLIGHT VALIDATION ═══\n")
@@ -2184,8 +3602,12 @@ def stage_validate(project_name: str) -> dict:
     if not section_files:
         issues.append("CRITICAL: No section files found in sections/")
     else:
+        contents = {sf: sf.read_text(encoding="utf-8") for sf in section_files}
+        checked = [sf for sf in section_files if len(contents[sf].strip()) >= 50]
+        truncation_results = dict(zip(checked, _detect_and_repair_truncation_all(
+            [(sf.name, contents[sf]) for sf in checked])))
         for sf in section_files:
-            content = sf.read_text(encoding="utf-8")
+            content = contents[sf]
             if len(content.strip()) < 50:
                 issues.append(f"CRITICAL: {sf.name} is nearly empty ({len(content)} chars)")
                 continue
@@ -2199,7 +3621,7 @@ def stage_validate(project_name: str) -> dict:
                 issues.append(f"CRITICAL: {sf.name} missing export default")
 
             # 4. Truncation detection & auto-repair (v1.1.1 — replaces basic brace check)
-            truncation_result = _detect_and_repair_truncation(content, sf.name)
+            truncation_result = truncation_results.get(sf)
             if truncation_result and truncation_result.get("truncated"):
                 if truncation_result.get("repaired"):
                     sf.write_text(truncation_result["code"], encoding="utf-8")
@@ -2256,13 +3678,18 @@ def stage_validate(project_name: str) -> dict:
 
 # --- Main ---
 
-def main():
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Command-line options for one pipeline run (also used by orchestrate_batch.py)."""
     parser = argparse.ArgumentParser(description="Website Builder Pipeline")
     parser.add_argument("project", help="Project name (must match a brief in briefs/)")
     parser.add_argument("--preset", help="Override preset selection", default=None)
     parser.add_argument("--no-pause", action="store_true", help="Skip scaffold review checkpoint")
-    parser.add_argument("--skip-to", choices=["sections", "assemble", "review", "deploy"],
-                        help="Skip to a specific stage (uses existing scaffold)")
+    parser.add_argument("--skip-to", choices=[s for s in PIPELINE_STAGES if s not in DERIVED_STAGES],
+                        help="Reuse every stage upstream of this one from an earlier run (uses existing scaffold)")
+    parser.add_argument("--only", action="append", metavar="STAGE",
+                        choices=[s for s in PIPELINE_STAGES if s not in ("extract", "identify")],
+                        help="Run only this stage (repeatable), reusing the stages it depends on; "
+                             "derived stages such as contexts and deploy-scaffold are recomputed")
     parser.add_argument("--deploy", action="store_true",
                         help="Also deploy to a runnable Next.js project at output/{project}/site/")
     parser.add_argument("--from-url", help="Clone mode: extract from URL, auto-generate preset + brief",
@@ -2271,18 +3698,108 @@ def main():
                         help="Delete existing output and start completely fresh")
     parser.add_argument("--force", action="store_true",
                         help="Ignore warnings (low confidence, validation issues) and proceed")
+    parser.add_argument("--concurrency", type=int, default=1, metavar="N",
+                        help="Generate up to N sections in flight during Stage 2 (default: 1)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream section code to sections/*.partial as it is generated")
+    parser.add_argument("--batch-api", action="store_true",
+                        help="Submit all sections as one Message Batch (cheaper, not interactive; resumable)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the Claude response cache (output/.cache/llm/) entirely")
+    parser.add_argument("--refresh-cache", action="store_true",
+                        help="Ignore cached Claude responses but store the fresh ones")
+    parser.add_argument("--refresh-extraction", action="store_true",
+                        help="Re-crawl the --from-url site instead of reusing a cached extraction "
+                             "(output/.cache/extractions/); the fresh result replaces the cached one")
+    parser.add_argument("--extraction-max-age", type=float, default=None, metavar="HOURS",
+                        help=f"Reuse cached extractions up to this old (default: {EXTRACTION_CACHE_MAX_AGE_HOURS})")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from its checkpoint (re-validates written sections)")
+    parser.add_argument("--only-section", type=int, action="append", metavar="N",
+                        help="Regenerate only section N (1-based; repeatable). Implies --skip-to sections")
+    parser.add_argument("--no-npm-store", action="store_true",
+                        help="Run a plain npm install in site/ instead of linking from output/.cache/npm/")
+    parser.add_argument("--npm-offline", action="store_true",
+                        help="Install with npm --offline (npm cache / local mirror only, no network)")
+    parser.add_argument("--npm-registry", default=None, metavar="URL",
+                        help="npm registry for store misses, e.g. a local mirror at http://localhost:4873")
+    parser.add_argument("--lottie-json", action="store_true",
+                        help="Ship Lottie animations as plain JSON instead of compressed .lottie")
+    parser.add_argument("--otlp-endpoint", default=None, metavar="URL",
+                        help="Also export trace spans to an OTLP/HTTP collector, e.g. http://localhost:4318 "
+                             "(default: $OTEL_EXPORTER_OTLP_ENDPOINT)")
+    return parser
+
+
+def run_pipeline(args: argparse.Namespace):
+    """Run the pipeline for one project. Exits via SystemExit on fatal errors.
+
+    Every stage, Claude call, Node call and subprocess is traced to
+    output/{project}/trace.jsonl under one "pipeline" root span.
+    """
+    CURRENT_PROJECT.set(args.project)
+    if args.otlp_endpoint:
+        TRACER.otlp_endpoint = args.otlp_endpoint
+    try:
+        with TRACER.span("pipeline", "stage", skip_to=args.skip_to, from_url=args.from_url):
+            _run_pipeline(args)
+    finally:
+        TRACER.flush(args.project)
 
-    args = parser.parse_args()
+
+def _run_pipeline(args: argparse.Namespace):
+    """Plan the stage graph for the requested flags, then run it (see PIPELINE_STAGES)."""
+    if args.resume and (args.skip_to or args.only or args.from_url or args.clean):
+        print("Error: --resume cannot be combined with --skip-to, --only, --from-url or --clean")
+        sys.exit(1)
+    if args.skip_to and args.only:
+        print("Error: --skip-to and --only cannot be combined")
+        sys.exit(1)
+    if args.only_section and not (args.skip_to or args.only):
+        args.skip_to = "sections"
+
+    if args.no_cache:
+        LLM_CACHE.mode = "off"
+    elif args.refresh_cache:
+        LLM_CACHE.mode = "refresh"
+    if args.refresh_extraction:
+        EXTRACTION_CACHE.mode = "refresh"
+    if args.extraction_max_age is not None:
+        EXTRACTION_CACHE.max_age_hours = args.extraction_max_age
+    if args.no_npm_store:
+        NPM_STORE.enabled = False
+    NPM_STORE.offline = NPM_STORE.offline or args.npm_offline
+    NPM_STORE.registry = args.npm_registry or NPM_STORE.registry
 
     output_dir = OUTPUT_DIR / args.project
     if args.clean and output_dir.exists():
-        import shutil
         shutil.rmtree(output_dir)
         print(f"  🗑 Removed existing output: {output_dir}")
 
+    deploy = args.deploy or args.skip_to in SITE_STAGES
+    targets = args.only or ["review"] + (["deploy", "assets"] if deploy else [])
+    cp = load_checkpoint(args.project)
+
+    if args.resume:
+        if not cp:
+            print(f"Error: No checkpoint to resume at output/{args.project}/checkpoint.json")
+            sys.exit(1)
+        completed = completed_stages(cp)
+        if "scaffold" not in completed:
+            print(f"Error: Checkpoint is '{cp.get('stage')}' — rerun with --from-url to finish Stage 0")
+            sys.exit(1)
+        plan = plan_stages(targets, completed=completed)
+        pending = [stage for stage, action in plan.items() if action == "run" and stage not in DERIVED_STAGES]
+        if not pending:
+            print(f"  ✓ Nothing to resume: checkpoint stage '{cp.get('stage')}' is the last requested stage")
+            return
+        print(f"  ↻ Resuming '{args.project}' from checkpoint stage '{cp.get('stage')}' → {', '.join(pending)}")
+    else:
+        plan = plan_stages(targets, skip_to=args.skip_to, only=args.only)
+
     # ── Project Collision Detection ────────────────────────────────
-    # Prevent accidental overwrites when not using --skip-to (which expects existing project)
-    if not args.skip_to:
+    # Prevent accidental overwrites unless the run reuses earlier stages
+    if not (args.skip_to or args.only or args.resume):
         existing_scaffold = OUTPUT_DIR / args.project / "scaffold.md"
         if existing_scaffold.exists():
             print(f"\n⚠️  Project '{args.project}' already exists at: output/{args.project}/")
@@ -2290,11 +3807,82 @@ def main():
             print(f"    To start fresh, delete the directory or use a different project name.")
             sys.exit(1)
 
-    section_contexts = None  # Only populated in URL clone mode
-    extraction_dir = None    # Only populated in URL clone mode
-    identification = None    # Only populated in URL clone mode (v0.9.0)
-    site_spec = None         # Only populated when build-site-spec.js succeeds (--from-url)
+    # Loaded stages need their outputs from an earlier run
+    loaded = {stage for stage, action in plan.items() if action == "load"}
+    if loaded and not args.resume:
+        if cp:
+            missing = sorted(loaded - completed_stages(cp))
+            if missing:
+                print(f"Error: Cannot reuse stage(s) {', '.join(missing)}: not completed "
+                      f"(checkpoint is '{cp.get('stage')}'). Run them first.")
+                sys.exit(1)
+        else:
+            print("  ⚠ No checkpoint found; reusing stages from filesystem state (backward compatibility).")
+
+    state = {
+        "plan": plan,
+        "preset": None,
+        "brief": None,
+        "section_contexts": None,  # Only populated in URL clone mode
+        "extraction_dir": None,    # Only populated in URL clone mode
+        "identification": None,    # Only populated in URL clone mode (v0.9.0)
+        "site_spec": None,         # Only populated when build-site-spec.js succeeds (--from-url)
+        "scaffold_review": False,  # A fresh Claude scaffold awaits the interactive review
+        "deploy_ran": False,
+    }
+
+    def run_graph(stages: list[str]):
+        graph = TaskGraph(max_workers=len(stages))
+        for stage in stages:
+            deps = [d for d in PIPELINE_STAGES[stage][0] if d in stages]
+            graph.add(stage, functools.partial(_run_stage, stage, plan[stage], args, state),
+                      deps=deps, optional=stage in OPTIONAL_STAGES)
+        graph.run()
+
+    # The scaffold review prompt reads stdin: run the stages up to the scaffold,
+    # prompt with nothing else running, then run the rest
+    if plan.get("scaffold") == "run" and not args.no_pause:
+        upto = stage_ancestors("scaffold") | {"scaffold"}
+        run_graph([stage for stage in plan if stage in upto])
+        if state["scaffold_review"]:
+            sections = parse_scaffold(review_scaffold(args.project))
+            if sections != state["sections"]:
+                _set_sections(args, state, sections)
+        run_graph([stage for stage in plan if stage not in upto])
+    else:
+        run_graph(list(plan))
+
+    # Print gap report summary if available (v0.9.0)
+    if args.from_url:
+        print_gap_summary(args.project)
+
+    mode_label = "URL Clone" if args.from_url else "Pipeline"
+    print(f"\n{'═' * 60}")
+    print(f"  ✅ {mode_label} complete")
+    print(f"  Output: output/{args.project}/")
+    if state["deploy_ran"]:
+        print(f"  Site:   output/{args.project}/site/")
+    if args.from_url:
+        print(f"  Preset: skills/presets/{state['preset']}.md")
+        print(f"  Brief:  briefs/{args.project}.md")
+    if LLM_CACHE.mode != "off":
+        print(f"  {LLM_CACHE.summary()}")
+    if TOKEN_USAGE.totals(args.project)["calls"]:
+        TOKEN_USAGE.save(output_dir / "token-usage.json", project=args.project)
+        print(f"  {TOKEN_USAGE.summary(args.project)}")
+    print(f"  {TRACER.summary(args.project)} (spans: output/{args.project}/trace.jsonl)")
+    print(f"{'═' * 60}\n")
+
+
+def _run_stage(stage: str, action: str, args: argparse.Namespace, state: dict, _results: dict):
+    """Run (or load the outputs of) one pipeline stage; checkpoint it if it ran."""
+    STAGE_HANDLERS[stage](args, state, action == "run")
+    if action == "run" and stage not in DERIVED_STAGES:
+        data = {"section_count": len(state["section_files"])} if stage == "sections" else None
+        save_checkpoint(OUTPUT_DIR / args.project, stage, args.project, data, complete=True)
+
 
+def _stage_extract(args: argparse.Namespace, state: dict, run: bool):
     # ── URL Clone Mode ──────────────────────────────────────────────
     if args.from_url:
         print(f"\n{'═' * 60}")
@@ -2304,25 +3892,19 @@ def main():
         print(f"  Time:    {datetime.now().strftime('%Y-%m-%d %H:%M')}")
         print(f"{'═' * 60}")
 
-        preset, brief, section_contexts, extraction_dir, site_spec = stage_url_extract(
-            args.from_url, args.project
-        )
-        save_checkpoint(output_dir, "extract", args.project)
-
-        # Stage 0d: Pattern identification (v0.9.0)
-        if extraction_dir and extraction_dir.exists():
-            identification = stage_identify(extraction_dir, args.project)
-            save_checkpoint(output_dir, "identify", args.project)
+        # Pattern identification (v0.9.0) runs inside Stage 0, alongside the brief
+        (state["preset"], state["brief"], state["section_contexts"], state["extraction_dir"],
+         state["site_spec"], state["identification"]) = stage_url_extract(args.from_url, args.project)
 
         print(f"\n{'═' * 60}")
         print(f"  Stage 0 complete — switching to standard pipeline")
-        print(f"  Preset:  {preset}")
+        print(f"  Preset:  {state['preset']}")
         print(f"  Brief:   briefs/{args.project}.md")
-        print(f"  Context: {len(section_contexts)} section(s)")
-        if identification:
-            print(f"  Patterns: {identification.get('sectionCount', 0)} sections identified")
-        if site_spec:
-            print(f"  Site spec: {len(site_spec.get('sections', []))} sections")
+        print(f"  Context: {len(state['section_contexts'])} section(s)")
+        if state["identification"]:
+            print(f"  Patterns: {state['identification'].get('sectionCount', 0)} sections identified")
+        if state["site_spec"]:
+            print(f"  Site spec: {len(state['site_spec'].get('sections', []))} sections")
         print(f"{'═' * 60}")
 
     # ── Standard Mode ───────────────────────────────────────────────
@@ -2334,7 +3916,7 @@ def main():
             print(f"Available briefs: {[f.stem for f in BRIEFS_DIR.glob('*.md') if f.stem != '_template']}")
             sys.exit(1)
 
-        brief = read_file(brief_path)
+        state["brief"] = read_file(brief_path)
 
         # Determine preset
         preset = args.preset
@@ -2351,6 +3933,7 @@ def main():
         if not preset_path.exists():
             print(f"Error: Preset not found: {preset_path}")
             sys.exit(1)
+        state["preset"] = preset
 
         print(f"\n{'═' * 60}")
         print(f"  Website Builder Pipeline")
@@ -2359,83 +3942,65 @@ def main():
         print(f"  Time:    {datetime.now().strftime('%Y-%m-%d %H:%M')}")
         print(f"{'═' * 60}")
 
-    # ── Common Pipeline ─────────────────────────────────────────────
-
     # Resolve extraction_dir from previous runs if not set (e.g. --skip-to mode)
-    if extraction_dir is None:
-        extraction_base = OUTPUT_DIR / "extractions"
-        if extraction_base.exists():
-            # Try exact project name first, then preset name as fallback
-            search_prefixes = [f"{args.project}-"]
-            if preset and preset != args.project:
-                search_prefixes.append(f"{preset}-")
-            for prefix in search_prefixes:
-                candidates = sorted(
-                    [d for d in extraction_base.iterdir()
-                     if d.is_dir() and d.name.startswith(prefix)],
-                    key=lambda d: d.stat().st_mtime,
-                    reverse=True,
-                )
-                if candidates:
-                    extraction_dir = candidates[0]
-                    print(f"  Resolved extraction dir: {extraction_dir.name}")
-                    break
-
-    # Load identification data if not already set (e.g. --skip-to without --from-url)
-    if identification is None:
-        id_path = OUTPUT_DIR / args.project / "identification.json"
-        if id_path.exists():
-            try:
-                identification = json.loads(id_path.read_text(encoding="utf-8"))
-                plugins_found = identification.get("detectedPlugins", [])
-                if plugins_found:
-                    print(f"  Identification loaded: {len(plugins_found)} plugins detected ({', '.join(plugins_found)})")
-            except (json.JSONDecodeError, OSError):
-                print("  ⚠ Could not load identification.json")
+    if state["extraction_dir"] is None:
+        state["extraction_dir"] = resolve_extraction_dir(args.project, state["preset"])
+        if state["extraction_dir"]:
+            print(f"  Resolved extraction dir: {state['extraction_dir'].name}")
 
     # Load site_spec from file when not set (e.g. --skip-to after a from_url run)
-    if site_spec is None:
+    if state["site_spec"] is None:
         site_spec_path = OUTPUT_DIR / args.project / "site-spec.json"
         if site_spec_path.exists():
             try:
-                site_spec = json.loads(site_spec_path.read_text(encoding="utf-8"))
-                print(f"  ✓ site-spec.json loaded ({len(site_spec.get('sections', []))} sections)")
+                state["site_spec"] = json.loads(site_spec_path.read_text(encoding="utf-8"))
+                print(f"  ✓ site-spec.json loaded ({len(state['site_spec'].get('sections', []))} sections)")
             except (json.JSONDecodeError, OSError):
                 pass
 
-    if args.skip_to:
-        cp = load_checkpoint(args.project)
-        if cp:
-            skip_idx = _stage_index(args.skip_to)
-            # To run from skip_to we need the previous stage completed
-            need_idx = skip_idx - 1 if skip_idx > 0 else 0
-            cur_idx = _stage_index(cp.get("stage", ""))
-            if cur_idx >= 0 and cur_idx < need_idx:
-                print(f"Error: Cannot --skip-to {args.skip_to}: checkpoint is '{cp.get('stage')}' (complete stages up to {STAGE_ORDER[need_idx]} first).")
-                sys.exit(1)
-        else:
-            print("  ⚠ No checkpoint found; --skip-to proceeds using filesystem state (backward compatibility).")
+    # Section fingerprints include the reference contexts, so a run that did not
+    # extract must see the same ones as the --from-url run that wrote the sections
+    if state["section_contexts"] is None:
+        state["section_contexts"] = load_section_contexts(args.project, state["extraction_dir"])
 
-        # v2.0.0: prefer rich sections from site-spec.json over scaffold parsing
-        if site_spec:
-            _scaffold_text, sections = stage_scaffold_v2(site_spec, args.project)
+
+def _stage_identify(args: argparse.Namespace, state: dict, run: bool):
+    # Clone mode identifies inside Stage 0; otherwise load identification.json if a run left one
+    if state["identification"] is not None:
+        return
+    id_path = OUTPUT_DIR / args.project / "identification.json"
+    if id_path.exists():
+        try:
+            state["identification"] = json.loads(id_path.read_text(encoding="utf-8"))
+            plugins_found = state["identification"].get("detectedPlugins", [])
+            if plugins_found:
+                print(f"  Identification loaded: {len(plugins_found)} plugins detected ({', '.join(plugins_found)})")
+        except (json.JSONDecodeError, OSError):
+            print("  ⚠ Could not load identification.json")
+
+
+def _stage_scaffold(args: argparse.Namespace, state: dict, run: bool):
+    # v2.0.0: prefer rich sections from site-spec.json over scaffold parsing
+    if state["site_spec"]:
+        _scaffold_text, sections = stage_scaffold_v2(state["site_spec"], args.project)
+        if not run:
             print(f"  ✓ Using rich sections from site-spec.json ({len(sections)} sections)")
-        else:
-            scaffold_path = OUTPUT_DIR / args.project / "scaffold.md"
-            if not scaffold_path.exists():
-                print(f"Error: No existing scaffold at {scaffold_path}")
-                sys.exit(1)
-            scaffold = read_file(scaffold_path)
-            sections = parse_scaffold(scaffold)
+    elif run:
+        # Reviewed by _run_pipeline once this graph has finished (see review_scaffold)
+        scaffold = stage_scaffold(state["brief"], state["preset"], args.project, True,
+                                  state["identification"])
+        state["scaffold_review"] = not args.no_pause
+        sections = parse_scaffold(scaffold)
     else:
-        if site_spec:
-            scaffold, sections = stage_scaffold_v2(site_spec, args.project)
-            save_checkpoint(output_dir, "scaffold", args.project)
-        else:
-            scaffold = stage_scaffold(brief, preset, args.project, args.no_pause, identification)
-            save_checkpoint(output_dir, "scaffold", args.project)
-            sections = parse_scaffold(scaffold)
+        scaffold_path = OUTPUT_DIR / args.project / "scaffold.md"
+        if not scaffold_path.exists():
+            print(f"Error: No existing scaffold at {scaffold_path}")
+            sys.exit(1)
+        sections = parse_scaffold(read_file(scaffold_path))
+    _set_sections(args, state, sections)
 
+
+def _set_sections(args: argparse.Namespace, state: dict, sections: list[dict]):
     if not sections:
         print("Error: Could not parse any sections from scaffold.")
         print("Expected format: N. ARCHETYPE | variant | content direction")
@@ -2443,61 +4008,107 @@ def main():
 
     print(f"\n  Parsed {len(sections)} sections from scaffold")
 
-    if args.skip_to in (None, "sections"):
-        section_files = stage_sections(
-            sections, preset, args.project, section_contexts, extraction_dir, identification,
-            site_spec=site_spec,
+    bad = [n for n in (args.only_section or []) if not 1 <= n <= len(sections)]
+    if bad:
+        print(f"Error: --only-section must be between 1 and {len(sections)} (got {', '.join(map(str, bad))})")
+        sys.exit(1)
+    state["sections"] = sections
+
+
+def _stage_contexts(args: argparse.Namespace, state: dict, run: bool):
+    # Only section generation reads the contexts
+    if state["plan"].get("sections") == "run":
+        state["contexts"] = build_injection_contexts(
+            state["sections"], state["preset"], state["extraction_dir"], state["identification"]
+        )
+
+
+def _stage_sections(args: argparse.Namespace, state: dict, run: bool):
+    if run:
+        state["section_files"] = stage_sections(
+            state["sections"], state["preset"], args.project, state["section_contexts"],
+            state["extraction_dir"], state["identification"],
+            site_spec=state["site_spec"], concurrency=args.concurrency, stream=args.stream,
+            batch_api=args.batch_api, only_sections=args.only_section, resume=args.resume,
+            contexts=state.get("contexts"),
         )
-        save_checkpoint(output_dir, "sections", args.project, {"section_count": len(section_files)})
     else:
-        section_dir = OUTPUT_DIR / args.project / "sections"
-        section_files = sorted(section_dir.glob("*.tsx"))
+        state["section_files"] = sorted((OUTPUT_DIR / args.project / "sections").glob("*.tsx"))
 
-    if args.skip_to in (None, "sections", "assemble"):
-        stage_assemble(sections, section_files, args.project)
-        save_checkpoint(output_dir, "assemble", args.project)
 
-    if args.skip_to in (None, "sections", "assemble", "review"):
-        site_spec_path = output_dir / "site-spec.json"
-        site_spec = None
-        if site_spec_path.exists():
-            try:
-                site_spec = json.loads(site_spec_path.read_text(encoding="utf-8"))
-            except (json.JSONDecodeError, OSError):
-                pass
-        if site_spec:
-            stage_review_v2(section_files, site_spec, args.project)
-        else:
-            stage_review(sections, section_files, preset, args.project)
-        save_checkpoint(output_dir, "review", args.project)
+def _stage_assemble(args: argparse.Namespace, state: dict, run: bool):
+    if run:
+        stage_assemble(state["sections"], state["section_files"], args.project)
+
 
+def _stage_review(args: argparse.Namespace, state: dict, run: bool):
+    if not run:
+        return
+    site_spec_path = OUTPUT_DIR / args.project / "site-spec.json"
+    site_spec = None
+    if site_spec_path.exists():
+        try:
+            site_spec = json.loads(site_spec_path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            pass
+    if site_spec:
+        stage_review_v2(state["section_files"], site_spec, args.project)
+    else:
+        stage_review(state["sections"], state["section_files"], state["preset"], args.project)
+
+
+def _stage_validate(args: argparse.Namespace, state: dict, run: bool):
     # Stage 5.5: Pre-flight validation (before deploy)
-    deploy_ran = False
-    if args.deploy or args.skip_to == "deploy":
-        validation = stage_validate(args.project)
-        if not validation['passed']:
-            print("\n  ⚠ Pre-flight validation found critical issues.")
-            if not args.force:
-                print("  Use --force to deploy anyway, or fix the issues above.")
-        if validation['passed'] or args.force:
-            stage_deploy(sections, section_files, preset, args.project, extraction_dir)
-            save_checkpoint(output_dir, "deploy", args.project)
-            deploy_ran = True
+    state["validation"] = stage_validate(args.project)
+    if not state["validation"]["passed"]:
+        print("\n  ⚠ Pre-flight validation found critical issues.")
+        if not args.force:
+            print("  Use --force to deploy anyway, or fix the issues above.")
 
-    # Print gap report summary if available (v0.9.0)
-    if args.from_url:
-        print_gap_summary(args.project)
 
-    mode_label = "URL Clone" if args.from_url else "Pipeline"
-    print(f"\n{'═' * 60}")
-    print(f"  ✅ {mode_label} complete")
-    print(f"  Output: output/{args.project}/")
-    if deploy_ran:
-        print(f"  Site:   output/{args.project}/site/")
-    if args.from_url:
-        print(f"  Preset: skills/presets/{preset}.md")
-        print(f"  Brief:  briefs/{args.project}.md")
-    print(f"{'═' * 60}\n")
+def _stage_deploy_scaffold(args: argparse.Namespace, state: dict, run: bool):
+    stage_deploy_scaffold(state["preset"], args.project, state["extraction_dir"])
+
+
+def _stage_deploy_install(args: argparse.Namespace, state: dict, run: bool):
+    stage_deploy_install(args.project)
+
+
+def _stage_assets(args: argparse.Namespace, state: dict, run: bool):
+    stage_assets(args.project, state["extraction_dir"])
+
+
+def _stage_lottie(args: argparse.Namespace, state: dict, run: bool):
+    stage_lottie(args.project, state["extraction_dir"], dotlottie=not args.lottie_json)
+
+
+def _stage_deploy(args: argparse.Namespace, state: dict, run: bool):
+    if not run:
+        return
+    if state["validation"]["passed"] or args.force:
+        stage_deploy_site(state["sections"], state["section_files"], args.project)
+        state["deploy_ran"] = True
+
+
+STAGE_HANDLERS = {
+    "extract": _stage_extract,
+    "identify": _stage_identify,
+    "scaffold": _stage_scaffold,
+    "contexts": _stage_contexts,
+    "sections": _stage_sections,
+    "assemble": _stage_assemble,
+    "review": _stage_review,
+    "validate": _stage_validate,
+    "deploy-scaffold": _stage_deploy_scaffold,
+    "deploy-install": _stage_deploy_install,
+    "assets": _stage_assets,
+    "lottie": _stage_lottie,
+    "deploy": _stage_deploy,
+}
+
+
+def main():
+    run_pipeline(build_arg_parser().parse_args())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Website Builder — Batch Runner
+
+Builds many projects in one process instead of one `orchestrate.py` run per
+brief. Projects run side by side and share one interpreter, one response
+cache, a small pool of Node workers and bounded pools for Claude API calls,
+Node/CPU subprocesses and npm installs / downloads.
+
+Usage:
+  python scripts/orchestrate_batch.py briefs/*.md --deploy
+  python scripts/orchestrate_batch.py arclin tag-heuer --jobs 2
+  python scripts/orchestrate_batch.py https://example.com shop=https://shop.example.com
+
+Targets:
+  briefs/<name>.md or <name>   Brief mode. Preset from --preset, the brief's
+                               "**Preset:**" line, or skills/presets/<name>.md
+  https://...                  URL clone mode, project named after the host
+  <name>=https://...           URL clone mode with an explicit project name
+
+Each project writes only to output/<project>/ and logs everything to
+output/<project>/batch.log; the console shows the same lines prefixed with
+[project]. Projects that already have a scaffold continue from Stage 2
+(unchanged sections are skipped) unless --clean is given. URL projects reuse
+the section contexts and extraction dir their first run saved; if neither
+is left, Stage 0 runs again (served from the extraction cache when fresh)
+so sections keep their reference context.
+
+A summary of wall time, tokens and failures is printed at the end and saved
+to output/batch-summary.json.
+"""
+
+import argparse
+import io
+import json
+import re
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).parent))
+import orchestrate  # noqa: E402
+from orchestrate import (  # noqa: E402
+    BRIEFS_DIR,
+    CURRENT_PROJECT,
+    LLM_CACHE,
+    NPM_STORE,
+    OUTPUT_DIR,
+    SKILLS_DIR,
+    TOKEN_USAGE,
+)
+
+# Defaults for the shared pools (see orchestrate.configure_pools)
+DEFAULT_JOBS = 4           # projects in flight
+DEFAULT_LLM_SLOTS = 8      # concurrent Claude API calls across all projects
+DEFAULT_NODE_SLOTS = 4     # concurrent Node/CPU subprocesses (Stage 0)
+DEFAULT_NODE_WORKERS = 2   # persistent injector workers
+DEFAULT_IO_SLOTS = 2       # concurrent npm installs / asset downloads
+DEFAULT_SECTION_CONCURRENCY = 4
+
+
+# --- Targets ---
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def brief_preset(brief_text: str) -> str | None:
+    """Return the preset named in a brief's "**Preset:** name" line, if any."""
+    match = re.search(r"\*\*Preset:\*\*\s*([\w-]+)", brief_text)
+    return match.group(1) if match else None
+
+
+def resolve_target(spec: str, preset_override: str | None = None) -> dict:
+    """Turn a command-line target into {project, url, preset}. Raises ValueError."""
+    name, sep, rest = spec.partition("=")
+    if sep and rest.startswith(("http://", "https://")):
+        return {"project": slugify(name), "url": rest, "preset": None}
+    if spec.startswith(("http://", "https://")):
+        host = urlparse(spec).hostname or spec
+        return {"project": slugify(re.sub(r"^www\.", "", host)), "url": spec, "preset": None}
+
+    project = Path(spec).stem if spec.endswith(".md") else spec
+    brief_path = BRIEFS_DIR / f"{project}.md"
+    if not brief_path.exists():
+        raise ValueError(f"no brief at briefs/{project}.md")
+
+    preset = preset_override or brief_preset(brief_path.read_text(encoding="utf-8"))
+    if not preset and (SKILLS_DIR / "presets" / f"{project}.md").exists():
+        preset = project
+    if not preset:
+        raise ValueError("no preset (pass --preset or add a **Preset:** line to the brief)")
+    if not (SKILLS_DIR / "presets" / f"{preset}.md").exists():
+        raise ValueError(f"preset not found: skills/presets/{preset}.md")
+    return {"project": project, "url": None, "preset": preset}
+
+
+def pipeline_args(target: dict, options: argparse.Namespace) -> argparse.Namespace:
+    """Build the orchestrate.py arguments for one target."""
+    project = target["project"]
+    argv = [project, "--no-pause", "--concurrency", str(options.section_concurrency)]
+    has_scaffold = (OUTPUT_DIR / project / "scaffold.md").exists()
+
+    if options.clean:
+        argv.append("--clean")
+    elif has_scaffold:
+        argv += ["--skip-to", "sections"]
+
+    # Without saved section contexts, Stage 2 would build different prompts than the first run
+    reextract = has_scaffold and not (orchestrate.section_contexts_path(project).exists()
+                                      or orchestrate.resolve_extraction_dir(project))
+    if target["url"] and (options.clean or not has_scaffold or reextract):
+        argv += ["--from-url", target["url"]]
+    else:
+        argv += ["--preset", target["preset"] or project]
+
+    if options.deploy:
+        argv.append("--deploy")
+    if options.force:
+        argv.append("--force")
+    return orchestrate.build_arg_parser().parse_args(argv)
+
+
+# --- Per-project output ---
+
+class ProjectOutput(io.TextIOBase):
+    """sys.stdout replacement that routes each line by CURRENT_PROJECT.
+
+    Lines from a project go to output/<project>/batch.log and to the console
+    prefixed with [project]; anything else passes straight through.
+    """
+
+    def __init__(self, console):
+        self.console = console
+        self._logs = {}
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def open_log(self, project: str):
+        path = OUTPUT_DIR / project / "batch.log"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._logs[project] = open(path, "a", encoding="utf-8")
+            self._buffers[project] = ""
+
+    def close_log(self, project: str):
+        with self._lock:
+            rest = self._buffers.pop(project, "")
+            log = self._logs.pop(project, None)
+            if rest:
+                self._emit(project, log, rest)
+        if log:
+            log.close()
+
+    def _emit(self, project: str, log, line: str):
+        if log:
+            log.write(line + "\n")
+            log.flush()
+        if line.strip():
+            self.console.write(f"[{project}] {line}\n")
+
+    def write(self, text: str) -> int:
+        project = CURRENT_PROJECT.get()
+        with self._lock:
+            if project not in self._logs:
+                self.console.write(text)
+                return len(text)
+            buffered = self._buffers[project] + text
+            *lines, self._buffers[project] = buffered.split("\n")
+            for line in lines:
+                self._emit(project, self._logs[project], line)
+        return len(text)
+
+    def flush(self):
+        self.console.flush()
+
+
+# --- Runner ---
+
+def run_target(target: dict, options: argparse.Namespace, output: ProjectOutput) -> dict:
+    """Run one project's pipeline in the current thread and return its summary row."""
+    project = target["project"]
+    CURRENT_PROJECT.set(project)
+    output.open_log(project)
+    result = {"project": project, "status": "ok", "error": None}
+    start = time.monotonic()
+    try:
+        orchestrate.run_pipeline(pipeline_args(target, options))
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            result.update(status="failed", error=f"exited with status {e.code} (see batch.log)")
+    except Exception as e:
+        print(traceback.format_exc())
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    finally:
+        result["seconds"] = round(time.monotonic() - start, 1)
+        result["tokens"] = TOKEN_USAGE.totals(project)
+        output.close_log(project)
+    return result
+
+
+def print_summary(results: list[dict], wall_seconds: float):
+    project_seconds = sum(r["seconds"] for r in results)
+    failed = [r for r in results if r["status"] == "failed"]
+    skipped = [r for r in results if r["status"] == "skipped"]
+    total_in = sum(r["tokens"]["input_tokens"] for r in results)
+    total_out = sum(r["tokens"]["output_tokens"] for r in results)
+
+    print(f"\n{'═' * 60}")
+    print(f"  Batch summary — {len(results)} project(s), {len(failed)} failed, {len(skipped)} skipped")
+    print(f"{'═' * 60}")
+    for r in sorted(results, key=lambda r: r["project"]):
+        icon = {"ok": "✓", "skipped": "⚠"}.get(r["status"], "❌")
+        t = r["tokens"]
+        line = f"  {icon} {r['project']:<32} {r['seconds']:>7.1f}s  {t['input_tokens']:>8} in / {t['output_tokens']:>7} out"
+        print(line)
+        if r["error"]:
+            print(f"      {r['error']}")
+    print(f"{'─' * 60}")
+    print(f"  Wall time:   {wall_seconds:.1f}s (sum of project times {project_seconds:.1f}s)")
+    print(f"  Tokens:      {total_in} in / {total_out} out")
+    if LLM_CACHE.mode != "off":
+        print(f"  {LLM_CACHE.summary()}")
+    print(f"{'═' * 60}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Website Builder — build many projects in one run")
+    parser.add_argument("targets", nargs="+",
+                        help="Briefs (briefs/x.md or x), URLs, or name=URL pairs")
+    parser.add_argument("--preset", default=None, help="Preset for every brief target")
+    parser.add_argument("--deploy", action="store_true", help="Also deploy each project to output/{project}/site/")
+    parser.add_argument("--clean", action="store_true", help="Delete each project's output and start fresh")
+    parser.add_argument("--force", action="store_true", help="Deploy even if pre-flight validation fails")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"Projects in flight (default: {DEFAULT_JOBS})")
+    parser.add_argument("--section-concurrency", type=int, default=DEFAULT_SECTION_CONCURRENCY,
+                        help=f"Sections in flight per project (default: {DEFAULT_SECTION_CONCURRENCY})")
+    parser.add_argument("--llm-slots", type=int, default=DEFAULT_LLM_SLOTS,
+                        help=f"Concurrent Claude API calls across all projects (default: {DEFAULT_LLM_SLOTS})")
+    parser.add_argument("--node-slots", type=int, default=DEFAULT_NODE_SLOTS,
+                        help=f"Concurrent Node/CPU subprocesses (default: {DEFAULT_NODE_SLOTS})")
+    parser.add_argument("--node-workers", type=int, default=DEFAULT_NODE_WORKERS,
+                        help=f"Persistent injector workers (default: {DEFAULT_NODE_WORKERS})")
+    parser.add_argument("--io-slots", type=int, default=DEFAULT_IO_SLOTS,
+                        help=f"Concurrent npm installs / downloads (default: {DEFAULT_IO_SLOTS})")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the Claude response cache")
+    parser.add_argument("--refresh-cache", action="store_true",
+                        help="Ignore cached Claude responses but store the fresh ones")
+    parser.add_argument("--npm-offline", action="store_true",
+                        help="Install dependencies with npm --offline (npm cache / local mirror only)")
+    parser.add_argument("--npm-registry", default=None, metavar="URL",
+                        help="npm registry for dependency store misses (e.g. a local mirror)")
+    args = parser.parse_args()
+
+    targets, results = [], []
+    seen = set()
+    for spec in args.targets:
+        if Path(spec).name.startswith("_"):
+            continue
+        try:
+            target = resolve_target(spec, args.preset)
+        except ValueError as e:
+            name = Path(spec).stem if spec.endswith(".md") else spec
+            print(f"  ⚠ Skipping {spec}: {e}")
+            results.append({"project": name, "status": "skipped", "error": str(e),
+                            "seconds": 0.0, "tokens": TOKEN_USAGE.totals(name)})
+            continue
+        if target["project"] in seen:
+            print(f"Error: project '{target['project']}' appears more than once")
+            sys.exit(1)
+        seen.add(target["project"])
+        targets.append(target)
+
+    if not targets:
+        print("Error: no buildable targets")
+        sys.exit(1)
+
+    orchestrate.configure_pools(
+        llm=args.llm_slots, node=args.node_slots, io=args.io_slots, node_workers=args.node_workers,
+    )
+    if args.no_cache:
+        LLM_CACHE.mode = "off"
+    elif args.refresh_cache:
+        LLM_CACHE.mode = "refresh"
+    NPM_STORE.offline = args.npm_offline
+    NPM_STORE.registry = args.npm_registry
+
+    print(f"\n{'═' * 60}")
+    print(f"  Website Builder — Batch ({len(targets)} project(s))")
+    print(f"  Pools:   {args.jobs} project(s), {args.llm_slots} LLM, "
+          f"{args.node_slots} Node + {args.node_workers} worker(s), {args.io_slots} IO")
+    print(f"  Time:    {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    print(f"{'═' * 60}")
+
+    output = ProjectOutput(sys.stdout)
+    sys.stdout = output
+    start = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            futures = [pool.submit(run_target, target, args, output) for target in targets]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                icon = "✓" if result["status"] == "ok" else "❌"
+                print(f"  {icon} {result['project']} finished in {result['seconds']:.1f}s")
+    finally:
+        sys.stdout = output.console
+        orchestrate.close_node_worker()
+
+    wall_seconds = time.monotonic() - start
+    print_summary(results, wall_seconds)
+
+    summary_path = OUTPUT_DIR / "batch-summary.json"
+    summary_path.write_text(json.dumps({
+        "timestamp": datetime.now().isoformat(),
+        "wall_seconds": round(wall_seconds, 1),
+        "tokens": TOKEN_USAGE.totals(),
+        "projects": sorted(results, key=lambda r: r["project"]),
+    }, indent=2), encoding="utf-8")
+    print(f"  → Saved: {summary_path.relative_to(orchestrate.ROOT)}")
+
+    if any(r["status"] == "failed" for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
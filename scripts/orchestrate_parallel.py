@@ -21,15 +21,18 @@ Requirements:
 import asyncio
 import json
 import os
-import subprocess
 import sys
 import re
 import argparse
+import time
 from pathlib import Path
 from datetime import datetime
 
+from npm_store import NodeModulesStore
+from preset import Preset, load_preset
+
 try:
-    from anthropic import AsyncAnthropic
+    from anthropic import AsyncAnthropic, APIConnectionError, APIStatusError
 except ImportError:
     print("Error: anthropic package not installed.")
     print("Run: pip install anthropic --break-system-packages")
@@ -42,9 +45,123 @@ TEMPLATES_DIR = ROOT / "templates"
 OUTPUT_DIR = ROOT / "output"
 SITE_DIR_NAME = "site"
 
+# Same dependency store as orchestrate.py (output/.cache/npm/)
+NPM_STORE = NodeModulesStore(OUTPUT_DIR / ".cache" / "npm")
+
 SECTION_MODEL = "claude-sonnet-4-5-20250514"
 REVIEW_MODEL = "claude-sonnet-4-5-20250514"
 
+# Adaptive concurrency (AIMD) for section generation
+INITIAL_CONCURRENCY = 4
+MAX_CONCURRENCY = 32
+MAX_RETRIES = 6
+OVERLOAD_STATUS_CODES = {429, 503, 529}   # retried and shrink the limiter window
+RETRYABLE_STATUS_CODES = {408, 409}        # retried with backoff, as are all other 5xx
+
+
+class AIMDLimiter:
+    """Adaptive in-flight limit for API calls (additive increase, multiplicative decrease).
+
+    Each success grows the window by 1/window (≈ +1 per window of successes);
+    a rate-limit or overload response halves it. A retry-after header pauses
+    every new acquisition until it has elapsed.
+    """
+
+    def __init__(self, initial: int = INITIAL_CONCURRENCY, maximum: int = MAX_CONCURRENCY, minimum: int = 1):
+        self.window = float(max(minimum, min(initial, maximum)))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.queued = 0
+        self._paused_until = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            self.queued += 1
+            try:
+                while True:
+                    pause = self._paused_until - time.monotonic()
+                    if pause > 0:
+                        try:
+                            await asyncio.wait_for(self._cond.wait(), timeout=pause)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    if self.in_flight < int(self.window):
+                        break
+                    await self._cond.wait()
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+
+    async def release(self, success: bool):
+        async with self._cond:
+            self.in_flight -= 1
+            if success:
+                self.window = min(self.maximum, self.window + 1.0 / self.window)
+            self._cond.notify_all()
+
+    async def overloaded(self, retry_after: float | None = None):
+        """Halve the window and optionally pause new calls for retry_after seconds."""
+        async with self._cond:
+            self.window = max(float(self.minimum), self.window / 2)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._cond.notify_all()
+
+    def status(self) -> str:
+        return f"window={int(self.window)} in-flight={self.in_flight} queued={self.queued}"
+
+
+def _retryable(status_code: int) -> bool:
+    """Statuses the SDK's own retries cover (it is built with max_retries=0)."""
+    return (status_code in OVERLOAD_STATUS_CODES or status_code in RETRYABLE_STATUS_CODES
+            or status_code >= 500)
+
+
+def _retry_after_seconds(error: APIStatusError) -> float | None:
+    """Parse a retry-after header (seconds) from an API error response."""
+    try:
+        value = error.response.headers.get("retry-after")
+        return float(value) if value else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+async def create_message(client: AsyncAnthropic, limiter: AIMDLimiter, **kwargs):
+    """Call client.messages.create under the limiter, retrying transient errors.
+
+    Rate-limit/overload responses also halve the limiter window; other 5xx,
+    408 and 409 responses and connection errors only back off.
+    """
+    for attempt in range(MAX_RETRIES):
+        await limiter.acquire()
+        try:
+            message = await client.messages.create(**kwargs)
+        except APIStatusError as e:
+            await limiter.release(success=False)
+            if not _retryable(e.status_code) or attempt == MAX_RETRIES - 1:
+                raise
+            retry_after = _retry_after_seconds(e)
+            if e.status_code in OVERLOAD_STATUS_CODES:
+                await limiter.overloaded(retry_after)
+            wait = retry_after if retry_after else min(60, 2 ** attempt)
+            print(f"  ⚠ API {e.status_code} — backing off {wait:.1f}s ({limiter.status()})")
+            await asyncio.sleep(wait)
+            continue
+        except APIConnectionError as e:
+            await limiter.release(success=False)
+            if attempt == MAX_RETRIES - 1:
+                raise
+            wait = min(60, 2 ** attempt)
+            print(f"  ⚠ API connection error: {e} — retrying in {wait}s")
+            await asyncio.sleep(wait)
+            continue
+        await limiter.release(success=True)
+        return message
+    raise RuntimeError(f"Claude API failed after {MAX_RETRIES} retries")
+
 
 def read_file(path: Path) -> str:
     if not path.exists():
@@ -74,17 +191,18 @@ def parse_scaffold(scaffold: str) -> list[dict]:
     return sections
 
 
-def extract_style_header(preset_content: str) -> str:
-    match = re.search(
-        r"(═══ STYLE CONTEXT ═══.*?═══════════════════════)",
-        preset_content,
-        re.DOTALL,
-    )
-    return match.group(1) if match else "[Style header not found]"
+def read_preset(name: str) -> Preset:
+    """Parsed skills/presets/{name}.md, shared with orchestrate.py (see preset.py)."""
+    try:
+        return load_preset(name, SKILLS_DIR / "presets")
+    except FileNotFoundError:
+        print(f"Error: File not found: {SKILLS_DIR / 'presets' / f'{name}.md'}")
+        sys.exit(1)
 
 
 async def generate_section(
     client: AsyncAnthropic,
+    limiter: AIMDLimiter,
     section: dict,
     index: int,
     total: int,
@@ -121,7 +239,8 @@ Requirements:
 Output ONLY the component code. No markdown fences. Export as default.
 Component name: Section{num}{section['archetype'].replace('-', '')}"""
 
-    message = await client.messages.create(
+    message = await create_message(
+        client, limiter,
         model=SECTION_MODEL,
         max_tokens=4096,
         messages=[{"role": "user", "content": prompt}],
@@ -133,41 +252,28 @@ Component name: Section{num}{section['archetype'].replace('-', '')}"""
     code = re.sub(r"^```\w*\n?", "", code)
     code = re.sub(r"\n?```$", "", code)
 
+    print(f"  ✓ {num}/{total:02d} {section['archetype']} ({limiter.status()})")
     return index, code
 
 
-def detect_animation_engine(preset_content: str) -> str:
-    """Detect animation engine from preset's Motion line."""
-    match = re.search(r"Motion:.*?/(gsap|framer-motion)", preset_content)
-    return match.group(1) if match else "framer-motion"
-
-
-def parse_fonts(preset_content: str) -> dict:
-    """Extract heading and body font names from preset's Type line."""
-    match = re.search(r"heading:([^,]+),", preset_content)
-    heading = match.group(1).strip() if match else "Inter"
-    match = re.search(r"body:([^,]+),", preset_content)
-    body = match.group(1).strip() if match else "Inter"
-    return {"heading": heading, "body": body}
-
-
 def font_import_name(font_name: str) -> str:
     return font_name.replace(" ", "_")
 
 
-def stage_deploy(sections, section_files, preset, project_name):
-    """Deploy sections into a runnable Next.js project at output/{project}/site/."""
-    print("\n🚀 Deploying to Next.js project...")
+def scaffold_site(preset, project_name):
+    """Write the Next.js project skeleton, globals.css and layout.tsx at output/{project}/site/.
+
+    Needs only the preset, so it runs (and its npm install starts) before the sections exist.
+    """
+    print("\n🚀 Scaffolding Next.js project...")
 
-    preset_content = read_file(SKILLS_DIR / "presets" / f"{preset}.md")
-    engine = detect_animation_engine(preset_content)
-    fonts = parse_fonts(preset_content)
-    style_header = extract_style_header(preset_content)
+    preset_model = read_preset(preset)
+    engine = preset_model.engine
+    fonts = preset_model.fonts
 
     site_dir = OUTPUT_DIR / project_name / SITE_DIR_NAME
     src_dir = site_dir / "src"
     app_dir = src_dir / "app"
-    comp_dir = src_dir / "components" / "sections"
 
     if not (site_dir / "package.json").exists():
         print("  Creating project structure...")
@@ -224,10 +330,7 @@ def stage_deploy(sections, section_files, preset, project_name):
     # layout.tsx
     hi = font_import_name(fonts["heading"])
     bi = font_import_name(fonts["body"])
-    h_weight = '"400"'
-    m = re.search(r"heading:[^,]+,(\d+)", preset_content)
-    if m:
-        h_weight = f'"{m.group(1)}"'
+    h_weight = f'"{preset_model.weights["heading"] or 400}"'
     layout_lines = [
         'import type { Metadata } from "next";',
         f'import {{ {hi}, {bi} }} from "next/font/google";',
@@ -255,6 +358,27 @@ export default function RootLayout({{ children }}: {{ children: React.ReactNode
 """
     write_file(app_dir / "layout.tsx", layout_code)
 
+
+async def install_site_deps(project_name):
+    """Install the site skeleton's dependencies; awaited by deploy_sections.
+
+    Goes through the shared dependency store, so a package.json either
+    orchestrator has seen before is hardlinked from output/.cache/npm/.
+    """
+    site_dir = OUTPUT_DIR / project_name / SITE_DIR_NAME
+    print("  Installing dependencies in the background...")
+    if await asyncio.to_thread(NPM_STORE.install, site_dir):
+        print("  ✓ Dependencies installed")
+
+
+async def deploy_sections(sections, section_files, project_name, install: asyncio.Task):
+    """Copy sections into the scaffolded site, write page.tsx and wait for the install."""
+    print("\n🚀 Deploying sections to Next.js project...")
+    site_dir = OUTPUT_DIR / project_name / SITE_DIR_NAME
+    src_dir = site_dir / "src"
+    app_dir = src_dir / "app"
+    comp_dir = src_dir / "components" / "sections"
+
     # Copy sections
     comp_dir.mkdir(parents=True, exist_ok=True)
     for fp in section_files:
@@ -271,19 +395,21 @@ export default function RootLayout({{ children }}: {{ children: React.ReactNode
                "\n".join(imports) + "\n\nexport default function Page() {\n  return (\n    <main className=\"min-h-screen\">\n"
                + "\n".join(comps) + "\n    </main>\n  );\n}\n")
 
-    # npm install
-    print("  Installing dependencies...")
-    result = subprocess.run(["npm", "install"], capture_output=True, text=True, cwd=str(site_dir), timeout=120)
-    if result.returncode != 0:
-        print(f"  ⚠ npm install issues:\n{result.stderr[-500:]}")
-    else:
-        print("  ✓ Dependencies installed")
+    await install
     print(f"  ✓ Site: output/{project_name}/site/")
 
 
-async def main_async(project_name: str, preset: str, deploy: bool = False):
+async def main_async(
+    project_name: str,
+    preset: str,
+    deploy: bool = False,
+    initial_concurrency: int = INITIAL_CONCURRENCY,
+    max_concurrency: int = MAX_CONCURRENCY,
+):
     """Run the parallel pipeline."""
-    client = AsyncAnthropic()
+    # SDK-level retries are disabled so rate-limit responses reach the limiter
+    client = AsyncAnthropic(max_retries=0)
+    limiter = AIMDLimiter(initial=initial_concurrency, maximum=max_concurrency)
 
     # Load scaffold
     scaffold_path = OUTPUT_DIR / project_name / "scaffold.md"
@@ -294,16 +420,20 @@ async def main_async(project_name: str, preset: str, deploy: bool = False):
         print("Error: No sections parsed from scaffold.")
         sys.exit(1)
 
-    # Load preset and extract style header
-    preset_content = read_file(SKILLS_DIR / "presets" / f"{preset}.md")
-    style_header = extract_style_header(preset_content)
+    style_header = read_preset(preset).style_header
+
+    # The site skeleton only needs the preset: install its dependencies while sections generate
+    install = None
+    if deploy:
+        scaffold_site(preset, project_name)
+        install = asyncio.create_task(install_site_deps(project_name))
 
-    print(f"\n⚡ Generating {len(sections)} sections in parallel...")
+    print(f"\n⚡ Generating {len(sections)} sections in parallel ({limiter.status()})...")
     start = datetime.now()
 
-    # Fire all section generations concurrently
+    # Queue every section; the limiter decides how many are in flight
     tasks = [
-        generate_section(client, section, i, len(sections), style_header)
+        generate_section(client, limiter, section, i, len(sections), style_header)
         for i, section in enumerate(sections)
     ]
     results = await asyncio.gather(*tasks)
@@ -354,7 +484,8 @@ export default function Page() {{
     for fp in section_files:
         all_code += f"\n\n--- {fp.name} ---\n\n{read_file(fp)}"
 
-    review_msg = await client.messages.create(
+    review_msg = await create_message(
+        client, limiter,
         model=REVIEW_MODEL,
         max_tokens=4096,
         messages=[{
@@ -377,7 +508,7 @@ End with a priority fix list.""",
     write_file(OUTPUT_DIR / project_name / "review.md", review)
 
     if deploy:
-        stage_deploy(sections, section_files, preset, project_name)
+        await deploy_sections(sections, section_files, project_name, install)
 
     print(f"\n{'═' * 60}")
     print(f"  ✅ Parallel pipeline complete")
@@ -394,9 +525,17 @@ def main():
     parser.add_argument("--preset", required=True, help="Preset name")
     parser.add_argument("--deploy", action="store_true",
                         help="Deploy to a runnable Next.js project at output/{project}/site/")
+    parser.add_argument("--initial-concurrency", type=int, default=INITIAL_CONCURRENCY, metavar="N",
+                        help=f"Starting in-flight window for section calls (default: {INITIAL_CONCURRENCY})")
+    parser.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENCY, metavar="N",
+                        help=f"Upper bound for the adaptive in-flight window (default: {MAX_CONCURRENCY})")
     args = parser.parse_args()
 
-    asyncio.run(main_async(args.project, args.preset, args.deploy))
+    asyncio.run(main_async(
+        args.project, args.preset, args.deploy,
+        initial_concurrency=args.initial_concurrency,
+        max_concurrency=args.max_concurrency,
+    ))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+"""
+Parse Cache
+
+Memoises models parsed from markdown sources (preset.py, taxonomy.py) by a
+hash of the source bytes: in memory for the life of the process, and on disk
+as <cache_dir>/<sha256>.json so later runs skip the parse too. Each model
+passes its own parser version; bump it when parsing changes so stale disk
+entries are ignored.
+
+Usage:
+  from parse_cache import ParseCache
+  _CACHE = ParseCache(to_dict=asdict, from_dict=lambda d: Model(**d), version=1)
+  model = _CACHE.load(path.read_bytes(), lambda text, digest: parse(text, digest), cache_dir)
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+
+class ParseCache:
+    """Parsed models keyed by source hash: memory, then disk, then a fresh parse."""
+
+    def __init__(self, to_dict, from_dict, version: int = 1):
+        self.to_dict = to_dict
+        self.from_dict = from_dict
+        self.version = version
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def digest(self, raw: bytes, salt: str = "") -> str:
+        return hashlib.sha256(raw + f"{salt}|v{self.version}".encode()).hexdigest()
+
+    def load(self, raw: bytes, parse, cache_dir: Path | None, salt: str = ""):
+        """The model for `raw`, calling parse(text, digest) only on a miss.
+
+        `salt` is mixed into the key for models whose parse depends on more
+        than the bytes (e.g. the preset name).
+        """
+        digest = self.digest(raw, salt)
+        with self._lock:
+            cached = self._memo.get(digest)
+        if cached is not None:
+            return cached
+
+        model = None
+        cache_path = cache_dir / f"{digest}.json" if cache_dir else None
+        if cache_path and cache_path.exists():
+            try:
+                model = self.from_dict(json.loads(cache_path.read_text(encoding="utf-8")))
+            except (OSError, ValueError, KeyError, TypeError):
+                model = None
+        if model is None:
+            model = parse(raw.decode("utf-8"), digest)
+            if cache_path:
+                try:
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp = cache_path.with_suffix(f".{threading.get_ident()}.tmp")
+                    tmp.write_text(json.dumps(self.to_dict(model), indent=2), encoding="utf-8")
+                    tmp.replace(cache_path)
+                except OSError:
+                    pass
+        with self._lock:
+            self._memo[digest] = model
+        return model
@@ -0,0 +1,147 @@
+"""
+Preset Model
+
+Parses a skills/presets/<name>.md file once into a Preset: compact style
+header, style tokens (the ```yaml Style Configuration block), animation
+engine, fonts, weights and the Default Section Sequence. Parsed presets are
+cached in memory and on disk at output/.cache/presets/<sha256>.json, keyed
+by file content, so every stage (and both orchestrators) shares one parse.
+
+Usage:
+  from preset import load_preset
+  preset = load_preset("artisan-food")
+  preset.style_header, preset.engine, preset.fonts["heading"], preset.weights["heading"]
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from parse_cache import ParseCache
+
+ROOT = Path(__file__).parent.parent
+PRESETS_DIR = ROOT / "skills" / "presets"
+PRESET_CACHE_DIR = ROOT / "output" / ".cache" / "presets"
+
+PARSER_VERSION = 1  # see parse_cache.py
+
+DEFAULT_ENGINE = "framer-motion"
+DEFAULT_FONT = "Inter"
+STYLE_HEADER_MISSING = "[Style header not found in preset — check preset format]"
+SEQUENCE_MISSING = "See preset file"
+
+_STYLE_HEADER_RE = re.compile(r"(═══ STYLE CONTEXT ═══.*?═══════════════════════)", re.DOTALL)
+_SEQUENCE_RE = re.compile(r"## Default Section Sequence\n\n```\n(.*?)```", re.DOTALL)
+_YAML_BLOCK_RE = re.compile(r"```yaml\n(.*?)```", re.DOTALL)
+_MOTION_RE = re.compile(r"Motion:.*?/(gsap|framer-motion)")
+_FONT_NAME_RE = re.compile(r"[A-Za-z][A-Za-z0-9_ ]*")
+_SEQUENCE_LINE_RE = re.compile(r"\d+\.\s+([\w][\w-]*)\s*\|\s*([\w][\w-]*)")
+
+
+@dataclass(frozen=True)
+class Preset:
+    name: str
+    content: str
+    content_hash: str
+    style_header: str = STYLE_HEADER_MISSING
+    tokens: dict = field(default_factory=dict)      # Style Configuration YAML (one level of nesting)
+    engine: str = DEFAULT_ENGINE                      # "gsap" or "framer-motion"
+    fonts: dict = field(default_factory=lambda: {"heading": DEFAULT_FONT, "body": DEFAULT_FONT})
+    weights: dict = field(default_factory=lambda: {"heading": None, "body": None})
+    sequence: str = SEQUENCE_MISSING                  # Default Section Sequence block, verbatim
+
+    @property
+    def sequence_sections(self) -> list[tuple[str, str]]:
+        """(archetype, variant) pairs from the Default Section Sequence."""
+        return [m.groups() for m in map(_SEQUENCE_LINE_RE.match, self.sequence.splitlines()) if m]
+
+    def token(self, *keys: str, default=None):
+        """Nested token lookup, e.g. preset.token("palette", "accent")."""
+        value = self.tokens
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                return default
+            value = value[key]
+        return value
+
+
+def parse_style_tokens(content: str) -> dict:
+    """The ```yaml Style Configuration block as a dict (scalars and one nesting level)."""
+    match = _YAML_BLOCK_RE.search(content)
+    if not match:
+        return {}
+    tokens, parent = {}, None
+    for raw in match.group(1).split("\n"):
+        line = re.sub(r"(^|\s)#.*$", "", raw).rstrip()
+        if not line.strip() or ":" not in line:
+            continue
+        key, _, value = line.strip().partition(":")
+        value = value.strip().strip('"').strip("'")
+        if raw.startswith((" ", "\t")) and parent is not None:
+            tokens[parent][key] = value
+        elif value:
+            tokens[key], parent = value, None
+        else:
+            tokens[key], parent = {}, key
+    return tokens
+
+
+def _typography(tokens: dict, key: str) -> str:
+    typography = tokens.get("typography")
+    return typography.get(key) or "" if isinstance(typography, dict) else ""
+
+
+def _font(tokens: dict, role: str, style_header: str) -> str:
+    """Font from typography.<role>_font, else the style header's Type line, else Inter."""
+    value = _typography(tokens, f"{role}_font")
+    match = _FONT_NAME_RE.match(value)
+    if match:
+        return match.group(0).strip()
+    match = re.search(rf"\b{role}:([^,\n]+),", style_header)
+    return match.group(1).strip() if match else DEFAULT_FONT
+
+
+def _weight(tokens: dict, role: str, style_header: str) -> str | None:
+    value = _typography(tokens, f"{role}_weight")
+    match = re.match(r"\d+", value)
+    if match:
+        return match.group(0)
+    match = re.search(rf"\b{role}:[^,\n]+,(\d+)", style_header)
+    return match.group(1) if match else None
+
+
+def parse_preset(name: str, content: str, content_hash: str = "") -> Preset:
+    header_match = _STYLE_HEADER_RE.search(content)
+    style_header = header_match.group(1) if header_match else STYLE_HEADER_MISSING
+    tokens = parse_style_tokens(content)
+
+    motion = _MOTION_RE.search(content)
+    engine = motion.group(1) if motion else tokens.get("animation_engine") or DEFAULT_ENGINE
+    if engine not in ("gsap", "framer-motion"):
+        engine = DEFAULT_ENGINE
+
+    sequence = _SEQUENCE_RE.search(content)
+    return Preset(
+        name=name,
+        content=content,
+        content_hash=content_hash,
+        style_header=style_header,
+        tokens=tokens,
+        engine=engine,
+        fonts={"heading": _font(tokens, "heading", style_header), "body": _font(tokens, "body", style_header)},
+        weights={"heading": _weight(tokens, "heading", style_header), "body": _weight(tokens, "body", style_header)},
+        sequence=sequence.group(1).strip() if sequence else SEQUENCE_MISSING,
+    )
+
+
+_CACHE = ParseCache(to_dict=asdict, from_dict=lambda data: Preset(**data), version=PARSER_VERSION)
+
+
+def load_preset(name: str, presets_dir: Path = PRESETS_DIR,
+                cache_dir: Path | None = PRESET_CACHE_DIR) -> Preset:
+    """Parsed preset `name`, from memory, the disk cache, or a fresh parse (then cached).
+
+    Raises FileNotFoundError if skills/presets/<name>.md does not exist.
+    """
+    raw = (presets_dir / f"{name}.md").read_bytes()
+    return _CACHE.load(raw, lambda text, digest: parse_preset(name, text, digest), cache_dir, salt=f"|{name}")
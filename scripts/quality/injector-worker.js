@@ -0,0 +1,267 @@
+#!/usr/bin/env node
+
+/**
+ * Injector Worker
+ * Long-lived Node.js process that serves orchestrate.py's injector calls over
+ * line-delimited JSON-RPC on stdin/stdout. Started once per pipeline run so
+ * lib modules and registry JSON stay loaded between calls.
+ *
+ * Protocol (one JSON object per line):
+ *   request:  { "id": 1, "method": "icon-mapper.buildIconContextBlock", "params": [...] }
+ *             { "id": 2, "method": "...", "paramsFile": "/tmp/web-builder-params-x.json" }
+ *   response: { "id": 1, "result": ... }  or  { "id": 1, "error": { "message", "stack" } }
+ *
+ * Large params arrive as "paramsFile": a JSON array written by the caller,
+ * which also deletes it once the response is in.
+ *
+ * Methods are either a named entry in METHODS below, or "<lib-module>.<export>"
+ * which calls an exported function of scripts/quality/lib/<lib-module>.js.
+ * Any param of the form { "$json": "/abs/path.json" } is replaced by the parsed
+ * file contents (cached in memory, invalidated on mtime change), and
+ * { "$registryIndex": "/abs/index.sqlite" } by the compiled registry index
+ * (lib/registry-index.js).
+ *
+ * Usage:
+ *   node injector-worker.js
+ */
+
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+
+const protocolOut = process.stdout;
+const LIB_DIR = path.join(__dirname, 'lib');
+const MODULE_NAME_RE = /^[a-z0-9][a-z0-9-]*$/;
+
+// ---------------------------------------------------------------------------
+// Module + JSON caches
+// ---------------------------------------------------------------------------
+
+const _modules = new Map();
+const _jsonCache = new Map();
+
+/**
+ * Load a lib module once and keep it for the life of the worker.
+ * @param {string} name - Module name without extension, e.g. "icon-mapper"
+ * @returns {object} The module exports
+ */
+function loadModule(name) {
+  if (!MODULE_NAME_RE.test(name)) {
+    throw new Error(`Invalid module name: ${name}`);
+  }
+  if (!_modules.has(name)) {
+    _modules.set(name, require(path.join(LIB_DIR, name)));
+  }
+  return _modules.get(name);
+}
+
+/**
+ * Read and parse a JSON file, reusing the parsed value until its mtime changes.
+ * @param {string} filePath - Absolute path to a JSON file
+ * @returns {*} Parsed JSON, or null if the file does not exist
+ */
+function loadJson(filePath) {
+  let stat;
+  try {
+    stat = fs.statSync(filePath);
+  } catch (err) {
+    return null;
+  }
+  const cached = _jsonCache.get(filePath);
+  if (cached && cached.mtimeMs === stat.mtimeMs && cached.size === stat.size) {
+    return cached.data;
+  }
+  const data = JSON.parse(fs.readFileSync(filePath, 'utf-8'));
+  _jsonCache.set(filePath, { mtimeMs: stat.mtimeMs, size: stat.size, data });
+  return data;
+}
+
+/**
+ * Resolve { "$json": path } and { "$registryIndex": path } references in a params array.
+ * @param {Array} params
+ * @returns {Array}
+ */
+function resolveParams(params) {
+  return (params || []).map((p) => {
+    if (p && typeof p === 'object' && !Array.isArray(p) && typeof p.$json === 'string') {
+      return loadJson(p.$json);
+    }
+    if (p && typeof p === 'object' && !Array.isArray(p) && typeof p.$registryIndex === 'string') {
+      return loadModule('registry-index').openRegistryIndex({ dbPath: p.$registryIndex });
+    }
+    return p;
+  });
+}
+
+// ---------------------------------------------------------------------------
+// Named methods (composites that need more than one lib call)
+// ---------------------------------------------------------------------------
+
+const METHODS = {
+  ping() {
+    return 'pong';
+  },
+
+  /** matchUIComponents() + buildUIComponentBlock(), with the matches attached. */
+  uiComponentBlock(detectedPatterns, searchIndex) {
+    const { matchUIComponents, buildUIComponentBlock } = loadModule('pattern-identifier');
+    const matches = matchUIComponents(detectedPatterns, searchIndex);
+    const result = buildUIComponentBlock(matches);
+    result.matches = matches;
+    return result;
+  },
+
+  /**
+   * Icon, visual-fallback, card-demo and UI-component blocks for every section
+   * in one call, so shared inputs cross the pipe once instead of per section.
+   *
+   * @param {Array} sections - [{ index, archetype, visualFallback: { isCardGrid, cardCount } | null,
+   *                              cardDemos: boolean, uiPatterns: string[] }]
+   * @param {Array} extractedIcons - identification.iconLibrary.icons
+   * @param {Array} detectedPlugins - identification.detectedPlugins
+   * @param {object|null} searchIndex - Registry index for UI component matching
+   * @returns {object} { [index]: { iconBlock, visualFallback, cardDemos, uiComponents } }
+   */
+  buildAllSectionBlocks(sections, extractedIcons, detectedPlugins, searchIndex) {
+    const { buildIconContextBlock } = loadModule('icon-mapper');
+    const { getVisualFallback } = loadModule('asset-injector');
+    const { buildCardEmbeddedDemos } = loadModule('animation-injector');
+    const emptyBlock = () => ({ block: '', componentFiles: [] });
+    const uiBlocks = new Map();
+    let cardDemos = null;
+    const result = {};
+
+    for (const s of sections || []) {
+      const blocks = {
+        iconBlock: guarded(`icon block, section ${s.index}`, '',
+          () => buildIconContextBlock(s.archetype, s.index, extractedIcons || [])),
+        visualFallback: emptyBlock(),
+        cardDemos: emptyBlock(),
+        uiComponents: { ...emptyBlock(), matches: [] },
+      };
+      if (s.visualFallback) {
+        blocks.visualFallback = guarded(`visual fallback, section ${s.index}`, emptyBlock(),
+          () => getVisualFallback(s.archetype, s.index, s.visualFallback.isCardGrid, s.visualFallback.cardCount));
+      }
+      if (s.cardDemos) {
+        // Depends only on the plugin list — build once for all demo-card sections
+        if (cardDemos === null) {
+          cardDemos = guarded('card demos', emptyBlock(), () => buildCardEmbeddedDemos(detectedPlugins || []));
+        }
+        blocks.cardDemos = cardDemos;
+      }
+      if (s.uiPatterns && s.uiPatterns.length > 0) {
+        const key = JSON.stringify(s.uiPatterns);
+        if (!uiBlocks.has(key)) {
+          uiBlocks.set(key, guarded(`UI components, section ${s.index}`, blocks.uiComponents,
+            () => METHODS.uiComponentBlock(s.uiPatterns, searchIndex)));
+        }
+        blocks.uiComponents = uiBlocks.get(key);
+      }
+      result[s.index] = blocks;
+    }
+    return result;
+  },
+};
+
+/**
+ * Run fn(), logging and returning `fallback` if it throws or returns nothing,
+ * so one bad section does not fail a whole batch call.
+ */
+function guarded(label, fallback, fn) {
+  try {
+    const value = fn();
+    return value == null ? fallback : value;
+  } catch (err) {
+    console.error(`  ⚠ ${label}: ${err.message}`);
+    return fallback;
+  }
+}
+
+/**
+ * Dispatch a method name to a named method or a lib module export.
+ * @param {string} method
+ * @param {Array} params
+ * @returns {*} Result (may be a Promise)
+ */
+function dispatch(method, params) {
+  if (Object.prototype.hasOwnProperty.call(METHODS, method)) {
+    return METHODS[method](...params);
+  }
+  const dot = method.lastIndexOf('.');
+  if (dot <= 0) {
+    throw new Error(`Unknown method: ${method}`);
+  }
+  const mod = loadModule(method.slice(0, dot));
+  const fn = mod[method.slice(dot + 1)];
+  if (typeof fn !== 'function') {
+    throw new Error(`Not a function: ${method}`);
+  }
+  return fn(...params);
+}
+
+// ---------------------------------------------------------------------------
+// Request loop
+// ---------------------------------------------------------------------------
+
+/**
+ * Params array of a request, inline or from its paramsFile envelope.
+ * @param {object} request
+ * @returns {Array}
+ */
+function readParams(request) {
+  if (typeof request.paramsFile === 'string') {
+    return JSON.parse(fs.readFileSync(request.paramsFile, 'utf-8'));
+  }
+  return request.params;
+}
+
+// Requests whose response has not been written yet
+const _pending = new Set();
+
+function respond(message) {
+  protocolOut.write(JSON.stringify(message) + '\n');
+}
+
+function handleLine(line) {
+  if (!line.trim()) return;
+
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (err) {
+    respond({ id: null, error: { message: `Invalid request: ${err.message}` } });
+    return;
+  }
+
+  const { id, method } = request;
+  const pending = Promise.resolve()
+    .then(() => dispatch(method, resolveParams(readParams(request))))
+    .then(
+      (result) => respond({ id, result: result === undefined ? null : result }),
+      (err) => respond({ id, error: { message: err.message, stack: err.stack } })
+    )
+    .finally(() => _pending.delete(pending));
+  _pending.add(pending);
+}
+
+/**
+ * Exit once every request already read has been answered, so closing stdin
+ * right after the last request does not drop in-flight async responses.
+ */
+function drainAndExit() {
+  Promise.allSettled([..._pending]).then(() => process.exit(0));
+}
+
+if (require.main === module) {
+  // Lib modules log diagnostics with console.log — keep stdout for the protocol.
+  console.log = (...args) => console.error(...args);
+  console.info = (...args) => console.error(...args);
+  const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+  rl.on('line', handleLine);
+  rl.on('close', drainAndExit);
+}
+
+module.exports = { dispatch, loadJson, loadModule, METHODS };
@@ -3,6 +3,12 @@
  * Downloads verified assets to the site's public directory.
  * Uses content-addressed filenames for deduplication and caching.
  *
+ * Downloads go through a shared engine: keep-alive agents capped per host,
+ * a global concurrency limit, streaming to disk with HTTP Range resume, and
+ * an optional cross-project store (`cacheDir`) of blobs named by sha256 and
+ * indexed by URL + ETag. Stored assets are hardlinked into public/, so a
+ * rebuild of the same source makes no requests at all.
+ *
  * @module asset-downloader
  */
 
@@ -10,7 +16,9 @@
 
 const https = require('https');
 const http = require('http');
+const crypto = require('crypto');
 const fs = require('fs');
+const os = require('os');
 const path = require('path');
 
 // ── Constants ────────────────────────────────────────────────────────────────
@@ -24,6 +32,15 @@ const DOWNLOAD_TIMEOUT_MS = 10000;
 /** Maximum concurrent downloads */
 const MAX_CONCURRENT = 20;
 
+/** Maximum open connections per host (politeness limit) */
+const MAX_PER_HOST = 6;
+
+/** Attempts per download; later attempts resume from the partial file */
+const DOWNLOAD_ATTEMPTS = 3;
+
+/** Redirects followed per request */
+const MAX_REDIRECTS = 3;
+
 /** Minimum content length to accept (bytes), except SVG */
 const MIN_CONTENT_LENGTH = 1024;
 
@@ -52,32 +69,53 @@ function getTransport(url) {
   return url.startsWith('https') ? https : http;
 }
 
+/**
+ * Keep-alive agents shared by every request in this process. maxSockets
+ * applies per host, so it doubles as the per-host politeness limit.
+ */
+const AGENTS = {
+  'http:': new http.Agent({ keepAlive: true, maxSockets: MAX_PER_HOST }),
+  'https:': new https.Agent({ keepAlive: true, maxSockets: MAX_PER_HOST }),
+};
+
+function agentFor(url) {
+  return AGENTS[new URL(url).protocol];
+}
+
 /**
  * Make an HTTP request and return a promise with the response.
  *
  * @param {string} url - URL to request
  * @param {string} method - HTTP method (GET or HEAD)
  * @param {number} timeout - Timeout in ms
- * @returns {Promise<{ statusCode: number, headers: object, body?: Buffer }>}
+ * @param {object} [options] - { headers, stream: resolve with the unread response instead of a body }
+ * @returns {Promise<{ statusCode: number, headers: object, body?: Buffer, res?: http.IncomingMessage, url: string }>}
  */
-function request(url, method, timeout) {
+function request(url, method, timeout, options = {}, redirects = 0) {
   return new Promise((resolve, reject) => {
     const transport = getTransport(url);
-    const req = transport.request(url, { method, timeout }, (res) => {
-      // Follow redirects (up to 3)
-      if ([301, 302, 307, 308].includes(res.statusCode) && res.headers.location) {
+    const reqOptions = { method, timeout, agent: agentFor(url), headers: options.headers || {} };
+    const req = transport.request(url, reqOptions, (res) => {
+      // Follow redirects (up to MAX_REDIRECTS)
+      if ([301, 302, 307, 308].includes(res.statusCode) && res.headers.location && redirects < MAX_REDIRECTS) {
         const redirectUrl = res.headers.location.startsWith('http')
           ? res.headers.location
           : new URL(res.headers.location, url).href;
-        request(redirectUrl, method, timeout).then(resolve).catch(reject);
+        request(redirectUrl, method, timeout, options, redirects + 1).then(resolve).catch(reject);
         res.resume();
         return;
       }
 
+      if (options.stream) {
+        resolve({ statusCode: res.statusCode, headers: res.headers, res, url });
+        return;
+      }
+
       if (method === 'HEAD') {
         resolve({
           statusCode: res.statusCode,
           headers: res.headers,
+          url,
         });
         res.resume();
         return;
@@ -91,6 +129,7 @@ function request(url, method, timeout) {
           statusCode: res.statusCode,
           headers: res.headers,
           body: Buffer.concat(chunks),
+          url,
         });
       });
     });
@@ -116,6 +155,240 @@ function ensureDir(dir) {
   }
 }
 
+/**
+ * Run fn over items with at most `limit` calls in flight.
+ *
+ * @param {Array} items
+ * @param {number} limit
+ * @param {Function} fn - async (item) => result
+ * @returns {Promise<Array>} Results in item order
+ */
+async function mapLimit(items, limit, fn) {
+  const results = new Array(items.length);
+  let next = 0;
+  const worker = async () => {
+    while (next < items.length) {
+      const i = next++;
+      results[i] = await fn(items[i]);
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(limit, items.length) }, worker));
+  return results;
+}
+
+function sha256(text) {
+  return crypto.createHash('sha256').update(text).digest('hex');
+}
+
+// ── Asset Store ──────────────────────────────────────────────────────────────
+
+/**
+ * Content-addressed asset store shared across projects.
+ *
+ * Layout: {dir}/{sha256} blobs, {dir}/index.json mapping URL → { sha256, etag,
+ * size, contentType }, and {dir}/partial/ for interrupted downloads
+ * ({urlHash} bytes + {urlHash}.json with the ETag they belong to).
+ */
+class AssetStore {
+  /**
+   * @param {string} dir - Store directory (e.g. output/.cache/assets)
+   */
+  constructor(dir) {
+    this.dir = dir;
+    this.partialDir = path.join(dir, 'partial');
+    this.indexPath = path.join(dir, 'index.json');
+    ensureDir(this.partialDir);
+    this.index = this._readIndex();
+    this.added = {};
+  }
+
+  _readIndex() {
+    try {
+      return JSON.parse(fs.readFileSync(this.indexPath, 'utf-8'));
+    } catch (_) {
+      return {};
+    }
+  }
+
+  /**
+   * Stored entry for a URL, or null when the URL or its blob is missing.
+   *
+   * @param {string} url
+   * @returns {{ sha256: string, etag: string|null, size: number, contentType: string }|null}
+   */
+  lookup(url) {
+    const entry = this.index[url];
+    if (!entry || !fs.existsSync(this.blobPath(entry.sha256))) return null;
+    return entry;
+  }
+
+  blobPath(hash) {
+    return path.join(this.dir, hash);
+  }
+
+  partialPath(url) {
+    return path.join(this.partialDir, sha256(url));
+  }
+
+  /**
+   * Move a finished partial download into the store and index it.
+   *
+   * @param {string} url
+   * @param {string} file - Completed download
+   * @param {string} hash - sha256 of its bytes
+   * @param {object} meta - { etag, size, contentType }
+   */
+  commit(url, file, hash, meta) {
+    const blob = this.blobPath(hash);
+    if (fs.existsSync(blob)) {
+      fs.unlinkSync(file);  // Same bytes already stored under another URL
+    } else {
+      fs.renameSync(file, blob);
+    }
+    fs.rmSync(file + '.json', { force: true });
+    const entry = { sha256: hash, ...meta };
+    this.index[url] = entry;
+    this.added[url] = entry;
+  }
+
+  /**
+   * Hardlink a stored blob to dest (copy when linking fails, e.g. across filesystems).
+   */
+  materialise(hash, dest) {
+    ensureDir(path.dirname(dest));
+    try {
+      fs.linkSync(this.blobPath(hash), dest);
+    } catch (err) {
+      if (err.code === 'EEXIST') return;
+      fs.copyFileSync(this.blobPath(hash), dest);
+    }
+  }
+
+  /**
+   * Write the index, merged with entries other processes added meanwhile.
+   */
+  save() {
+    if (Object.keys(this.added).length === 0) return;
+    const merged = { ...this._readIndex(), ...this.added };
+    const tmp = `${this.indexPath}.${process.pid}.tmp`;
+    fs.writeFileSync(tmp, JSON.stringify(merged, null, 2));
+    fs.renameSync(tmp, this.indexPath);
+    this.index = merged;
+    this.added = {};
+  }
+}
+
+/**
+ * Stream one URL into the store, resuming a partial download with
+ * Range/If-Range when one exists. Retries resume where the last attempt stopped.
+ *
+ * @param {AssetStore} store
+ * @param {string} url
+ * @param {number} timeout - Per-request timeout in ms
+ * @param {object} [options] - { maxBytes: abandon (without retrying) bodies larger than this }
+ * @returns {Promise<object|null>} The stored entry, or null on failure
+ */
+async function fetchToStore(store, url, timeout = DOWNLOAD_TIMEOUT_MS, options = {}) {
+  const maxBytes = options.maxBytes || Infinity;
+  const file = store.partialPath(url);
+  let lastError = null;
+
+  for (let attempt = 0; attempt < DOWNLOAD_ATTEMPTS; attempt++) {
+    let offset = 0;
+    let etag = null;
+    try {
+      offset = fs.statSync(file).size;
+      etag = JSON.parse(fs.readFileSync(file + '.json', 'utf-8')).etag || null;
+    } catch (_) {
+      offset = 0;
+    }
+    // Without an ETag a partial file can't be matched to the current content
+    if (offset > 0 && !etag) offset = 0;
+
+    const headers = offset > 0 ? { Range: `bytes=${offset}-`, 'If-Range': etag } : {};
+    try {
+      const res = await request(url, 'GET', timeout, { headers, stream: true });
+      if (res.statusCode === 416) {
+        res.res.resume();
+        fs.rmSync(file, { force: true });
+        continue;
+      }
+      if (res.statusCode < 200 || res.statusCode >= 400) {
+        res.res.resume();
+        console.warn(`[asset-downloader] HTTP ${res.statusCode} for ${url}, skipping`);
+        return null;
+      }
+
+      const resumed = res.statusCode === 206 && offset > 0;
+      const responseEtag = res.headers.etag || null;
+      const total = parseInt((res.headers['content-range'] || '').split('/')[1] || res.headers['content-length'] || '0', 10);
+      if (total > maxBytes) {
+        res.res.destroy();
+        fs.rmSync(file, { force: true });
+        fs.rmSync(file + '.json', { force: true });
+        console.warn(`[asset-downloader] ${url} is ${total} bytes (limit ${maxBytes}), skipping`);
+        return null;
+      }
+      fs.writeFileSync(file + '.json', JSON.stringify({ url, etag: responseEtag }));
+
+      const hash = crypto.createHash('sha256');
+      if (resumed) {
+        await new Promise((resolve, reject) => {
+          fs.createReadStream(file).on('data', (c) => hash.update(c)).on('end', resolve).on('error', reject);
+        });
+      }
+      await new Promise((resolve, reject) => {
+        // Settle only once the file is closed, so a retry sees every byte received
+        const out = fs.createWriteStream(file, { flags: resumed ? 'a' : 'w' });
+        let error = null;
+        let received = resumed ? offset : 0;
+        const fail = (err) => {
+          error = error || err;
+          out.end();
+        };
+        res.res.on('data', (chunk) => {
+          hash.update(chunk);
+          received += chunk.length;
+          if (received > maxBytes) {
+            const err = new Error(`body exceeds ${maxBytes} bytes`);
+            err.tooLarge = true;
+            fail(err);
+            res.res.unpipe(out);
+            res.res.destroy();
+          }
+        });
+        res.res.on('error', fail);
+        res.res.on('aborted', () => fail(new Error('connection aborted')));
+        out.on('error', fail);
+        out.on('close', () => (error ? reject(error) : resolve()));
+        res.res.pipe(out);
+      });
+
+      const size = fs.statSync(file).size;
+      if (size === 0) {
+        console.warn(`[asset-downloader] Empty response for ${url}, skipping`);
+        fs.rmSync(file, { force: true });
+        return null;
+      }
+      if (total > 0 && size < total) {
+        throw new Error(`incomplete body (${size}/${total} bytes)`);
+      }
+      const entry = { etag: responseEtag, size, contentType: res.headers['content-type'] || '' };
+      store.commit(url, file, hash.digest('hex'), entry);
+      return store.index[url];
+    } catch (err) {
+      lastError = err;
+      if (err.tooLarge) {
+        fs.rmSync(file, { force: true });
+        fs.rmSync(file + '.json', { force: true });
+        break;
+      }
+    }
+  }
+  console.warn(`[asset-downloader] Failed to download ${url}: ${lastError ? lastError.message : 'unknown error'}`);
+  return null;
+}
+
 // ── Core Functions ───────────────────────────────────────────────────────────
 
 /**
@@ -129,14 +402,19 @@ function ensureDir(dir) {
  * For Lottie files (.json with /lottie/ path): makes a GET request and
  * verifies the JSON has v, fr, layers keys.
  *
+ * Assets already in the store (`options.cacheDir`) pass without a request.
+ *
  * @param {Array<{ url: string, localPath: string, category: string }>} downloadManifest
+ * @param {object} [options] - { cacheDir, concurrency }
  * @returns {Promise<Array<{ url: string, localPath: string, category: string }>>} Filtered manifest
  */
-async function verifyAssets(downloadManifest) {
+async function verifyAssets(downloadManifest, options = {}) {
   if (!downloadManifest || downloadManifest.length === 0) return [];
+  const store = options.cacheDir ? new AssetStore(options.cacheDir) : null;
 
-  const results = await Promise.all(
-    downloadManifest.map(async (entry) => {
+  const results = await mapLimit(downloadManifest, options.concurrency || MAX_CONCURRENT,
+    async (entry) => {
+      if (store && store.lookup(entry.url)) return entry;
       try {
         const isLottie = entry.localPath.startsWith('/lottie/');
 
@@ -182,8 +460,7 @@ async function verifyAssets(downloadManifest) {
         // Network error, timeout, etc. - skip this asset
         return null;
       }
-    })
-  );
+    });
 
   return results.filter(Boolean);
 }
@@ -195,63 +472,81 @@ async function verifyAssets(downloadManifest) {
  * {siteDir}/public/lottie/. Uses content-addressed filenames for
  * deduplication. Skips download if the file already exists (idempotent).
  *
+ * Every asset is streamed into the store first and hardlinked into public/.
+ * With `options.cacheDir` the store is shared across projects and runs, and
+ * URLs it already holds are not requested; without it a temporary store is
+ * used and removed afterwards.
+ *
  * @param {Array<{ url: string, localPath: string, category: string }>} verifiedManifest
  * @param {string} siteDir - Absolute path to the site output directory
+ * @param {object} [options] - { cacheDir, concurrency, timeout, stats: filled with { cached, fetched, failed } }
  * @returns {Promise<object>} Asset manifest mapping original URLs to local paths
  */
-async function downloadAssets(verifiedManifest, siteDir) {
+async function downloadAssets(verifiedManifest, siteDir, options = {}) {
   if (!verifiedManifest || verifiedManifest.length === 0) return {};
 
   const publicDir = path.join(siteDir, 'public');
   ensureDir(path.join(publicDir, 'images'));
   ensureDir(path.join(publicDir, 'lottie'));
 
+  const tmpStore = options.cacheDir ? null : fs.mkdtempSync(path.join(os.tmpdir(), 'assets-'));
+  const store = new AssetStore(options.cacheDir || tmpStore);
+  const stats = Object.assign(options.stats || {}, { cached: 0, fetched: 0, failed: 0 });
   const assetManifest = {};
 
-  // Process in batches of MAX_CONCURRENT
-  for (let i = 0; i < verifiedManifest.length; i += MAX_CONCURRENT) {
-    const batch = verifiedManifest.slice(i, i + MAX_CONCURRENT);
-
-    await Promise.all(
-      batch.map(async (entry) => {
-        // localPath is like /images/abc12345-photo.jpg
-        const destPath = path.join(publicDir, entry.localPath);
+  // The same URL can appear under several categories; fetch it once
+  const pending = new Map();
+  const fetchOnce = (url) => {
+    if (!pending.has(url)) pending.set(url, fetchToStore(store, url, options.timeout));
+    return pending.get(url);
+  };
+
+  try {
+    await mapLimit(verifiedManifest, options.concurrency || MAX_CONCURRENT, async (entry) => {
+      // localPath is like /images/abc12345-photo.jpg
+      const destPath = path.join(publicDir, entry.localPath);
+
+      // Skip if already downloaded (idempotent)
+      if (fs.existsSync(destPath)) {
+        assetManifest[entry.url] = entry.localPath;
+        stats.cached++;
+        return;
+      }
 
-        // Skip if already downloaded (idempotent)
-        if (fs.existsSync(destPath)) {
-          assetManifest[entry.url] = entry.localPath;
+      let stored = store.lookup(entry.url);
+      if (stored) {
+        stats.cached++;
+      } else {
+        stored = await fetchOnce(entry.url);
+        if (!stored) {
+          stats.failed++;
           return;
         }
-
-        try {
-          const res = await request(entry.url, 'GET', DOWNLOAD_TIMEOUT_MS);
-
-          if (res.statusCode < 200 || res.statusCode >= 400) {
-            console.warn(`[asset-downloader] HTTP ${res.statusCode} for ${entry.url}, skipping`);
-            return;
-          }
-
-          if (!res.body || res.body.length === 0) {
-            console.warn(`[asset-downloader] Empty response for ${entry.url}, skipping`);
-            return;
-          }
-
-          // Ensure parent directory exists
-          ensureDir(path.dirname(destPath));
-          fs.writeFileSync(destPath, res.body);
-          assetManifest[entry.url] = entry.localPath;
-        } catch (err) {
-          console.warn(`[asset-downloader] Failed to download ${entry.url}: ${err.message}`);
-          // Continue with remaining downloads
-        }
-      })
-    );
+        stats.fetched++;
+      }
+      store.materialise(stored.sha256, destPath);
+      assetManifest[entry.url] = entry.localPath;
+    });
+    store.save();
+  } finally {
+    if (tmpStore) fs.rmSync(tmpStore, { recursive: true, force: true });
   }
 
   return assetManifest;
 }
 
+/**
+ * Close the keep-alive agents' idle sockets so a one-shot script can exit.
+ */
+function closeAgents() {
+  for (const agent of Object.values(AGENTS)) agent.destroy();
+}
+
 module.exports = {
+  LOTTIE_REQUIRED_KEYS,
+  AssetStore,
+  closeAgents,
+  fetchToStore,
   verifyAssets,
   downloadAssets,
 };
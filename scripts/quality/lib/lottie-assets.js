@@ -0,0 +1,230 @@
+/**
+ * Lottie Assets
+ * Downloads the Lottie animations an extraction found into the site's
+ * public/lottie/, optionally repackaged as compressed dotLottie (.lottie).
+ *
+ * Downloads stream through the asset store (see asset-downloader.js) with a
+ * size cap, so each URL is fetched once across projects. JSON is validated
+ * before it is shipped, and the packed .lottie is cached next to its source
+ * blob. The returned manifest maps each source URL to the file sections
+ * should load.
+ *
+ * @module lottie-assets
+ */
+
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+
+const { LOTTIE_REQUIRED_KEYS, AssetStore, fetchToStore } = require('./asset-downloader');
+
+// ── Constants ────────────────────────────────────────────────────────────────
+
+/** Largest Lottie file accepted (bytes) */
+const MAX_LOTTIE_BYTES = 8 * 1024 * 1024;
+
+/** Timeout per Lottie request (ms) */
+const LOTTIE_TIMEOUT_MS = 15000;
+
+/** Concurrent Lottie downloads */
+const LOTTIE_CONCURRENCY = 6;
+
+/** Zip local file header signature; every .lottie starts with it */
+const ZIP_MAGIC = Buffer.from([0x50, 0x4b, 0x03, 0x04]);
+
+// ── Helpers ──────────────────────────────────────────────────────────────────
+
+const CRC_TABLE = (() => {
+  const table = new Uint32Array(256);
+  for (let n = 0; n < 256; n++) {
+    let c = n;
+    for (let k = 0; k < 8; k++) c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+    table[n] = c >>> 0;
+  }
+  return table;
+})();
+
+function crc32(buf) {
+  let crc = 0xffffffff;
+  for (let i = 0; i < buf.length; i++) crc = CRC_TABLE[(crc ^ buf[i]) & 0xff] ^ (crc >>> 8);
+  return (crc ^ 0xffffffff) >>> 0;
+}
+
+/**
+ * Build a deflate-compressed zip from { name: Buffer } entries.
+ *
+ * @param {object} files
+ * @returns {Buffer}
+ */
+function zip(files) {
+  const locals = [];
+  const centrals = [];
+  let offset = 0;
+  for (const [name, data] of Object.entries(files)) {
+    const nameBuf = Buffer.from(name, 'utf-8');
+    const deflated = zlib.deflateRawSync(data, { level: 9 });
+    const crc = crc32(data);
+
+    const local = Buffer.alloc(30);
+    local.writeUInt32LE(0x04034b50, 0);
+    local.writeUInt16LE(20, 4);           // version needed
+    local.writeUInt16LE(0, 6);            // flags
+    local.writeUInt16LE(8, 8);            // deflate
+    local.writeUInt32LE(0, 10);           // mod time/date
+    local.writeUInt32LE(crc, 14);
+    local.writeUInt32LE(deflated.length, 18);
+    local.writeUInt32LE(data.length, 22);
+    local.writeUInt16LE(nameBuf.length, 26);
+    local.writeUInt16LE(0, 28);
+    locals.push(local, nameBuf, deflated);
+
+    const central = Buffer.alloc(46);
+    central.writeUInt32LE(0x02014b50, 0);
+    central.writeUInt16LE(20, 4);         // version made by
+    central.writeUInt16LE(20, 6);
+    central.writeUInt16LE(0, 8);
+    central.writeUInt16LE(8, 10);
+    central.writeUInt32LE(0, 12);
+    central.writeUInt32LE(crc, 16);
+    central.writeUInt32LE(deflated.length, 20);
+    central.writeUInt32LE(data.length, 24);
+    central.writeUInt16LE(nameBuf.length, 28);
+    central.writeUInt32LE(offset, 42);
+    centrals.push(central, nameBuf);
+
+    offset += local.length + nameBuf.length + deflated.length;
+  }
+  const centralSize = centrals.reduce((n, b) => n + b.length, 0);
+  const end = Buffer.alloc(22);
+  end.writeUInt32LE(0x06054b50, 0);
+  end.writeUInt16LE(Object.keys(files).length, 8);
+  end.writeUInt16LE(Object.keys(files).length, 10);
+  end.writeUInt32LE(centralSize, 12);
+  end.writeUInt32LE(offset, 16);
+  return Buffer.concat([...locals, ...centrals, end]);
+}
+
+/**
+ * Public filename stem for a Lottie URL ("…/hero-loop.json?v=2" → "hero-loop").
+ * Matches the /lottie/{stem}.json path the animation injector tells sections to load.
+ *
+ * @param {string} url
+ * @returns {string}
+ */
+function lottieStem(url) {
+  const base = url.split('/').pop().split('?')[0].split('#')[0] || 'animation';
+  return base.replace(/\.(json|lottie)$/i, '') || 'animation';
+}
+
+/**
+ * Parse a Lottie JSON buffer; null unless it has the required keys.
+ *
+ * @param {Buffer} buf
+ * @returns {object|null}
+ */
+function validateLottieJson(buf) {
+  try {
+    const json = JSON.parse(buf.toString('utf-8'));
+    return json && LOTTIE_REQUIRED_KEYS.every((key) => key in json) ? json : null;
+  } catch (_) {
+    return null;
+  }
+}
+
+/**
+ * Package Lottie JSON as a dotLottie archive (manifest.json + animations/{id}.json).
+ *
+ * @param {Buffer} jsonBuf - Validated Lottie JSON
+ * @param {string} id - Animation id
+ * @returns {Buffer}
+ */
+function packDotLottie(jsonBuf, id) {
+  const manifest = {
+    version: '1',
+    generator: 'web-builder',
+    animations: [{ id, loop: true, autoplay: true }],
+  };
+  return zip({
+    'manifest.json': Buffer.from(JSON.stringify(manifest)),
+    [`animations/${id}.json`]: jsonBuf,
+  });
+}
+
+// ── Core Functions ───────────────────────────────────────────────────────────
+
+/**
+ * Fetch, validate and install Lottie files into {siteDir}/public/lottie/.
+ *
+ * @param {string[]} urls - Lottie URLs (.json, or .lottie passed through as-is)
+ * @param {string} siteDir - Absolute path to the site output directory
+ * @param {object} options - { cacheDir (required), dotLottie, maxBytes, concurrency }
+ * @returns {Promise<{ manifest: object, skipped: Array<{ url: string, reason: string }> }>}
+ *   manifest maps URL → { src, format, bytes, sourceBytes, cached }
+ */
+async function installLottieAssets(urls, siteDir, options) {
+  const store = new AssetStore(options.cacheDir);
+  const outDir = path.join(siteDir, 'public', 'lottie');
+  fs.mkdirSync(outDir, { recursive: true });
+  const maxBytes = options.maxBytes || MAX_LOTTIE_BYTES;
+  const manifest = {};
+  const skipped = [];
+
+  const queue = [...new Set(urls)];
+  const worker = async () => {
+    while (queue.length > 0) {
+      const url = queue.shift();
+      let entry = store.lookup(url);
+      const cached = Boolean(entry);
+      if (!entry) entry = await fetchToStore(store, url, LOTTIE_TIMEOUT_MS, { maxBytes });
+      if (!entry) {
+        skipped.push({ url, reason: 'download failed or too large' });
+        continue;
+      }
+
+      const blob = store.blobPath(entry.sha256);
+      const source = fs.readFileSync(blob);
+      const stem = lottieStem(url);
+      let file;
+      if (source.subarray(0, 4).equals(ZIP_MAGIC)) {
+        file = { name: `${stem}.lottie`, from: blob, format: 'lottie' };
+      } else if (!validateLottieJson(source)) {
+        skipped.push({ url, reason: 'not Lottie JSON' });
+        continue;
+      } else if (options.dotLottie) {
+        const packed = `${blob}.lottie`;
+        if (!fs.existsSync(packed)) {
+          const tmp = `${packed}.${process.pid}.tmp`;
+          fs.writeFileSync(tmp, packDotLottie(source, stem));
+          fs.renameSync(tmp, packed);
+        }
+        file = { name: `${stem}.lottie`, from: packed, format: 'lottie' };
+      } else {
+        file = { name: `${stem}.json`, from: blob, format: 'json' };
+      }
+
+      const dest = path.join(outDir, file.name);
+      fs.rmSync(dest, { force: true });
+      store.materialise(path.basename(file.from), dest);
+      manifest[url] = {
+        src: `/lottie/${file.name}`,
+        format: file.format,
+        bytes: fs.statSync(dest).size,
+        sourceBytes: source.length,
+        cached,
+      };
+    }
+  };
+  await Promise.all(Array.from({ length: options.concurrency || LOTTIE_CONCURRENCY }, worker));
+  store.save();
+  return { manifest, skipped };
+}
+
+module.exports = {
+  MAX_LOTTIE_BYTES,
+  lottieStem,
+  validateLottieJson,
+  packDotLottie,
+  installLottieAssets,
+};
@@ -515,7 +515,8 @@ function detectUIComponents(extractionData, mappedSections) {
  * if one exists.
  *
  * @param {string[]} detectedPatterns - Array of UI pattern names detected from the source site
- * @param {object} [searchIndex] - Optional animation_search_index.json data for richer matching
+ * @param {object} [searchIndex] - Optional registry index (registry-index.js) or
+ *   animation_search_index.json data for richer matching
  * @returns {Array<{ pattern: string, matched: boolean, component: object|null, searchQuery: string }>}
  */
 function matchUIComponents(detectedPatterns, searchIndex) {
@@ -573,7 +574,9 @@ function matchUIComponents(detectedPatterns, searchIndex) {
 
 /**
  * Simple search index lookup - finds the best matching component from the search index.
- * @param {object} searchIndex - The animation_search_index.json data
+ * With a compiled registry index, only components that deploy copies into the
+ * site (those in component-registry.json) are returned.
+ * @param {object} searchIndex - A registry-index.js index, or animation_search_index.json data
  * @param {string} query - Search query string
  * @param {string|null} category - Optional category to filter by
  * @returns {object|null} - Matched component info or null
@@ -581,6 +584,14 @@ function matchUIComponents(detectedPatterns, searchIndex) {
 function searchIndexLookup(searchIndex, query, category) {
   if (!searchIndex) return null;
 
+  if (typeof searchIndex.search === 'function') {
+    const hits = searchIndex.search(query, { category, limit: 25 });
+    const hit = hits.find(function (h) {
+      return getRegistryComponentByFile(h.file);
+    });
+    return hit ? { file: hit.file, category: hit.category } : null;
+  }
+
   const words = query.toLowerCase().split(/\s+/);
   let bestMatch = null;
   let bestScore = 0;
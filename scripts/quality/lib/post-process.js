@@ -468,6 +468,29 @@ function detectAndRepairTruncation(code, sectionName) {
   };
 }
 
+/**
+ * Batch form of detectAndRepairTruncation() for a set of generated files.
+ *
+ * Results come back in input order. `code` is only included when the file
+ * was repaired, so unchanged sources are not echoed back. A file that makes
+ * the check throw gets null instead of failing the whole batch.
+ *
+ * @param {Array<{name: string, code: string}>} files
+ * @returns {Array<{ truncated: boolean, repaired: boolean, code?: string, warnings: string[] } | null>}
+ */
+function detectAndRepairTruncationAll(files) {
+  return (files || []).map(({ name, code }) => {
+    try {
+      const result = detectAndRepairTruncation(code, name);
+      if (!result.repaired) delete result.code;
+      return result;
+    } catch (err) {
+      console.error(`  ⚠ Truncation check failed for ${name}: ${err.message}`);
+      return null;
+    }
+  });
+}
+
 // ---------------------------------------------------------------------------
 // Exports
 // ---------------------------------------------------------------------------
@@ -477,4 +500,5 @@ module.exports = {
   validateComponent,
   processAllSections,
   detectAndRepairTruncation,
+  detectAndRepairTruncationAll,
 };
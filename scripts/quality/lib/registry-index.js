@@ -0,0 +1,295 @@
+/**
+ * Registry Index — lookups over the compiled animation registry
+ *
+ * Reads the SQLite index built by scripts/registry_index.py
+ * (output/.cache/registry/animation_index.sqlite) through node:sqlite when
+ * this Node has it (22.5+) and the index is current for the registry JSON.
+ * Otherwise it builds the same index in memory from animation_registry.json
+ * and animation_search_index.json, once per process.
+ *
+ * Both backends expose the same API and ranking as the Python side:
+ *   get(id), byFile(sourceFile), find(facet, value), byArchetype(a), byTag(t),
+ *   byCapability(...caps), search(text, { category, limit })
+ *
+ * Usage:
+ *   const { openRegistryIndex } = require('./registry-index');
+ *   const index = openRegistryIndex();
+ *   index.search('accordion expand collapse', { category: 'interactive' });
+ */
+
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+
+const REGISTRY_DIR = path.resolve(__dirname, '../../../skills/animation-components/registry');
+const REGISTRY_FILES = ['animation_registry.json', 'animation_search_index.json'];
+const DEFAULT_DB_PATH = path.resolve(__dirname, '../../../output/.cache/registry/animation_index.sqlite');
+
+// Must match scripts/registry_index.py
+const SCHEMA_VERSION = 1;
+const SEARCH_INDEX_FACETS = {
+  by_intent: 'intent',
+  by_section_role: 'archetype',
+  by_trigger: 'trigger',
+  by_layout_context: 'layout_context',
+  by_interaction_type: 'interaction_type',
+  by_performance_risk: 'performance_risk',
+  by_component_type: 'component_type',
+  by_framework: 'framework',
+  by_animation_type: 'animation_type',
+};
+const TAG_FIELDS = [
+  'motion_intents', 'interaction_intents', 'conversion_support_roles',
+  'supported_elements', 'supported_layout_contexts', 'trigger_types',
+];
+const CAPABILITY_FIELDS = [
+  'stagger_support', 'interruptible', 'reversible', 'composable', 'looping',
+  'gpu_accelerated', 'accessibility_safe', 'reduced_motion_fallback_present',
+  'mobile_safe', 'requires_layout_measurement',
+];
+const LIBRARY_DIR = '21st-dev-library';
+const MIN_SEARCH_SCORE = 2;
+
+let sqlite = null;
+try {
+  sqlite = require('node:sqlite');
+} catch (err) {
+  sqlite = null;
+}
+
+// ---------------------------------------------------------------------------
+// Shared helpers (tokenising + ranking, same rules as registry_index.py)
+// ---------------------------------------------------------------------------
+
+function words(text) {
+  return String(text).toLowerCase().match(/[a-z0-9]+/g) || [];
+}
+
+function componentCategory(component) {
+  const file = component.source_file || '';
+  const top = file.split('/')[0];
+  if (top && top !== LIBRARY_DIR && file.includes('/')) return top;
+  return component.animation_type || '';
+}
+
+function componentTokens(component) {
+  const parts = [
+    component.animation_id, component.source_file, component.component_type,
+    component.framework, component.animation_type,
+  ];
+  for (const field of TAG_FIELDS.concat(['section_archetypes'])) {
+    parts.push(...(component[field] || []));
+  }
+  return [...new Set(words(parts.filter((p) => p != null).join(' ')))];
+}
+
+function scoreTokens(tokens, queryWords, category, wantCategory) {
+  let score = queryWords.filter((w) => tokens.some((t) => t.startsWith(w))).length;
+  if (wantCategory && category === wantCategory) score += 2;
+  return score;
+}
+
+function rankHits(hits, limit) {
+  hits.sort((a, b) => b.score - a.score
+    || Number(a.file.startsWith(LIBRARY_DIR + '/')) - Number(b.file.startsWith(LIBRARY_DIR + '/'))
+    || (a.id < b.id ? -1 : a.id > b.id ? 1 : 0));
+  return hits.slice(0, limit);
+}
+
+function sourceStamp(registryDir) {
+  const stamp = { schema: SCHEMA_VERSION };
+  for (const name of REGISTRY_FILES) {
+    const st = fs.statSync(path.join(registryDir, name), { bigint: true });
+    stamp[name] = [Number(st.mtimeNs), Number(st.size)];
+  }
+  return stamp;
+}
+
+/** Shared query methods built on find/get primitives. */
+function withHelpers(index) {
+  index.byArchetype = (archetype) => index.find('archetype', String(archetype).toUpperCase());
+  index.byTag = (tag) => index.find('tag', tag);
+  index.byCapability = (...caps) => {
+    if (caps.length === 0) return [];
+    let result = null;
+    for (const cap of caps) {
+      const ids = new Set(index.find('capability', cap));
+      result = result === null ? ids : new Set([...result].filter((id) => ids.has(id)));
+    }
+    return [...result].sort();
+  };
+  return index;
+}
+
+// ---------------------------------------------------------------------------
+// SQLite backend
+// ---------------------------------------------------------------------------
+
+function openSqliteIndex(dbPath) {
+  const db = new sqlite.DatabaseSync(dbPath, { readOnly: true });
+  const meta = (key) => {
+    const row = db.prepare('SELECT value FROM meta WHERE key = ?').get(key);
+    return row ? row.value : null;
+  };
+  const fts5 = meta('fts5') === '1';
+  const getById = db.prepare('SELECT data FROM components WHERE id = ?');
+  const getByFile = db.prepare('SELECT data FROM components WHERE source_file = ?');
+  const findIds = db.prepare('SELECT id FROM facets WHERE facet = ? AND value = ? ORDER BY id');
+  const searchFts = fts5 ? db.prepare(
+    'SELECT c.id, c.source_file, c.category, c.tokens FROM components_fts f '
+    + 'JOIN components c ON c.id = f.id WHERE components_fts MATCH ?') : null;
+  const scanAll = db.prepare('SELECT id, source_file, category, tokens FROM components');
+
+  return withHelpers({
+    backend: 'sqlite',
+    stamp: JSON.parse(meta('sources') || 'null'),
+    get(id) {
+      const row = getById.get(id);
+      return row ? JSON.parse(row.data) : null;
+    },
+    byFile(sourceFile) {
+      const row = getByFile.get(sourceFile);
+      return row ? JSON.parse(row.data) : null;
+    },
+    find(facet, value) {
+      return findIds.all(facet, String(value)).map((r) => r.id);
+    },
+    search(text, options = {}) {
+      const queryWords = words(text);
+      if (queryWords.length === 0) return [];
+      const rows = searchFts
+        ? searchFts.all(queryWords.map((w) => `"${w}"*`).join(' OR '))
+        : scanAll.all();
+      const hits = [];
+      for (const r of rows) {
+        const score = scoreTokens(r.tokens.split(' '), queryWords, r.category, options.category);
+        if (score >= MIN_SEARCH_SCORE) {
+          hits.push({ id: r.id, file: r.source_file, category: r.category, score });
+        }
+      }
+      return rankHits(hits, options.limit || 10);
+    },
+  });
+}
+
+// ---------------------------------------------------------------------------
+// In-memory backend (Node without node:sqlite, or no current index file)
+// ---------------------------------------------------------------------------
+
+function buildMemoryIndex(registryDir) {
+  const registry = JSON.parse(fs.readFileSync(path.join(registryDir, REGISTRY_FILES[0]), 'utf-8'));
+  const searchIndex = JSON.parse(fs.readFileSync(path.join(registryDir, REGISTRY_FILES[1]), 'utf-8'));
+  const components = new Map();
+  const byFile = new Map();
+  const facets = new Map();
+  const postings = new Map(); // token → Set of ids
+
+  const addFacet = (facet, value, id) => {
+    const key = facet + '\u0000' + value;
+    if (!facets.has(key)) facets.set(key, new Set());
+    facets.get(key).add(id);
+  };
+
+  for (const [key, facet] of Object.entries(SEARCH_INDEX_FACETS)) {
+    for (const [value, ids] of Object.entries(searchIndex[key] || {})) {
+      for (const id of ids) addFacet(facet, String(value), id);
+    }
+  }
+  for (const c of registry.components || []) {
+    const id = c.animation_id;
+    const tokens = componentTokens(c);
+    components.set(id, { data: c, category: componentCategory(c), tokens });
+    byFile.set(c.source_file, id);
+    for (const a of c.section_archetypes || []) addFacet('archetype', a, id);
+    for (const field of TAG_FIELDS) {
+      for (const v of c[field] || []) addFacet('tag', String(v), id);
+    }
+    for (const f of CAPABILITY_FIELDS) if (c[f] === true) addFacet('capability', f, id);
+    for (const d of c.dependencies || []) addFacet('dependency', d, id);
+    for (const t of tokens) {
+      if (!postings.has(t)) postings.set(t, new Set());
+      postings.get(t).add(id);
+    }
+  }
+  const vocabulary = [...postings.keys()];
+
+  return withHelpers({
+    backend: 'memory',
+    get(id) {
+      const entry = components.get(id);
+      return entry ? entry.data : null;
+    },
+    byFile(sourceFile) {
+      const id = byFile.get(sourceFile);
+      return id ? components.get(id).data : null;
+    },
+    find(facet, value) {
+      return [...(facets.get(facet + '\u0000' + String(value)) || [])].sort();
+    },
+    search(text, options = {}) {
+      const queryWords = words(text);
+      if (queryWords.length === 0) return [];
+      const candidates = new Set();
+      for (const token of vocabulary) {
+        if (queryWords.some((w) => token.startsWith(w))) {
+          for (const id of postings.get(token)) candidates.add(id);
+        }
+      }
+      const hits = [];
+      for (const id of candidates) {
+        const entry = components.get(id);
+        const score = scoreTokens(entry.tokens, queryWords, entry.category, options.category);
+        if (score >= MIN_SEARCH_SCORE) {
+          hits.push({ id, file: entry.data.source_file, category: entry.category, score });
+        }
+      }
+      return rankHits(hits, options.limit || 10);
+    },
+  });
+}
+
+// ---------------------------------------------------------------------------
+// Open (cached per process, reopened when the registry JSON changes)
+// ---------------------------------------------------------------------------
+
+let _cached = null;
+
+/**
+ * Open the registry index.
+ * @param {object} [options]
+ * @param {string} [options.dbPath] - Compiled index (default: output/.cache/registry/animation_index.sqlite)
+ * @param {string} [options.registryDir] - Directory holding the registry JSON
+ * @returns {object} Index with get/byFile/find/byArchetype/byTag/byCapability/search
+ */
+function openRegistryIndex(options = {}) {
+  const dbPath = options.dbPath || DEFAULT_DB_PATH;
+  const registryDir = options.registryDir || REGISTRY_DIR;
+  const stampKey = JSON.stringify(sourceStamp(registryDir));
+  const cacheKey = dbPath + '\u0000' + registryDir;
+  if (_cached && _cached.key === cacheKey && _cached.stampKey === stampKey) {
+    return _cached.index;
+  }
+
+  let index = null;
+  if (sqlite && fs.existsSync(dbPath)) {
+    try {
+      const candidate = openSqliteIndex(dbPath);
+      if (JSON.stringify(candidate.stamp) === stampKey) index = candidate;
+    } catch (err) {
+      index = null;
+    }
+  }
+  if (!index) index = buildMemoryIndex(registryDir);
+
+  _cached = { key: cacheKey, stampKey, index };
+  return index;
+}
+
+module.exports = {
+  openRegistryIndex,
+  componentTokens,
+  componentCategory,
+  DEFAULT_DB_PATH,
+  REGISTRY_DIR,
+};
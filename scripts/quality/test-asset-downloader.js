@@ -0,0 +1,247 @@
+#!/usr/bin/env node
+/**
+ * Test Harness — Asset Download Engine
+ *
+ * Drives lib/asset-downloader.js and lib/lottie-assets.js against a local
+ * HTTP stand-in (127.0.0.1): store hits, hardlinked materialisation, Range
+ * resume, redirects, failures, the per-host connection limit, Lottie size
+ * limits and dotLottie packing. No external network. Runtime < 5 seconds.
+ *
+ * Usage:
+ *   node scripts/quality/test-asset-downloader.js
+ */
+
+'use strict';
+
+const crypto = require('crypto');
+const fs = require('fs');
+const http = require('http');
+const os = require('os');
+const path = require('path');
+const zlib = require('zlib');
+
+const { AssetStore, closeAgents, downloadAssets, verifyAssets } = require('./lib/asset-downloader');
+const { installLottieAssets, lottieStem } = require('./lib/lottie-assets');
+
+// --- Test Framework ---
+
+let passed = 0;
+let failed = 0;
+const failures = [];
+
+function assert(condition, message) {
+  if (condition) {
+    passed++;
+    console.log('  ✓ ' + message);
+  } else {
+    failed++;
+    failures.push(message);
+    console.log('  ✗ FAIL: ' + message);
+  }
+}
+
+function assertEq(actual, expected, message) {
+  assert(actual === expected, message + ' (got: ' + actual + ', expected: ' + expected + ')');
+}
+
+function section(name) {
+  console.log('\n--- ' + name + ' ---');
+}
+
+// --- HTTP Stand-in ---
+
+const BODIES = {};
+for (let i = 0; i < 12; i++) {
+  BODIES['/img/' + i + '.png'] = crypto.randomBytes(4096 + i);
+}
+BODIES['/img/big.jpg'] = crypto.randomBytes(256 * 1024);
+BODIES['/img/copy.png'] = BODIES['/img/0.png'];
+
+const LOTTIE = { v: '5.7.4', fr: 30, ip: 0, op: 60, w: 200, h: 200, layers: Array.from({ length: 40 }, (_, i) => ({ ind: i, ty: 4, nm: 'Layer ' + i, ks: {} })) };
+BODIES['/anim/hero-loop.json'] = Buffer.from(JSON.stringify(LOTTIE));
+BODIES['/anim/not-lottie.json'] = Buffer.from(JSON.stringify({ hello: 'world' }));
+BODIES['/anim/huge.json'] = Buffer.alloc(64 * 1024, 32);
+
+const log = [];
+let active = 0;
+let maxActive = 0;
+let cutNext = new Set(['/img/big.jpg']);
+
+function etagOf(body) {
+  return '"' + crypto.createHash('md5').update(body).digest('hex') + '"';
+}
+
+const server = http.createServer((req, res) => {
+  log.push({ method: req.method, url: req.url, range: req.headers.range || null });
+  if (req.url === '/moved.png') {
+    res.writeHead(302, { Location: '/img/1.png' });
+    res.end();
+    return;
+  }
+  const body = BODIES[req.url.split('?')[0]];
+  if (!body) {
+    res.writeHead(404);
+    res.end();
+    return;
+  }
+  active++;
+  maxActive = Math.max(maxActive, active);
+  const headers = { 'Content-Type': 'image/png', ETag: etagOf(body), 'Accept-Ranges': 'bytes' };
+  const range = /bytes=(\d+)-/.exec(req.headers.range || '');
+  setTimeout(() => {
+    active--;
+    if (req.method === 'HEAD') {
+      res.writeHead(200, { ...headers, 'Content-Length': body.length });
+      res.end();
+      return;
+    }
+    if (range && req.headers['if-range'] === headers.ETag) {
+      const start = parseInt(range[1], 10);
+      res.writeHead(206, { ...headers, 'Content-Length': body.length - start,
+        'Content-Range': `bytes ${start}-${body.length - 1}/${body.length}` });
+      res.end(body.subarray(start));
+      return;
+    }
+    if (req.url.startsWith('/anim/huge.json')) {
+      // Chunked: the size is only discovered while streaming
+      res.writeHead(200, { 'Content-Type': 'application/json' });
+      res.end(body);
+      return;
+    }
+    res.writeHead(200, { ...headers, 'Content-Length': body.length });
+    if (cutNext.has(req.url)) {
+      // Send half the body, then drop the connection
+      cutNext.delete(req.url);
+      res.write(body.subarray(0, body.length / 2), () => res.destroy());
+      return;
+    }
+    res.end(body);
+  }, 15);
+});
+
+function manifestFor(base, names) {
+  return names.map((name) => ({
+    url: base + name,
+    localPath: '/images/' + name.replace(/\//g, '-').replace(/^-/, ''),
+    category: 'content',
+  }));
+}
+
+async function main() {
+  await new Promise((resolve) => server.listen(0, '127.0.0.1', resolve));
+  const base = 'http://127.0.0.1:' + server.address().port;
+  const tmp = fs.mkdtempSync(path.join(os.tmpdir(), 'asset-dl-test-'));
+  const cacheDir = path.join(tmp, 'cache');
+  const names = Object.keys(BODIES).filter((n) => n.startsWith('/img/')).concat(['/moved.png', '/missing.png']);
+  const manifest = manifestFor(base, names);
+
+  try {
+    section('D1: Cold download into the store');
+    {
+      const verified = await verifyAssets(manifest, { cacheDir });
+      assertEq(verified.length, names.length - 1, 'D1: 404 filtered by verification');
+      const stats = {};
+      const siteA = path.join(tmp, 'site-a');
+      const result = await downloadAssets(verified, siteA, { cacheDir, stats });
+      assertEq(Object.keys(result).length, verified.length, 'D1: every verified asset in the manifest');
+      assertEq(result[base + '/img/3.png'], '/images/img-3.png', 'D1: manifest maps URL to localPath');
+      const onDisk = fs.readFileSync(path.join(siteA, 'public', 'images', 'img-big.jpg'));
+      assert(onDisk.equals(BODIES['/img/big.jpg']), 'D1: interrupted download completed with the right bytes');
+      const bigRequests = log.filter((r) => r.method === 'GET' && r.url === '/img/big.jpg');
+      const resumedAt = bigRequests.length === 2 ? parseInt((/bytes=(\d+)-/.exec(bigRequests[1].range || '') || [])[1], 10) : 0;
+      assert(resumedAt > 0, 'D1: retry resumed with a Range request (from byte ' + resumedAt + ')');
+      assert(fs.readFileSync(path.join(siteA, 'public', 'images', 'moved.png')).equals(BODIES['/img/1.png']),
+        'D1: redirect followed');
+      assert(maxActive <= 6, 'D1: per-host connection limit respected (max in flight: ' + maxActive + ')');
+      assertEq(stats.failed, 0, 'D1: no failed downloads');
+    }
+
+    section('D2: Content-addressed store');
+    {
+      const store = new AssetStore(cacheDir);
+      const hash = crypto.createHash('sha256').update(BODIES['/img/0.png']).digest('hex');
+      assertEq(store.lookup(base + '/img/0.png').sha256, hash, 'D2: blob named by sha256 of its bytes');
+      assertEq(store.lookup(base + '/img/copy.png').sha256, hash, 'D2: identical bytes under two URLs stored once');
+      assertEq(store.lookup(base + '/img/0.png').etag, etagOf(BODIES['/img/0.png']), 'D2: ETag indexed');
+      const dest = fs.statSync(path.join(tmp, 'site-a', 'public', 'images', 'img-0.png'));
+      assertEq(dest.ino, fs.statSync(store.blobPath(hash)).ino, 'D2: public/ file hardlinked to the blob');
+      assertEq(fs.readdirSync(store.partialDir).length, 0, 'D2: no partial downloads left behind');
+    }
+
+    section('D3: Warm rebuild fetches nothing');
+    {
+      const before = log.length;
+      const verified = await verifyAssets(manifest.filter((e) => !e.url.endsWith('missing.png')), { cacheDir });
+      const stats = {};
+      const result = await downloadAssets(verified, path.join(tmp, 'site-b'), { cacheDir, stats });
+      assertEq(log.length - before, 0, 'D3: no requests for a second site from the same source');
+      assertEq(stats.cached, verified.length, 'D3: every asset served from the store');
+      assertEq(Object.keys(result).length, verified.length, 'D3: same manifest as the cold run');
+    }
+
+    section('D4: Without a shared store');
+    {
+      const before = log.length;
+      const result = await downloadAssets(manifestFor(base, ['/img/5.png']), path.join(tmp, 'site-c'));
+      assertEq(Object.keys(result).length, 1, 'D4: downloads through a temporary store');
+      assertEq(log.length - before, 1, 'D4: one request');
+    }
+
+    section('L1: Lottie install');
+    {
+      const urls = ['/anim/hero-loop.json?v=2', '/anim/not-lottie.json', '/anim/huge.json'].map((u) => base + u);
+      const siteL = path.join(tmp, 'site-l');
+      const { manifest, skipped } = await installLottieAssets(urls, siteL, { cacheDir, dotLottie: true, maxBytes: 16 * 1024 });
+      assertEq(lottieStem(urls[0]), 'hero-loop', 'L1: stem drops query and extension');
+      const entry = manifest[urls[0]];
+      assertEq(entry && entry.src, '/lottie/hero-loop.lottie', 'L1: packed as .lottie');
+      assert(entry && entry.bytes < entry.sourceBytes, 'L1: .lottie smaller than the JSON (' + (entry && entry.bytes) + ' < ' + (entry && entry.sourceBytes) + ')');
+      assertEq(skipped.map((s) => s.url.split('/').pop()).sort().join(','), 'huge.json,not-lottie.json',
+        'L1: invalid and oversized files skipped');
+      assertEq(fs.readdirSync(new AssetStore(cacheDir).partialDir).length, 0, 'L1: oversized partial removed');
+
+      // Unpack animations/hero-loop.json from the archive
+      const archive = fs.readFileSync(path.join(siteL, 'public', 'lottie', 'hero-loop.lottie'));
+      let offset = 0;
+      const files = {};
+      while (archive.readUInt32LE(offset) === 0x04034b50) {
+        const size = archive.readUInt32LE(offset + 18);
+        const nameLen = archive.readUInt16LE(offset + 26);
+        const name = archive.subarray(offset + 30, offset + 30 + nameLen).toString();
+        const start = offset + 30 + nameLen;
+        files[name] = zlib.inflateRawSync(archive.subarray(start, start + size));
+        offset = start + size;
+      }
+      assertEq(Object.keys(files).sort().join(','), 'animations/hero-loop.json,manifest.json', 'L1: dotLottie layout');
+      assert(files['animations/hero-loop.json'].equals(BODIES['/anim/hero-loop.json']), 'L1: animation round-trips');
+      assertEq(JSON.parse(files['manifest.json']).animations[0].id, 'hero-loop', 'L1: manifest names the animation');
+    }
+
+    section('L2: Lottie cache across projects');
+    {
+      const before = log.length;
+      const { manifest } = await installLottieAssets([base + '/anim/hero-loop.json?v=2'], path.join(tmp, 'site-m'),
+        { cacheDir, dotLottie: false });
+      const entry = manifest[base + '/anim/hero-loop.json?v=2'];
+      assertEq(log.length - before, 0, 'L2: no requests for a cached Lottie');
+      assert(entry.cached && entry.src === '/lottie/hero-loop.json', 'L2: plain JSON when packing is off');
+    }
+  } finally {
+    closeAgents();
+    server.close();
+    fs.rmSync(tmp, { recursive: true, force: true });
+  }
+}
+
+main().then(() => {
+  console.log('\n' + '='.repeat(50));
+  console.log('  Results: ' + passed + ' passed, ' + failed + ' failed');
+  if (failures.length > 0) {
+    console.log('\n  Failures:');
+    for (const f of failures) {
+      console.log('    - ' + f);
+    }
+  }
+  console.log('='.repeat(50) + '\n');
+  process.exit(failed > 0 ? 1 : 0);
+});
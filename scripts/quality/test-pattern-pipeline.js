@@ -407,6 +407,57 @@ section('Phase 2: Plugin Pattern Detection');
   }
 }
 
+section('Registry Index: lookups + UI component matching');
+{
+  const { openRegistryIndex } = require('./lib/registry-index');
+  const index = openRegistryIndex();
+
+  assertEq(index.get('entrance__blur_fade').source_file, 'entrance/blur-fade.tsx', 'RI1: get() by animation id');
+  assertEq(index.byFile('entrance/blur-fade.tsx').animation_id, 'entrance__blur_fade', 'RI2: byFile() by source file');
+  assert(index.find('intent', 'reveal').includes('entrance__blur_fade'), 'RI3: find() by intent facet');
+  assert(index.byArchetype('hero').length > 0, 'RI4: byArchetype() is case-insensitive and non-empty');
+  assert(openRegistryIndex() === index, 'RI5: index is cached until the registry JSON changes');
+
+  const hits = index.search('accordion expand collapse', { category: 'interactive', limit: 3 });
+  assertEq(hits[0] && hits[0].file, 'interactive/accordion-expand.tsx', 'RI6: search() ranks the curated accordion first');
+
+  const matches = matchUIComponents(['accordion'], index);
+  assert(matches[0].matched, 'RI7: matchUIComponents() resolves accordion through the index');
+  assertEq(matches[0].component.file, 'interactive/accordion-expand.tsx', 'RI8: matched file is a deployable component');
+}
+
+section('Batched injector calls: buildAllSectionBlocks + truncation');
+{
+  const { METHODS } = require('./injector-worker');
+  const { buildIconContextBlock } = require('./lib/icon-mapper');
+  const { getVisualFallback } = require('./lib/asset-injector');
+  const { buildCardEmbeddedDemos } = require('./lib/animation-injector');
+  const { detectAndRepairTruncation, detectAndRepairTruncationAll } = require('./lib/post-process');
+  const { openRegistryIndex } = require('./lib/registry-index');
+
+  const icons = ['arrow-right', 'check'];
+  const plugins = ['SplitText', 'ScrollTrigger'];
+  const requests = [
+    { index: 0, archetype: 'HERO', visualFallback: null, cardDemos: false, uiPatterns: [] },
+    { index: 1, archetype: 'FEATURES', visualFallback: { isCardGrid: true, cardCount: 6 }, cardDemos: false, uiPatterns: ['accordion'] },
+    { index: 2, archetype: 'PRODUCT-SHOWCASE', visualFallback: null, cardDemos: true, uiPatterns: [] },
+  ];
+  const blocks = METHODS.buildAllSectionBlocks(requests, icons, plugins, openRegistryIndex());
+
+  assertEq(Object.keys(blocks).join(','), '0,1,2', 'BA1: one entry per requested section');
+  assertEq(blocks[1].iconBlock, buildIconContextBlock('FEATURES', 1, icons), 'BA2: icon block matches the single call');
+  assertEq(JSON.stringify(blocks[1].visualFallback), JSON.stringify(getVisualFallback('FEATURES', 1, true, 6)), 'BA3: visual fallback matches the single call');
+  assertEq(blocks[0].visualFallback.block, '', 'BA4: no visual fallback unless requested');
+  assertEq(JSON.stringify(blocks[2].cardDemos), JSON.stringify(buildCardEmbeddedDemos(plugins)), 'BA5: card demos match the single call');
+  assert(blocks[1].uiComponents.matches[0].matched, 'BA6: UI components matched through the registry index');
+
+  const complete = 'export default function A() {\n  return <div />;\n}\n';
+  const cut = 'export default function B() {\n  return (\n    <Box>';
+  const results = detectAndRepairTruncationAll([{ name: 'a.tsx', code: complete }, { name: 'b.tsx', code: cut }]);
+  assert(!results[0].truncated && !('code' in results[0]), 'BA7: complete file reported without echoing its code');
+  assertEq(results[1].code, detectAndRepairTruncation(cut, 'b.tsx').code, 'BA8: repaired code matches the single call');
+}
+
 // ============================================================
 // Results
 // ============================================================
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Animation Registry Index
+
+Compiles skills/animation-components/registry/animation_registry.json and
+animation_search_index.json into one SQLite file (FTS5 where available) so
+lookups don't need a full JSON parse:
+
+  get(id) / by_file(path)      one component
+  find(facet, value)           ids by facet: intent, archetype, trigger,
+                               layout_context, interaction_type, framework,
+                               component_type, animation_type, performance_risk,
+                               tag, capability, dependency
+  search(text, category)       ranked free-text match (UI component matching)
+
+The index lives at output/.cache/registry/animation_index.sqlite and is
+rebuilt automatically when either source JSON changes (mtime or size).
+scripts/quality/lib/registry-index.js reads the same file from Node.
+
+Usage:
+  python scripts/registry_index.py build [--force]
+  python scripts/registry_index.py search "accordion expand collapse" [--category interactive]
+  python scripts/registry_index.py find archetype HERO
+  python scripts/registry_index.py get entrance__blur_fade
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+REGISTRY_DIR = ROOT / "skills" / "animation-components" / "registry"
+REGISTRY_FILES = ("animation_registry.json", "animation_search_index.json")
+DEFAULT_DB_PATH = ROOT / "output" / ".cache" / "registry" / "animation_index.sqlite"
+
+# Bump when the table layout or tokenisation changes (forces a rebuild)
+SCHEMA_VERSION = 1
+
+# Search-index maps (by_<key>) → facet name
+SEARCH_INDEX_FACETS = {
+    "by_intent": "intent",
+    "by_section_role": "archetype",
+    "by_trigger": "trigger",
+    "by_layout_context": "layout_context",
+    "by_interaction_type": "interaction_type",
+    "by_performance_risk": "performance_risk",
+    "by_component_type": "component_type",
+    "by_framework": "framework",
+    "by_animation_type": "animation_type",
+}
+
+# Registry list fields that are searchable and exposed as the "tag" facet
+TAG_FIELDS = (
+    "motion_intents", "interaction_intents", "conversion_support_roles",
+    "supported_elements", "supported_layout_contexts", "trigger_types",
+)
+
+# Boolean registry fields exposed as the "capability" facet when true
+CAPABILITY_FIELDS = (
+    "stagger_support", "interruptible", "reversible", "composable", "looping",
+    "gpu_accelerated", "accessibility_safe", "reduced_motion_fallback_present",
+    "mobile_safe", "requires_layout_measurement",
+)
+
+# Components under this directory are third-party imports; everything else is
+# a curated category directory (entrance/, interactive/, text/, ...)
+LIBRARY_DIR = "21st-dev-library"
+
+# search() accepts a hit at this score (one point per query word, +2 for category)
+MIN_SEARCH_SCORE = 2
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_build_lock = threading.Lock()
+
+
+def component_category(component: dict) -> str:
+    """Curated directory name, or the animation type for library components."""
+    top = component.get("source_file", "").split("/", 1)[0]
+    if top and top != LIBRARY_DIR and "/" in component.get("source_file", ""):
+        return top
+    return component.get("animation_type") or ""
+
+
+def component_tokens(component: dict) -> list[str]:
+    """Lower-case words a component can be found by (id, path, type and tag fields)."""
+    parts = [
+        component.get("animation_id", ""), component.get("source_file", ""),
+        component.get("component_type", ""), component.get("framework", ""),
+        component.get("animation_type", ""),
+    ]
+    for field in TAG_FIELDS + ("section_archetypes",):
+        parts.extend(component.get(field) or [])
+    seen = []
+    for word in _WORD_RE.findall(" ".join(str(p) for p in parts).lower()):
+        if word not in seen:
+            seen.append(word)
+    return seen
+
+
+def score_tokens(tokens: list[str], words: list[str], category: str,
+                 want_category: str | None) -> int:
+    """One point per query word that prefixes a token, +2 for a category match."""
+    score = sum(1 for w in words if any(t.startswith(w) for t in tokens))
+    if want_category and category == want_category:
+        score += 2
+    return score
+
+
+def _source_stamp(registry_dir: Path) -> dict:
+    stamp = {"schema": SCHEMA_VERSION}
+    for name in REGISTRY_FILES:
+        st = (registry_dir / name).stat()
+        stamp[name] = [st.st_mtime_ns, st.st_size]
+    return stamp
+
+
+def _read_stamp(db_path: Path) -> dict | None:
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'sources'").fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+def _has_fts5(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def build_index(db_path: Path = DEFAULT_DB_PATH, registry_dir: Path = REGISTRY_DIR) -> dict:
+    """Compile both registry JSON files into db_path (written to a temp file, then swapped in)."""
+    started = time.perf_counter()
+    stamp = _source_stamp(registry_dir)
+    registry = json.loads((registry_dir / REGISTRY_FILES[0]).read_text(encoding="utf-8"))
+    search_index = json.loads((registry_dir / REGISTRY_FILES[1]).read_text(encoding="utf-8"))
+    components = registry.get("components", [])
+
+    facets = set()
+    for key, facet in SEARCH_INDEX_FACETS.items():
+        for value, ids in (search_index.get(key) or {}).items():
+            facets.update((facet, str(value), cid) for cid in ids)
+    for c in components:
+        cid = c["animation_id"]
+        facets.update(("archetype", a, cid) for a in c.get("section_archetypes") or [])
+        for field in TAG_FIELDS:
+            facets.update(("tag", str(v), cid) for v in c.get(field) or [])
+        facets.update(("capability", f, cid) for f in CAPABILITY_FIELDS if c.get(f) is True)
+        facets.update(("dependency", d, cid) for d in c.get("dependencies") or [])
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = db_path.with_name(f"{db_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    try:
+        fts = _has_fts5(conn)
+        conn.executescript("""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE components (
+                id TEXT PRIMARY KEY,
+                source_file TEXT NOT NULL,
+                category TEXT NOT NULL,
+                component_type TEXT,
+                framework TEXT,
+                animation_type TEXT,
+                tokens TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX components_file ON components (source_file);
+            CREATE TABLE facets (facet TEXT NOT NULL, value TEXT NOT NULL, id TEXT NOT NULL);
+        """)
+        rows = [
+            (c["animation_id"], c.get("source_file", ""), component_category(c),
+             c.get("component_type"), c.get("framework"), c.get("animation_type"),
+             " ".join(component_tokens(c)), json.dumps(c, separators=(",", ":")))
+            for c in components
+        ]
+        conn.executemany("INSERT OR REPLACE INTO components VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO facets VALUES (?, ?, ?)", sorted(facets))
+        conn.execute("CREATE INDEX facets_lookup ON facets (facet, value)")
+        if fts:
+            conn.execute("CREATE VIRTUAL TABLE components_fts USING fts5(id UNINDEXED, tokens)")
+            conn.execute("INSERT INTO components_fts (id, tokens) SELECT id, tokens FROM components")
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("sources", json.dumps(stamp)),
+            ("fts5", "1" if fts else "0"),
+            ("built_at", str(time.time())),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+    tmp.replace(db_path)
+    return {"components": len(components), "facets": len(facets), "fts5": fts,
+            "seconds": round(time.perf_counter() - started, 3)}
+
+
+def ensure_index(db_path: Path = DEFAULT_DB_PATH, registry_dir: Path = REGISTRY_DIR,
+                 force: bool = False) -> Path:
+    """Return db_path, (re)building it first if missing or older than the source JSON."""
+    with _build_lock:
+        if force or _read_stamp(db_path) != _source_stamp(registry_dir):
+            build_index(db_path, registry_dir)
+    return db_path
+
+
+class RegistryIndex:
+    """Read-only queries against a compiled registry index (safe to share across threads)."""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.fts5 = self._query_one("SELECT value FROM meta WHERE key = 'fts5'")["value"] == "1"
+
+    @classmethod
+    def open(cls, db_path: Path = DEFAULT_DB_PATH, registry_dir: Path = REGISTRY_DIR) -> "RegistryIndex":
+        """Open the index, rebuilding it first if the registry JSON changed."""
+        return cls(ensure_index(db_path, registry_dir))
+
+    def _query(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _query_one(self, sql: str, params: tuple = ()) -> sqlite3.Row | None:
+        rows = self._query(sql, params)
+        return rows[0] if rows else None
+
+    def get(self, component_id: str) -> dict | None:
+        row = self._query_one("SELECT data FROM components WHERE id = ?", (component_id,))
+        return json.loads(row["data"]) if row else None
+
+    def by_file(self, source_file: str) -> dict | None:
+        row = self._query_one("SELECT data FROM components WHERE source_file = ?", (source_file,))
+        return json.loads(row["data"]) if row else None
+
+    def find(self, facet: str, value: str) -> list[str]:
+        """Component ids with the given facet value, in registry-id order."""
+        rows = self._query("SELECT id FROM facets WHERE facet = ? AND value = ? ORDER BY id", (facet, value))
+        return [r["id"] for r in rows]
+
+    def by_archetype(self, archetype: str) -> list[str]:
+        return self.find("archetype", archetype.upper())
+
+    def by_tag(self, tag: str) -> list[str]:
+        return self.find("tag", tag)
+
+    def by_capability(self, *capabilities: str) -> list[str]:
+        """Ids that have every listed capability (e.g. "mobile_safe", "reversible")."""
+        if not capabilities:
+            return []
+        result = None
+        for cap in capabilities:
+            ids = set(self.find("capability", cap))
+            result = ids if result is None else result & ids
+        return sorted(result)
+
+    def facet_values(self, facet: str) -> list[str]:
+        return [r["value"] for r in self._query(
+            "SELECT DISTINCT value FROM facets WHERE facet = ? ORDER BY value", (facet,))]
+
+    def search(self, text: str, category: str | None = None, limit: int = 10) -> list[dict]:
+        """Ranked free-text match: {id, file, category, score} with score >= MIN_SEARCH_SCORE.
+
+        Ties prefer curated components over library imports, then id order.
+        """
+        words = _WORD_RE.findall(text.lower())
+        if not words:
+            return []
+        if self.fts5:
+            match = " OR ".join(f'"{w}"*' for w in words)
+            rows = self._query(
+                "SELECT c.id, c.source_file, c.category, c.tokens FROM components_fts f "
+                "JOIN components c ON c.id = f.id WHERE components_fts MATCH ?", (match,))
+        else:
+            rows = self._query("SELECT id, source_file, category, tokens FROM components")
+        hits = []
+        for r in rows:
+            score = score_tokens(r["tokens"].split(), words, r["category"], category)
+            if score >= MIN_SEARCH_SCORE:
+                hits.append({"id": r["id"], "file": r["source_file"], "category": r["category"], "score": score})
+        hits.sort(key=lambda h: (-h["score"], h["file"].startswith(LIBRARY_DIR + "/"), h["id"]))
+        return hits[:limit]
+
+    def close(self):
+        self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and query the animation registry index")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="Index path")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Build the index (only if stale unless --force)")
+    build.add_argument("--force", action="store_true")
+    search = sub.add_parser("search", help="Free-text component search")
+    search.add_argument("text")
+    search.add_argument("--category", default=None)
+    search.add_argument("--limit", type=int, default=10)
+    find = sub.add_parser("find", help="Component ids by facet value")
+    find.add_argument("facet")
+    find.add_argument("value")
+    get = sub.add_parser("get", help="One component by id")
+    get.add_argument("id")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if args.force or _read_stamp(args.db) != _source_stamp(REGISTRY_DIR):
+            stats = build_index(args.db)
+            print(f"✓ Indexed {stats['components']} components, {stats['facets']} facet rows "
+                  f"in {stats['seconds']}s (FTS5: {'yes' if stats['fts5'] else 'no'}) → {args.db}")
+        else:
+            print(f"✓ Index is up to date: {args.db}")
+        return
+
+    index = RegistryIndex.open(args.db)
+    if args.command == "search":
+        result = index.search(args.text, args.category, args.limit)
+    elif args.command == "find":
+        result = index.find(args.facet, args.value)
+    else:
+        result = index.get(args.id)
+        if result is None:
+            print(f"❌ No component '{args.id}'")
+            sys.exit(1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Section Taxonomy Model
+
+Parses skills/section-taxonomy.md once into archetypes → variants, with each
+archetype's purpose, animation guidance, structure reference and notes.
+The parsed model is cached in memory and on disk at
+output/.cache/taxonomy/<sha256 of the file>.json, so the pipeline pays for
+one file read + hash per load and never re-scans the markdown per section.
+
+Usage:
+  from taxonomy import load_taxonomy
+  taxonomy = load_taxonomy()
+  taxonomy.structure_reference("PRODUCT-SHOWCASE")
+  taxonomy.is_known("HERO", "split-image")
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from parse_cache import ParseCache
+
+ROOT = Path(__file__).parent.parent
+TAXONOMY_PATH = ROOT / "skills" / "section-taxonomy.md"
+TAXONOMY_CACHE_DIR = ROOT / "output" / ".cache" / "taxonomy"
+
+PARSER_VERSION = 1  # see parse_cache.py
+
+# Structure text that means "nothing recorded yet"
+STRUCTURE_PLACEHOLDER = "populate on first use"
+
+_FIELD_RE = re.compile(r"^\*\*([A-Za-z ]+):\*\*\s*(.*)$")
+_VARIANT_RE = re.compile(r"^- `([^`]+)`\s*(?:—|--|-)?\s*(.*)$")
+
+
+@dataclass(frozen=True)
+class Variant:
+    name: str
+    description: str = ""
+
+
+@dataclass(frozen=True)
+class Archetype:
+    name: str
+    group: str = ""
+    purpose: str = ""
+    variants: tuple[Variant, ...] = ()
+    animation: str = ""
+    structure: str | None = None   # None until a real structure is recorded
+    notes: str = ""
+
+    def variant(self, name: str) -> Variant | None:
+        return next((v for v in self.variants if v.name == name), None)
+
+    @property
+    def variant_names(self) -> list[str]:
+        return [v.name for v in self.variants]
+
+
+@dataclass(frozen=True)
+class Taxonomy:
+    archetypes: dict[str, Archetype] = field(default_factory=dict)
+    source_hash: str = ""
+
+    def get(self, archetype: str) -> Archetype | None:
+        return self.archetypes.get(archetype.strip().upper())
+
+    def names(self) -> list[str]:
+        return list(self.archetypes)
+
+    def is_known(self, archetype: str, variant: str | None = None) -> bool:
+        arch = self.get(archetype)
+        if arch is None:
+            return False
+        return variant is None or arch.variant(variant) is not None
+
+    def structure_reference(self, archetype: str) -> str | None:
+        arch = self.get(archetype)
+        return arch.structure if arch else None
+
+    def archetype_listing(self) -> str:
+        """Archetype names with their variants, as listed in the scaffold prompt."""
+        lines = []
+        for arch in self.archetypes.values():
+            lines.append(f"\n{arch.name}")
+            lines.extend(f"  - {v.name}" for v in arch.variants)
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {"source_hash": self.source_hash,
+                "archetypes": [asdict(a) for a in self.archetypes.values()]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Taxonomy":
+        archetypes = {}
+        for a in data["archetypes"]:
+            a = dict(a, variants=tuple(Variant(**v) for v in a["variants"]))
+            archetypes[a["name"]] = Archetype(**a)
+        return cls(archetypes=archetypes, source_hash=data["source_hash"])
+
+
+def parse_taxonomy(text: str, source_hash: str = "") -> Taxonomy:
+    """Parse section-taxonomy.md: `## Group` → `### ARCHETYPE` → `**Field:**` blocks."""
+    archetypes = {}
+    group = ""
+    current = None
+    field_name = None
+
+    def finish():
+        if current is not None:
+            structure = current["structure"].strip()
+            if not structure or STRUCTURE_PLACEHOLDER in structure.lower():
+                structure = None
+            archetypes[current["name"]] = Archetype(
+                name=current["name"], group=current["group"], purpose=current["purpose"].strip(),
+                variants=tuple(current["variants"]), animation=current["animation"].strip(),
+                structure=structure, notes="" if current["notes"].strip() == "[]" else current["notes"].strip(),
+            )
+
+    for line in text.split("\n"):
+        if line.startswith("### "):
+            finish()
+            current = {"name": line[4:].strip(), "group": group, "purpose": "", "variants": [],
+                       "animation": "", "structure": "", "notes": ""}
+            field_name = None
+            continue
+        if line.startswith("## ") or line.strip() == "---":
+            finish()
+            current, field_name = None, None
+            if line.startswith("## "):
+                group = line[3:].strip()
+            continue
+        if current is None:
+            continue
+
+        m = _FIELD_RE.match(line)
+        if m:
+            field_name = m.group(1).strip().lower()
+            if field_name in ("purpose", "animation", "structure", "notes"):
+                current[field_name] = m.group(2)
+            continue
+        v = _VARIANT_RE.match(line.strip())
+        if v:
+            current["variants"].append(Variant(v.group(1).strip(), v.group(2).strip()))
+            continue
+        if field_name in ("purpose", "animation", "structure", "notes") and line.strip():
+            current[field_name] += "\n" + line.strip()
+    finish()
+    return Taxonomy(archetypes=archetypes, source_hash=source_hash)
+
+
+_CACHE = ParseCache(to_dict=Taxonomy.to_dict, from_dict=Taxonomy.from_dict, version=PARSER_VERSION)
+
+
+def load_taxonomy(path: Path = TAXONOMY_PATH, cache_dir: Path | None = TAXONOMY_CACHE_DIR) -> Taxonomy:
+    """Parsed taxonomy for `path`, from memory, the disk cache, or a fresh parse (then cached)."""
+    return _CACHE.load(path.read_bytes(), parse_taxonomy, cache_dir)